@@ -0,0 +1,27 @@
+"""Shared bootstrap for benchmark scripts: project settings plus a throwaway test database."""
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(**env: str) -> None:
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "telegram_weather_publisher.settings")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "benchmark-token")
+    for key, value in env.items():
+        os.environ.setdefault(key, value)
+
+    import django
+
+    django.setup()
+
+
+def create_test_database() -> None:
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
@@ -0,0 +1,134 @@
+"""
+Decode/encode cost of Open-Meteo payloads per JSON codec, plus what gzip saves on the wire.
+
+    python benchmarks/bench_json_codec.py --record     # save real responses to benchmarks/payloads/
+    python benchmarks/bench_json_codec.py --repeat 200
+
+Uses the recorded payloads when present and otherwise synthesizes responses of the same shape
+(16 days of daily variables plus hourly series).
+"""
+import argparse
+from datetime import date, timedelta
+import gzip
+import json
+from pathlib import Path
+import random
+import time
+
+from _django import setup_django
+
+PAYLOAD_DIR = Path(__file__).resolve().parent / "payloads"
+RECORD_POINTS = {
+    "astana": (51.15, 71.45),
+    "almaty": (43.25, 76.95),
+    "moscow": (55.75, 37.65),
+}
+
+
+def record() -> None:
+    import requests
+
+    from weatherbot.codec import ACCEPT_ENCODING
+    from weatherbot.forecast import DAILY_VARIABLES
+    from weatherbot.weather_api import _forecast_params
+
+    PAYLOAD_DIR.mkdir(exist_ok=True)
+    first = date.today()
+    for name, (latitude, longitude) in RECORD_POINTS.items():
+        for days, hourly in ((7, False), (1, True), (16, True)):
+            last = first + timedelta(days=days - 1)
+            params = _forecast_params(latitude, longitude, first.isoformat(), last.isoformat(), DAILY_VARIABLES, hourly)
+            response = requests.get(
+                "https://api.open-meteo.com/v1/forecast", params=params, headers=ACCEPT_ENCODING, timeout=30
+            )
+            response.raise_for_status()
+            path = PAYLOAD_DIR / f"{name}_{days}d{'_hourly' if hourly else ''}.json"
+            path.write_bytes(response.content)
+            print(f"recorded {path.name}: {len(response.content)} bytes, encoding={response.headers.get('Content-Encoding')}")
+
+
+def synthesize(days: int = 16) -> bytes:
+    rng = random.Random(1)
+    dates = [(date(2026, 1, 1) + timedelta(days=offset)).isoformat() for offset in range(days)]
+    hours = [f"{day}T{hour:02d}:00" for day in dates for hour in range(24)]
+    payload = {
+        "latitude": 51.125,
+        "longitude": 71.375,
+        "generationtime_ms": 0.41,
+        "utc_offset_seconds": 18000,
+        "timezone": "Asia/Almaty",
+        "timezone_abbreviation": "GMT+5",
+        "elevation": 347.0,
+        "daily_units": {"time": "iso8601", "weather_code": "wmo code", "temperature_2m_max": "°C"},
+        "daily": {
+            "time": dates,
+            "weather_code": [rng.choice((0, 2, 3, 61, 71)) for _ in dates],
+            "temperature_2m_max": [round(rng.uniform(-20, 30), 1) for _ in dates],
+            "temperature_2m_min": [round(rng.uniform(-30, 20), 1) for _ in dates],
+            "relative_humidity_2m_mean": [rng.randint(30, 95) for _ in dates],
+            "wind_speed_10m_max": [round(rng.uniform(0, 40), 1) for _ in dates],
+            "precipitation_probability_max": [rng.randint(0, 100) for _ in dates],
+        },
+        "hourly_units": {"time": "iso8601", "temperature_2m": "°C"},
+        "hourly": {
+            "time": hours,
+            "temperature_2m": [round(rng.uniform(-30, 30), 1) for _ in hours],
+            "weather_code": [rng.choice((0, 2, 3, 61, 71)) for _ in hours],
+            "precipitation_probability": [rng.randint(0, 100) for _ in hours],
+        },
+    }
+    return json.dumps(payload).encode()
+
+
+def load_payloads() -> dict[str, bytes]:
+    recorded = sorted(PAYLOAD_DIR.glob("*.json")) if PAYLOAD_DIR.exists() else []
+    if recorded:
+        return {path.stem: path.read_bytes() for path in recorded}
+    return {"synthetic_16d_hourly": synthesize(16), "synthetic_7d_hourly": synthesize(7)}
+
+
+def timed(func, argument, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(argument)
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--record", action="store_true", help="Fetch real payloads into benchmarks/payloads/")
+    args = parser.parse_args()
+
+    setup_django()
+    if args.record:
+        record()
+        return
+
+    from weatherbot.codec import STDLIB_CODEC, _orjson_codec
+
+    codecs = [codec for codec in (STDLIB_CODEC, _orjson_codec()) if codec is not None]
+    if len(codecs) == 1:
+        print("orjson is not installed: only the stdlib codec is measured")
+
+    for name, raw in load_payloads().items():
+        compressed = gzip.compress(raw)
+        document = json.loads(raw)
+        gunzip_us = timed(gzip.decompress, compressed, args.repeat)
+        print(
+            f"{name}: {len(raw)} bytes, gzip {len(compressed)} bytes "
+            f"({len(compressed) / len(raw):.0%}), gunzip {gunzip_us:.0f}us"
+        )
+        baseline = None
+        for codec in codecs:
+            loads_us = timed(codec.loads, raw, args.repeat)
+            dumps_us = timed(codec.dumps, document, args.repeat)
+            baseline = baseline or loads_us
+            print(
+                f"  {codec.name:>6}: loads {loads_us:8.0f}us  dumps {dumps_us:8.0f}us  "
+                f"loads speedup {baseline / loads_us:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Per-channel logging cost on the publish path: the same records a send produces (Telegram confirmation,
+publication result, a weather_type lookup for an unknown WMO code) from concurrent workers.
+
+    python benchmarks/bench_logging.py --workers 8 --channels 2000 --write-latency-us 50
+
+"in logging" is how long the publishing threads spent inside logging calls, "written" adds the time until
+the last record reached the file. Output goes to a temporary file; --write-latency-us adds a sleep per write
+to stand in for a stdout pipe whose reader (container log driver, terminal) is slower than the process.
+"""
+import argparse
+import logging
+import tempfile
+import threading
+import time
+
+from _django import setup_django
+
+CONFIGS = (
+    ("sync", "text", 0),
+    ("sync", "json", 0),
+    ("queue", "text", 0),
+    ("queue", "json", 0),
+    ("queue", "json", 60),
+)
+
+
+def build_handler(kind: str, fmt: str, dedup_window: float, stream):
+    from weatherbot.logs import ContextFilter, DuplicateFilter, JSONFormatter, QueueLogHandler
+
+    if kind == "queue":
+        handler = QueueLogHandler(queue_size=1_000_000)
+        handler.target.setStream(stream)
+    else:
+        handler = logging.StreamHandler(stream)
+    if fmt == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s%(context)s", defaults={"context": ""})
+        )
+    handler.addFilter(ContextFilter())
+    handler.addFilter(DuplicateFilter(window=dedup_window))
+    return handler
+
+
+class SlowStream:
+    def __init__(self, stream, latency_us: float) -> None:
+        self.stream = stream
+        self.latency = latency_us / 1_000_000
+
+    def write(self, text: str) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def run(kind: str, fmt: str, dedup_window: float, workers: int, channels: int, latency_us: float) -> dict:
+    from weatherbot.forecast import weather_type_for_code
+    from weatherbot.logs import log_context
+
+    publisher_logger = logging.getLogger("weatherbot.publisher")
+    telegram_logger = logging.getLogger("weatherbot.telegram_api")
+    root = logging.getLogger()
+
+    with tempfile.TemporaryFile("w+") as stream:
+        handler = build_handler(kind, fmt, dedup_window, SlowStream(stream, latency_us))
+        previous_handlers, previous_level = root.handlers[:], root.level
+        root.handlers = [handler]
+        root.setLevel(logging.INFO)
+        emit_seconds = [0.0] * workers
+
+        def worker(index: int) -> None:
+            with log_context(run_id=f"bench{index}", forecast_type="today"):
+                for number in range(channels // workers):
+                    chat_id = f"@bench{index}_{number}"
+                    started = time.perf_counter()
+                    with log_context(channel=chat_id):
+                        weather_type_for_code(42)
+                        telegram_logger.info("Telegram message sent chat_id=%s message_id=%s", chat_id, number)
+                        publisher_logger.info("Publish result channel=%s success=%s duration_ms=%s", chat_id, True, 80)
+                    emit_seconds[index] += time.perf_counter() - started
+
+        try:
+            started = time.perf_counter()
+            threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            emitted = time.perf_counter() - started
+            handler.flush()
+            drained = time.perf_counter() - started
+        finally:
+            root.handlers, root.level = previous_handlers, previous_level
+            handler.close()
+        stream.seek(0)
+        lines = sum(1 for _ in stream)
+
+    sent = channels // workers * workers
+    return {
+        "emit_us_per_channel": sum(emit_seconds) / sent * 1_000_000,
+        "wall_emit_ms": emitted * 1000,
+        "wall_drained_ms": drained * 1000,
+        "lines": lines,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent publishing threads")
+    parser.add_argument("--channels", type=int, default=2000)
+    parser.add_argument("--write-latency-us", type=float, default=0, help="Simulated cost of each stream write")
+    args = parser.parse_args()
+
+    setup_django()
+    print(
+        f"workers={args.workers} channels={args.channels} write_latency={args.write_latency_us:g}us "
+        "(3 records per channel, one an unknown-code warning)"
+    )
+    for kind, fmt, dedup_window in CONFIGS:
+        result = run(kind, fmt, dedup_window, args.workers, args.channels, args.write_latency_us)
+        print(
+            f"{kind:>5} {fmt:>4} dedup={dedup_window:>2g}s: "
+            f"in logging {result['emit_us_per_channel']:6.1f}us/channel  "
+            f"threads done {result['wall_emit_ms']:7.1f}ms  written {result['wall_drained_ms']:7.1f}ms  "
+            f"lines={result['lines']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
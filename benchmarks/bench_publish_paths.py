@@ -0,0 +1,83 @@
+"""
+Compare the sync and async publish paths against a fake Telegram API with fixed latency.
+
+    python benchmarks/bench_publish_paths.py --channels 200 --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+from _django import create_test_database, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django(ASYNC_PUBLISH_CONCURRENCY=str(args.concurrency))
+    create_test_database()
+
+    import httpx
+    from django.utils import timezone
+
+    from weatherbot.grid import snap_to_grid
+    from weatherbot.models import BotConfig, Channel, City, ForecastType, PublicationLog
+    from weatherbot.publisher import WeatherPublisher
+    from weatherbot.telegram_api import AsyncTelegramClient
+    from weatherbot.weather_api import DAILY_VARIABLES, DayForecast, forecast_cache
+
+    latency = args.latency_ms / 1000
+    city = City.objects.create(name="Benchmark", latitude=51.17, longitude=71.43)
+    BotConfig.objects.update_or_create(singleton=True, defaults={"default_city": city})
+    Channel.objects.bulk_create(
+        Channel(name=f"bench-{index}", chat_id=f"@bench{index}") for index in range(args.channels)
+    )
+    today = timezone.localdate().isoformat()
+    forecast_cache.merge(
+        snap_to_grid(51.17, 71.43),
+        [DayForecast(date=today, temp_min=-3, temp_max=4, weather_code=3)],
+        DAILY_VARIABLES,
+        False,
+        today,
+    )
+    ok_body = {"ok": True, "result": {"message_id": 1}}
+
+    def fake_post(*_args, **_kwargs):
+        time.sleep(latency)
+        response = MagicMock(status_code=200)
+        response.json.return_value = ok_body
+        response.content = json.dumps(ok_body).encode()
+        return response
+
+    async def fake_handler(_request):
+        await asyncio.sleep(latency)
+        return httpx.Response(200, content=json.dumps(ok_body))
+
+    def async_telegram():
+        return AsyncTelegramClient(client=httpx.AsyncClient(transport=httpx.MockTransport(fake_handler)))
+
+    results = {}
+    with patch("weatherbot.telegram_api.requests.post", side_effect=fake_post):
+        started = time.perf_counter()
+        published = WeatherPublisher().publish(ForecastType.TODAY)
+        results["sync"] = (published, time.perf_counter() - started)
+
+    PublicationLog.objects.all().delete()
+    with patch("weatherbot.telegram_api.AsyncTelegramClient", side_effect=async_telegram):
+        started = time.perf_counter()
+        published = asyncio.run(WeatherPublisher().apublish(ForecastType.TODAY))
+        results["async"] = (published, time.perf_counter() - started)
+
+    print(f"channels={args.channels} latency={args.latency_ms}ms concurrency={args.concurrency}")
+    for name, (published, elapsed) in results.items():
+        print(f"{name:>5}: published={published} total={elapsed:.3f}s per_channel={elapsed / args.channels * 1000:.2f}ms")
+    print(f"speedup: {results['sync'][1] / results['async'][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
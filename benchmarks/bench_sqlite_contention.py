@@ -0,0 +1,172 @@
+"""
+Compare SQLite profiles under the single-container load: publication log inserts, the scheduler's
+periodic Schedule reads and admin-style read-modify-write on channels, all against one database file.
+
+    python benchmarks/bench_sqlite_contention.py --writers 4 --rows 300 --seconds 5
+
+Each profile runs in its own interpreter (settings are read once at startup) on a fresh temporary file.
+"""
+import argparse
+from datetime import date, timedelta
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROFILES = ("default", "concurrent")
+
+
+def run_profile(args: argparse.Namespace) -> dict:
+    from _django import setup_django
+
+    setup_django()
+
+    from django.core.management import call_command
+    from django.db import OperationalError, connection, transaction
+
+    from weatherbot.models import Channel, City, ForecastType, PublicationLog, Schedule
+
+    call_command("migrate", verbosity=0)
+    city = City.objects.create(name="Benchmark", latitude=51.17, longitude=71.43)
+    channels = Channel.objects.bulk_create(
+        Channel(name=f"bench-{index}", chat_id=f"@bench{index}") for index in range(args.writers)
+    )
+    Schedule.objects.bulk_create(
+        Schedule(forecast_type=forecast_type, publish_time=f"0{index}:00")
+        for index, forecast_type in enumerate(ForecastType.values)
+    )
+
+    stop = threading.Event()
+    counters_lock = threading.Lock()
+    counters = {"inserts": 0, "reads": 0, "admin_updates": 0, "locked_errors": 0}
+    latencies_ms: list[float] = []
+
+    def count(name: str, started: float | None = None) -> None:
+        with counters_lock:
+            counters[name] += 1
+            if started is not None:
+                latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    def guarded(func) -> None:
+        try:
+            func()
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            count("locked_errors")
+        finally:
+            connection.close()
+
+    def publisher(channel: Channel) -> None:
+        # Same shape as WeatherPublisher._save_log: one short atomic insert per channel.
+        start_date = date(2026, 1, 1)
+        for offset in range(args.rows):
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    PublicationLog.objects.create(
+                        channel=channel,
+                        city=city,
+                        forecast_type=ForecastType.TODAY,
+                        target_date=start_date + timedelta(days=offset),
+                        success=True,
+                        message_id=str(offset),
+                    )
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                count("locked_errors")
+                continue
+            count("inserts", started)
+
+    def scheduler() -> None:
+        while not stop.is_set():
+            list(Schedule.objects.filter(active=True))
+            count("reads")
+            time.sleep(0.01)
+
+    def admin() -> None:
+        # Read then write inside one transaction: a deferred BEGIN has to upgrade its lock midway.
+        while not stop.is_set():
+            try:
+                with transaction.atomic():
+                    channel = Channel.objects.get(pk=channels[0].pk)
+                    channel.name = f"bench-{time.monotonic_ns()}"
+                    channel.save(update_fields=["name", "updated_at"])
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                count("locked_errors")
+            else:
+                count("admin_updates")
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=guarded, args=(lambda c=c: publisher(c),)) for c in channels]
+    background = [threading.Thread(target=guarded, args=(func,)) for func in (scheduler, admin)]
+    started = time.perf_counter()
+    for thread in threads + background:
+        thread.start()
+    deadline = started + args.seconds
+    for thread in threads:
+        thread.join(max(deadline - time.perf_counter(), 0))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in background:
+        thread.join()
+
+    latencies_ms.sort()
+    return {
+        **counters,
+        "elapsed_s": round(elapsed, 2),
+        "inserts_per_second": round(counters["inserts"] / elapsed, 1),
+        "insert_p50_ms": round(latencies_ms[len(latencies_ms) // 2], 2) if latencies_ms else None,
+        "insert_p99_ms": round(latencies_ms[int(len(latencies_ms) * 0.99)], 2) if latencies_ms else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent publication log writers")
+    parser.add_argument("--rows", type=int, default=300, help="Inserts per writer")
+    parser.add_argument("--seconds", type=float, default=10, help="Upper bound on each run")
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(args)))
+        return
+
+    results = {}
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "SQLITE_PROFILE": profile,
+                "SQLITE_PATH": str(Path(directory) / "bench.sqlite3"),
+                "DATABASE_URL": "",
+            }
+            output = subprocess.run(
+                [sys.executable, __file__, f"--profile={profile}", *sys.argv[1:]],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            results[profile] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"writers={args.writers} rows={args.rows}")
+    for profile, result in results.items():
+        print(
+            f"{profile:>10}: inserts={result['inserts']} ({result['inserts_per_second']}/s) "
+            f"p50={result['insert_p50_ms']}ms p99={result['insert_p99_ms']}ms "
+            f"scheduler_reads={result['reads']} admin_updates={result['admin_updates']} "
+            f"locked_errors={result['locked_errors']} elapsed={result['elapsed_s']}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
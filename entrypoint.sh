@@ -1,34 +1,34 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-python manage.py migrate --noinput
-python manage.py bootstrap_defaults
-python manage.py collectstatic --noinput
-
-if [ -n "${DJANGO_SUPERUSER_USERNAME:-}" ] && [ -n "${DJANGO_SUPERUSER_PASSWORD:-}" ]; then
-  python manage.py shell <<'PY'
-import os
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-username = os.getenv("DJANGO_SUPERUSER_USERNAME")
-password = os.getenv("DJANGO_SUPERUSER_PASSWORD")
-email = os.getenv("DJANGO_SUPERUSER_EMAIL", "admin@example.com")
-
-if username and password and not User.objects.filter(username=username).exists():
-    User.objects.create_superuser(username=username, email=email, password=password)
-PY
-fi
+# One-shot bootstrap (migrate, defaults, collectstatic, superuser) lives in `manage.py prepare`
+# and runs only in the release phase: the `release` mode, or once before `all` starts its processes.
+# Set RUN_PREPARE=true to force it before `web`/`scheduler` when there is no separate release step.
+run_prepare() {
+  python manage.py prepare
+}
 
 case "${1:-web}" in
+  release)
+    exec python manage.py prepare
+    ;;
   web)
+    if [ "${RUN_PREPARE:-false}" = "true" ]; then
+      run_prepare
+    fi
     exec gunicorn telegram_weather_publisher.wsgi:application --bind 0.0.0.0:8000 --workers "${WEB_CONCURRENCY:-2}"
     ;;
   scheduler)
+    if [ "${RUN_PREPARE:-false}" = "true" ]; then
+      run_prepare
+    fi
     exec python manage.py run_scheduler
     ;;
   all)
-    if [ "${ENABLE_INTERNAL_SCHEDULER:-true}" = "true" ]; then
+    run_prepare
+    # The scheduler runs here unless disabled; export the result so /ready/ checks its heartbeat.
+    export ENABLE_INTERNAL_SCHEDULER="${ENABLE_INTERNAL_SCHEDULER:-true}"
+    if [ "${ENABLE_INTERNAL_SCHEDULER,,}" = "true" ]; then
       (
         while true; do
           echo "Starting scheduler process..."
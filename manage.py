@@ -2,9 +2,26 @@
 import os
 import sys
 
+# Commands that never serve HTTP or touch the admin; they default to the lean settings profile.
+WORKER_COMMANDS = {
+    "publish_forecast",
+    "refresh_channel_priorities",
+    "refresh_publications",
+    "run_bot_polling",
+    "run_scheduler",
+    "simulate_load",
+    "validate_channels",
+}
 
-def main() -> None:
+
+def configure_environment(argv: list[str]) -> None:
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "telegram_weather_publisher.settings")
+    if len(argv) > 1 and argv[1] in WORKER_COMMANDS:
+        os.environ.setdefault("DJANGO_SETTINGS_PROFILE", "worker")
+
+
+def main() -> None:
+    configure_environment(sys.argv)
     from django.core.management import execute_from_command_line
 
     execute_from_command_line(sys.argv)
@@ -22,6 +22,12 @@ INSTALLED_APPS = [
     "weatherbot",
 ]
 
+# "worker" is a lean profile for headless management commands (scheduler, publish,
+# bot polling): no admin, sessions, messages or staticfiles to load at startup.
+SETTINGS_PROFILE = os.getenv("DJANGO_SETTINGS_PROFILE", "web").lower()
+if SETTINGS_PROFILE == "worker":
+    INSTALLED_APPS = ["django.contrib.contenttypes", "weatherbot"]
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -69,6 +75,18 @@ else:
         }
     }
 
+# "concurrent": WAL and friends are set per connection in weatherbot.db; BEGIN IMMEDIATE takes the write
+# lock up front, so a writer waits out the busy timeout instead of failing on a read-to-write upgrade.
+# "default" keeps the stock rollback journal and deferred transactions.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "concurrent").lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024)))
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3" and SQLITE_PROFILE == "concurrent":
+    DATABASES["default"]["OPTIONS"] = {
+        "transaction_mode": "IMMEDIATE",
+        "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -91,18 +109,40 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# "json" writes one object per line with run_id/channel fields; "text" keeps the classic line format.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Records go through a queue to a listener thread instead of writing to stderr from the emitting thread.
+LOG_ASYNC = os.getenv("LOG_ASYNC", "True").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Identical warnings are logged once per window; 0 disables the deduplication.
+LOG_DEDUP_WINDOW_SECONDS = float(os.getenv("LOG_DEDUP_WINDOW_SECONDS", "60"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "standard": {
-            "format": "%(asctime)s %(levelname)s [%(name)s] %(message)s",
-        }
+            "()": "logging.Formatter",
+            "fmt": "%(asctime)s %(levelname)s [%(name)s] %(message)s%(context)s",
+            "defaults": {"context": ""},
+        },
+        "json": {
+            "()": "weatherbot.logs.JSONFormatter",
+        },
+    },
+    "filters": {
+        "context": {"()": "weatherbot.logs.ContextFilter"},
+        "dedup": {"()": "weatherbot.logs.DuplicateFilter", "window": LOG_DEDUP_WINDOW_SECONDS},
     },
     "handlers": {
         "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "standard",
+            "formatter": "json" if LOG_FORMAT == "json" else "standard",
+            "filters": ["context", "dedup"],
+            **(
+                {"class": "weatherbot.logs.QueueLogHandler", "queue_size": LOG_QUEUE_SIZE}
+                if LOG_ASYNC
+                else {"class": "logging.StreamHandler"}
+            ),
         }
     },
     "root": {
@@ -113,15 +153,60 @@ LOGGING = {
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 WEATHER_API_BASE_URL = os.getenv("WEATHER_API_BASE_URL", "https://api.open-meteo.com/v1/forecast")
+# "auto" picks orjson when installed, "json" forces the stdlib, "orjson" requires it.
+JSON_CODEC = os.getenv("JSON_CODEC", "auto").lower()
 DEFAULT_REQUEST_TIMEOUT = int(os.getenv("DEFAULT_REQUEST_TIMEOUT", "15"))
+WEATHER_CACHE_TTL_SECONDS = int(os.getenv("WEATHER_CACHE_TTL_SECONDS", "1800"))
+# Snap coordinates to cells of this size before fetching/caching; 0 keeps per-point requests.
+WEATHER_GRID_STEP_DEGREES = float(os.getenv("WEATHER_GRID_STEP_DEGREES", "0"))
+WEATHER_STALE_MAX_AGE_SECONDS = int(os.getenv("WEATHER_STALE_MAX_AGE_SECONDS", "21600"))
+WEATHER_HEDGED_REQUESTS = os.getenv("WEATHER_HEDGED_REQUESTS", "True").lower() == "true"
+WEATHER_HEDGE_DELAY_SECONDS = float(os.getenv("WEATHER_HEDGE_DELAY_SECONDS", "3"))
 SCHEDULER_MISFIRE_GRACE_SECONDS = int(os.getenv("SCHEDULER_MISFIRE_GRACE_SECONDS", "21600"))
 SCHEDULER_STARTUP_CATCHUP = os.getenv("SCHEDULER_STARTUP_CATCHUP", "True").lower() == "true"
+MEMORY_SNAPSHOT_INTERVAL_MINUTES = int(os.getenv("MEMORY_SNAPSHOT_INTERVAL_MINUTES", "0"))
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "1"))
+MEMORY_TOP_ALLOCATIONS = int(os.getenv("MEMORY_TOP_ALLOCATIONS", "15"))
+MEMORY_RSS_WARNING_MB = int(os.getenv("MEMORY_RSS_WARNING_MB", "400"))
+SCHEDULER_LAG_WARNING_SECONDS = int(os.getenv("SCHEDULER_LAG_WARNING_SECONDS", "60"))
+# Whether /ready/ expects a run_scheduler heartbeat. entrypoint.sh `all` exports the value it resolved.
+ENABLE_INTERNAL_SCHEDULER = os.getenv("ENABLE_INTERNAL_SCHEDULER", "False").lower() == "true"
+READINESS_PROBE_INTERVAL_SECONDS = int(os.getenv("READINESS_PROBE_INTERVAL_SECONDS", "10"))
+READINESS_TELEGRAM_INTERVAL_SECONDS = int(os.getenv("READINESS_TELEGRAM_INTERVAL_SECONDS", "300"))
+READINESS_SCHEDULER_MAX_AGE_SECONDS = int(os.getenv("READINESS_SCHEDULER_MAX_AGE_SECONDS", "120"))
 CRON_SECRET_TOKEN = os.getenv("CRON_SECRET_TOKEN", "")
+PUBLISH_IDEMPOTENCY_TTL_SECONDS = int(os.getenv("PUBLISH_IDEMPOTENCY_TTL_SECONDS", "3600"))
+PUBLISH_IDEMPOTENCY_RUNNING_TIMEOUT_SECONDS = int(os.getenv("PUBLISH_IDEMPOTENCY_RUNNING_TIMEOUT_SECONDS", "900"))
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+BOT_MAX_WORKERS = int(os.getenv("BOT_MAX_WORKERS", "8"))
+BOT_QUEUE_SIZE = int(os.getenv("BOT_QUEUE_SIZE", "1000"))
+BOT_BATCH_WINDOW_SECONDS = float(os.getenv("BOT_BATCH_WINDOW_SECONDS", "0.5"))
+BOT_BATCH_MAX_SIZE = int(os.getenv("BOT_BATCH_MAX_SIZE", "200"))
+BOT_POLL_TIMEOUT_SECONDS = int(os.getenv("BOT_POLL_TIMEOUT_SECONDS", "30"))
 WEATHER_INCLUDE_CODE_IN_CAPTION = (
     os.getenv("WEATHER_INCLUDE_CODE_IN_CAPTION", "False").lower() == "true"
 )
-TEST_PUBLISH_EVERY_MINUTE = os.getenv("TEST_PUBLISH_EVERY_MINUTE", "False").lower() == "true"
+# The old TEST_PUBLISH_EVERY_MINUTE flag now runs the dry-run simulator instead of posting real messages.
+TEST_SIMULATE_EVERY_MINUTE = (
+    os.getenv("TEST_SIMULATE_EVERY_MINUTE", os.getenv("TEST_PUBLISH_EVERY_MINUTE", "False")).lower() == "true"
+)
+TEST_SIMULATE_CHANNELS = int(os.getenv("TEST_SIMULATE_CHANNELS", "50"))
 TEST_PUBLISH_FORECAST_TYPE = os.getenv("TEST_PUBLISH_FORECAST_TYPE", "today")
 ALLOW_DUPLICATE_PUBLICATIONS = (
     os.getenv("ALLOW_DUPLICATE_PUBLICATIONS", "False").lower() == "true"
 )
+ASYNC_PUBLISH_CONCURRENCY = int(os.getenv("ASYNC_PUBLISH_CONCURRENCY", "50"))
+PUBLISH_SHARDS = int(os.getenv("PUBLISH_SHARDS", "1"))
+PUBLICATION_REFRESH_INTERVAL_MINUTES = int(os.getenv("PUBLICATION_REFRESH_INTERVAL_MINUTES", "0"))
+PUBLICATION_REFRESH_BATCH_SIZE = int(os.getenv("PUBLICATION_REFRESH_BATCH_SIZE", "200"))
+TELEGRAM_EDIT_RATE_PER_SECOND = float(os.getenv("TELEGRAM_EDIT_RATE_PER_SECOND", "20"))
+CHANNEL_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CHANNEL_CIRCUIT_FAILURE_THRESHOLD", "3"))
+CHANNEL_CIRCUIT_COOLDOWN_MINUTES = int(os.getenv("CHANNEL_CIRCUIT_COOLDOWN_MINUTES", "30"))
+CHANNEL_DEACTIVATE_AFTER_FAILURES = int(os.getenv("CHANNEL_DEACTIVATE_AFTER_FAILURES", "3"))
+CHANNEL_VALIDATION_RATE_PER_SECOND = float(os.getenv("CHANNEL_VALIDATION_RATE_PER_SECOND", "20"))
+CHANNEL_VALIDATION_WORKERS = int(os.getenv("CHANNEL_VALIDATION_WORKERS", "8"))
+CHANNEL_PRIORITY_REFRESH_HOURS = int(os.getenv("CHANNEL_PRIORITY_REFRESH_HOURS", "0"))
+# Admin import and actions call Telegram inside the request only up to this many channels.
+CHANNEL_ADMIN_SYNC_LIMIT = int(os.getenv("CHANNEL_ADMIN_SYNC_LIMIT", "50"))
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv("ADMIN_ESTIMATED_COUNT_THRESHOLD", "100000"))
+LOG_EXPORT_CHUNK_SIZE = int(os.getenv("LOG_EXPORT_CHUNK_SIZE", "2000"))
@@ -4,7 +4,15 @@ from django.contrib import admin
 from django.http import JsonResponse
 from django.urls import path
 
-from weatherbot.views import home, internal_publish
+from weatherbot.views import (
+    home,
+    internal_logs_export,
+    internal_logs_stats,
+    internal_publish,
+    internal_publish_async,
+    readiness,
+    telegram_webhook,
+)
 
 
 def healthcheck(_request):
@@ -15,11 +23,20 @@ urlpatterns = [
     path("", home, name="home"),
     path("admin/", admin.site.urls),
     path("health/", healthcheck, name="healthcheck"),
+    path("ready/", readiness, name="readiness"),
     path(
         "internal/publish/<str:forecast_type>/",
         internal_publish,
         name="internal_publish",
     ),
+    path(
+        "internal/publish-async/<str:forecast_type>/",
+        internal_publish_async,
+        name="internal_publish_async",
+    ),
+    path("internal/logs/export/", internal_logs_export, name="internal_logs_export"),
+    path("internal/logs/stats/", internal_logs_stats, name="internal_logs_stats"),
+    path("telegram/webhook/", telegram_webhook, name="telegram_webhook"),
 ]
 
 if settings.DEBUG:
@@ -1,8 +1,23 @@
-from django.contrib import admin
-from django.shortcuts import redirect
-from django.urls import reverse
+from pathlib import Path
 
-from .models import BotConfig, Channel, City, PublicationLog, Schedule
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.db.models import Q
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.text import smart_split, unescape_string_literal
+
+from .channels import (
+    ChannelValidator,
+    deactivate_unreachable,
+    import_channels,
+    parse_channel_rows,
+    refresh_subscriber_counts,
+)
+from .models import BotConfig, Channel, City, PublicationLog, Schedule, SchedulerRun
+from .pagination import EstimatedCountPaginator
 
 admin.site.site_header = "Telegram Weather Publisher"
 admin.site.site_title = "Telegram Weather Publisher Admin"
@@ -11,16 +26,129 @@ admin.site.index_title = "Управление сервисом"
 
 @admin.register(City)
 class CityAdmin(admin.ModelAdmin):
-    list_display = ("name", "latitude", "longitude", "active")
+    list_display = ("name", "latitude", "longitude", "grid_cell", "active")
     list_filter = ("active",)
     search_fields = ("name",)
 
 
+class ChannelImportForm(forms.Form):
+    file = forms.FileField(label="Файл CSV или JSON")
+    validate = forms.BooleanField(label="Проверить через Telegram", required=False, initial=True)
+
+
 @admin.register(Channel)
 class ChannelAdmin(admin.ModelAdmin):
-    list_display = ("name", "chat_id", "active")
-    list_filter = ("active",)
+    list_display = (
+        "name",
+        "chat_id",
+        "language",
+        "active",
+        "priority",
+        "subscriber_count",
+        "consecutive_failures",
+        "last_error_code",
+        "circuit_open_until",
+    )
+    list_filter = ("active", "language", "auto_priority")
     search_fields = ("name", "chat_id")
+    readonly_fields = (
+        "subscriber_count",
+        "subscribers_updated_at",
+        "consecutive_failures",
+        "last_error_code",
+        "last_failure_at",
+        "circuit_open_until",
+    )
+    actions = ("validate_channels", "refresh_subscribers", "reset_health")
+    change_list_template = "admin/weatherbot/channel/change_list.html"
+
+    def get_urls(self):
+        urls = [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="weatherbot_channel_import",
+            )
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect("admin:weatherbot_channel_changelist")
+
+        form = ChannelImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                content = upload.read().decode("utf-8-sig")
+                rows = parse_channel_rows(content, Path(upload.name).suffix.lstrip(".").lower())
+                # Telegram checks run at the validation rate limit, so a large file would outlive the worker
+                # timeout; such files are inserted as is and checked by the validate_channels command.
+                deferred = form.cleaned_data["validate"] and len(rows) > settings.CHANNEL_ADMIN_SYNC_LIMIT
+                validator = ChannelValidator() if form.cleaned_data["validate"] and not deferred else None
+                result = import_channels(rows, validator)
+            except (UnicodeDecodeError, ValueError) as exc:
+                form.add_error("file", str(exc))
+            else:
+                self.message_user(
+                    request,
+                    f"Добавлено каналов: {result.created} (неактивных: {result.inactive}), "
+                    f"уже были: {result.existing}, отключено недоступных: {result.deactivated}",
+                    messages.SUCCESS,
+                )
+                if deferred:
+                    self._defer(request, len(rows), "python manage.py validate_channels")
+                return redirect("admin:weatherbot_channel_changelist")
+
+        context = {**self.admin_site.each_context(request), "opts": self.model._meta, "form": form}
+        return TemplateResponse(request, "admin/weatherbot/channel/import.html", context)
+
+    @admin.action(description="Обновить число подписчиков и приоритет")
+    def refresh_subscribers(self, request, queryset):
+        if queryset.count() > settings.CHANNEL_ADMIN_SYNC_LIMIT:
+            self._defer(request, queryset.count(), "python manage.py refresh_channel_priorities")
+            return
+        try:
+            updated = refresh_subscriber_counts(queryset)
+        except Exception as exc:  # noqa: BLE001
+            self.message_user(request, f"Обновление не выполнено: {exc}", messages.ERROR)
+            return
+        total = queryset.count()
+        self.message_user(
+            request,
+            f"Обновлено каналов: {updated} из {total}",
+            messages.WARNING if updated < total else messages.SUCCESS,
+        )
+
+    @admin.action(description="Сбросить счетчик ошибок и включить")
+    def reset_health(self, request, queryset):
+        updated = queryset.update(active=True, consecutive_failures=0, circuit_open_until=None)
+        self.message_user(request, f"Каналов включено: {updated}", messages.SUCCESS)
+
+    @admin.action(description="Проверить через Telegram и отключить недоступные")
+    def validate_channels(self, request, queryset):
+        if queryset.count() > settings.CHANNEL_ADMIN_SYNC_LIMIT:
+            self._defer(request, queryset.count(), "python manage.py validate_channels")
+            return
+        try:
+            deactivated, checks = deactivate_unreachable(queryset, ChannelValidator())
+        except Exception as exc:  # noqa: BLE001
+            self.message_user(request, f"Проверка не выполнена: {exc}", messages.ERROR)
+            return
+        unknown = sum(check.reachable is None for check in checks.values())
+        self.message_user(
+            request,
+            f"Проверено: {len(checks)}, отключено: {deactivated}, не удалось проверить: {unknown}",
+            messages.WARNING if deactivated or unknown else messages.SUCCESS,
+        )
+
+    def _defer(self, request, count: int, command: str) -> None:
+        self.message_user(
+            request,
+            f"Каналов {count}, больше {settings.CHANNEL_ADMIN_SYNC_LIMIT}: запросы к Telegram не выполнялись, "
+            f"чтобы не упереться в таймаут запроса. Запустите `{command}`.",
+            messages.WARNING,
+        )
 
 
 @admin.register(Schedule)
@@ -57,10 +185,15 @@ class PublicationLogAdmin(admin.ModelAdmin):
         "target_date",
         "success",
         "message_id",
+        "duration_ms",
         "created_at",
     )
-    list_filter = ("success", "forecast_type", "target_date")
+    list_filter = ("success", "forecast_type")
+    list_select_related = ("channel", "city")
+    date_hierarchy = "target_date"
     search_fields = ("channel__name", "channel__chat_id", "city__name", "error")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = (
         "channel",
         "city",
@@ -69,6 +202,48 @@ class PublicationLogAdmin(admin.ModelAdmin):
         "message_id",
         "success",
         "error",
+        "duration_ms",
+        "created_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        The default search ORs error__icontains with conditions on the joined channel and city tables, and
+        Postgres cannot use the error trigram index for such an OR: the log table is scanned in full. Channels
+        and cities are small, so matching ids are looked up first; the remaining OR is over log columns only
+        (channel_id, city_id, UPPER(error)) and each side has an index the planner can combine (BitmapOr).
+        """
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            channel_ids = list(
+                Channel.objects.filter(Q(name__icontains=bit) | Q(chat_id__icontains=bit)).values_list("pk", flat=True)
+            )
+            city_ids = list(City.objects.filter(name__icontains=bit).values_list("pk", flat=True))
+            queryset = queryset.filter(
+                Q(channel_id__in=channel_ids) | Q(city_id__in=city_ids) | Q(error__icontains=bit)
+            )
+        return queryset, False
+
+
+@admin.register(SchedulerRun)
+class SchedulerRunAdmin(admin.ModelAdmin):
+    list_display = ("job_id", "scheduled_at", "status", "trigger", "lag_ms", "duration_ms", "rss_kb", "rss_delta_kb")
+    list_filter = ("status", "trigger", "job_id")
+    readonly_fields = (
+        "job_id",
+        "trigger",
+        "status",
+        "scheduled_at",
+        "started_at",
+        "lag_ms",
+        "duration_ms",
+        "rss_kb",
+        "rss_delta_kb",
+        "error",
         "created_at",
     )
 
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class WeatherbotConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "weatherbot"
+
+    def ready(self) -> None:
+        from .db import configure_sqlite
+
+        connection_created.connect(configure_sqlite, dispatch_uid="weatherbot.configure_sqlite")
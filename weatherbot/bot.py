@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import queue
+import re
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .content import build_caption
+from .models import BotConfig, City, ForecastType
+from .publisher import FORECAST_WINDOWS
+
+if TYPE_CHECKING:
+    from .telegram_api import TelegramClient
+    from .weather_api import WeatherClient
+
+logger = logging.getLogger(__name__)
+
+WEATHER_COMMAND_RE = re.compile(r"^/weather(?:@\w+)?(?:\s+(?P<city>.+))?$", re.IGNORECASE | re.DOTALL)
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+@dataclass(frozen=True)
+class WeatherCommand:
+    chat_id: str
+    city_query: str
+
+
+def parse_update(update: dict) -> WeatherCommand | None:
+    message = update.get("message") or {}
+    text = (message.get("text") or "").strip()
+    chat_id = (message.get("chat") or {}).get("id")
+    if chat_id is None:
+        return None
+    match = WEATHER_COMMAND_RE.match(text)
+    if not match:
+        return None
+    return WeatherCommand(chat_id=str(chat_id), city_query=(match.group("city") or "").strip())
+
+
+def _split_messages(replies: list[str]) -> list[str]:
+    messages: list[str] = []
+    for reply in replies:
+        if messages and len(messages[-1]) + len(reply) + 2 <= TELEGRAM_MESSAGE_LIMIT:
+            messages[-1] = f"{messages[-1]}\n\n{reply}"
+        else:
+            messages.append(reply[:TELEGRAM_MESSAGE_LIMIT])
+    return messages
+
+
+class BotUpdateProcessor:
+    """
+    Answers /weather commands in batches: every distinct city is rendered once per batch
+    and all replies for one chat go out as a single message.
+    """
+
+    def __init__(
+        self,
+        telegram: TelegramClient | None = None,
+        weather: WeatherClient | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        if telegram is None:
+            from .telegram_api import TelegramClient
+
+            telegram = TelegramClient()
+        if weather is None:
+            from .weather_api import WeatherClient
+
+            weather = WeatherClient()
+        self.telegram = telegram
+        self.weather = weather
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.BOT_MAX_WORKERS,
+            thread_name_prefix="bot-worker",
+        )
+
+    def process(self, updates: list[dict]) -> int:
+        commands = [command for command in map(parse_update, updates) if command is not None]
+        if not commands:
+            return 0
+
+        queries = {command.city_query.casefold(): command.city_query for command in commands}
+        targets = self._resolve_targets(queries)
+        rendered = dict(zip(targets, self._executor.map(self._render_reply, targets.values())))
+
+        replies_by_chat: dict[str, list[str]] = {}
+        for command in commands:
+            reply = rendered[command.city_query.casefold()]
+            chat_replies = replies_by_chat.setdefault(command.chat_id, [])
+            if reply not in chat_replies:
+                chat_replies.append(reply)
+
+        futures = [
+            self._executor.submit(self._send, chat_id, message)
+            for chat_id, replies in replies_by_chat.items()
+            for message in _split_messages(replies)
+        ]
+        sent = sum(1 for future in futures if future.result())
+        logger.info(
+            "Bot batch processed updates=%s commands=%s cities=%s chats=%s sent=%s",
+            len(updates),
+            len(commands),
+            len(targets),
+            len(replies_by_chat),
+            sent,
+        )
+        return sent
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def _resolve_targets(queries: dict[str, str]) -> dict[str, tuple[str, City | None]]:
+        # City lookups stay on the calling thread. Workers still reach the database: get_forecast reads and
+        # writes ForecastSnapshot, see _render_reply.
+        default_city = None
+        if "" in queries:
+            config = BotConfig.get_solo()
+            default_city = config.default_city or City.objects.filter(active=True).first()
+
+        targets = {}
+        for key, query in queries.items():
+            if not query:
+                targets[key] = (default_city.name if default_city else "", default_city)
+            else:
+                targets[key] = (query, City.objects.filter(name__iexact=query).first())
+        return targets
+
+    def _render_reply(self, target: tuple[str, City | None]) -> str:
+        # Runs on an executor thread with its own connection, which no request cycle ever closes.
+        close_old_connections()
+        try:
+            return self._render(target)
+        finally:
+            close_old_connections()
+
+    def _render(self, target: tuple[str, City | None]) -> str:
+        city_name, city = target
+        if not city_name:
+            return "Укажите город: /weather <город>"
+
+        try:
+            if city is not None and city.latitude is not None and city.longitude is not None:
+                city_name, latitude, longitude = city.name, city.latitude, city.longitude
+            else:
+                geo = self.weather.geocode_city(city_name)
+                latitude, longitude = geo["latitude"], geo["longitude"]
+
+            window = FORECAST_WINDOWS[ForecastType.TODAY]
+            forecast = self.weather.get_forecast(
+                latitude,
+                longitude,
+                timezone.localdate(),
+                window.days,
+                daily_variables=window.daily_variables,
+            )
+        except ValueError as exc:
+            return str(exc)
+        except Exception:  # noqa: BLE001
+            logger.exception("Bot forecast failed city=%s", city_name)
+            return f"Не удалось получить прогноз для {city_name}"
+        return build_caption(city_name, ForecastType.TODAY, forecast)
+
+    def _send(self, chat_id: str, text: str) -> bool:
+        try:
+            self.telegram.send_message(chat_id, text)
+        except Exception:  # noqa: BLE001
+            logger.exception("Bot reply failed chat_id=%s", chat_id)
+            return False
+        return True
+
+
+class UpdateDispatcher:
+    """Bounded queue between the webhook view and a background batching thread."""
+
+    def __init__(self, processor: BotUpdateProcessor | None = None) -> None:
+        self._processor = processor
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=settings.BOT_QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, update: dict) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(update)
+        except queue.Full:
+            logger.warning("Bot update queue is full, rejecting update_id=%s", update.get("update_id"))
+            return False
+        return True
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="bot-dispatcher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        if self._processor is None:
+            self._processor = BotUpdateProcessor()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + settings.BOT_BATCH_WINDOW_SECONDS
+            try:
+                while len(batch) < settings.BOT_BATCH_MAX_SIZE:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                pass
+
+            try:
+                self._processor.process(batch)
+            except Exception:  # noqa: BLE001
+                logger.exception("Bot batch failed size=%s", len(batch))
+            finally:
+                close_old_connections()
+
+
+_dispatcher: UpdateDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_update_dispatcher() -> UpdateDispatcher:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = UpdateDispatcher()
+        return _dispatcher
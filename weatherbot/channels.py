@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from dataclasses import dataclass
+import io
+import logging
+from typing import TYPE_CHECKING, Iterable
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import codec
+from .models import Channel
+from .throttling import RateLimiter
+
+if TYPE_CHECKING:
+    from .telegram_api import TelegramClient
+
+logger = logging.getLogger(__name__)
+
+# Statuses that allow the bot to post into a channel or group.
+POSTING_MEMBER_STATUSES = {"creator", "administrator", "member"}
+
+
+@dataclass(frozen=True)
+class ChannelRow:
+    chat_id: str
+    name: str = ""
+
+
+@dataclass(frozen=True)
+class ChannelCheck:
+    chat_id: str
+    reachable: bool | None  # None: transient error, the channel is left as is
+    title: str = ""
+    reason: str = ""
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    existing: int = 0
+    inactive: int = 0
+    deactivated: int = 0
+
+
+def parse_channel_rows(content: str, file_format: str) -> list[ChannelRow]:
+    """CSV with a chat_id column (name optional) or JSON: a list of chat ids or of {chat_id, name} objects."""
+    if file_format == "json":
+        items = codec.loads(content)
+        if not isinstance(items, list):
+            raise ValueError("JSON must be a list of channels")
+        records = [item if isinstance(item, dict) else {"chat_id": item} for item in items]
+    elif file_format == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        if "chat_id" not in (reader.fieldnames or []):
+            raise ValueError("CSV must have a chat_id column")
+        records = list(reader)
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+    rows = {}
+    for record in records:
+        chat_id = str(record.get("chat_id") or "").strip()
+        if chat_id:
+            rows.setdefault(chat_id, ChannelRow(chat_id, str(record.get("name") or "").strip()))
+    return list(rows.values())
+
+
+class ChannelValidator:
+    """Checks chats concurrently with getChat + getChatMember(bot), throttled by one shared token bucket."""
+
+    def __init__(self, telegram: TelegramClient | None = None, max_workers: int | None = None) -> None:
+        if telegram is None:
+            from .telegram_api import TelegramClient
+
+            telegram = TelegramClient()
+        self.telegram = telegram
+        self.max_workers = max_workers or settings.CHANNEL_VALIDATION_WORKERS
+        self.limiter = RateLimiter(settings.CHANNEL_VALIDATION_RATE_PER_SECOND)
+        self._bot_id = None
+
+    def validate(self, chat_ids: Iterable[str]) -> dict[str, ChannelCheck]:
+        chat_ids = list(chat_ids)
+        if not chat_ids:
+            return {}
+        self._bot_id = self.telegram.get_me()["id"]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="channel-check") as executor:
+            checks = list(executor.map(self._check, chat_ids))
+        return {check.chat_id: check for check in checks}
+
+    def _check(self, chat_id: str) -> ChannelCheck:
+        from .telegram_api import TelegramAPIError
+
+        try:
+            self.limiter.acquire()
+            chat = self.telegram.get_chat(chat_id)
+            self.limiter.acquire()
+            member = self.telegram.get_chat_member(chat_id, self._bot_id)
+        except TelegramAPIError as exc:
+            if exc.is_chat_unreachable:
+                return ChannelCheck(chat_id, False, reason=exc.description)
+            logger.warning("Channel check failed chat_id=%s error=%s", chat_id, exc)
+            return ChannelCheck(chat_id, None, reason=exc.description)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Channel check failed chat_id=%s error=%s", chat_id, exc)
+            return ChannelCheck(chat_id, None, reason=str(exc))
+
+        title = chat.get("title") or chat.get("username") or ""
+        status = member.get("status", "")
+        if status not in POSTING_MEMBER_STATUSES:
+            return ChannelCheck(chat_id, False, title, f"bot status is {status or 'unknown'}")
+        return ChannelCheck(chat_id, True, title)
+
+
+def import_channels(rows: list[ChannelRow], validator: ChannelValidator | None = None) -> ImportResult:
+    """
+    Inserts new channels with bulk_create(ignore_conflicts=True). With a validator, unreachable
+    chats are created inactive and already known ones are deactivated.
+    """
+    checks = validator.validate(row.chat_id for row in rows) if validator else {}
+    result = ImportResult()
+
+    chat_ids = [row.chat_id for row in rows]
+    existing = set(Channel.objects.filter(chat_id__in=chat_ids).values_list("chat_id", flat=True))
+    new_channels = []
+    for row in rows:
+        if row.chat_id in existing:
+            result.existing += 1
+            continue
+        check = checks.get(row.chat_id)
+        active = check is None or check.reachable is not False
+        result.inactive += not active
+        name = row.name or (check.title if check else "") or row.chat_id
+        new_channels.append(Channel(chat_id=row.chat_id, name=name[:120], active=active))
+
+    Channel.objects.bulk_create(new_channels, batch_size=500, ignore_conflicts=True)
+    result.created = len(new_channels)
+
+    unreachable = [chat_id for chat_id, check in checks.items() if check.reachable is False and chat_id in existing]
+    if unreachable:
+        result.deactivated = Channel.objects.filter(chat_id__in=unreachable, active=True).update(active=False)
+    logger.info(
+        "Channels imported created=%s existing=%s inactive=%s deactivated=%s",
+        result.created,
+        result.existing,
+        result.inactive,
+        result.deactivated,
+    )
+    return result
+
+
+def deactivate_unreachable(channels: Iterable[Channel], validator: ChannelValidator) -> tuple[int, dict]:
+    checks = validator.validate(channel.chat_id for channel in channels)
+    unreachable = [chat_id for chat_id, check in checks.items() if check.reachable is False]
+    deactivated = Channel.objects.filter(chat_id__in=unreachable, active=True).update(active=False)
+    if deactivated:
+        logger.info("Deactivated unreachable channels count=%s", deactivated)
+    return deactivated, checks
+
+
+def refresh_subscriber_counts(channels: Iterable[Channel], telegram: TelegramClient | None = None) -> int:
+    """
+    Stores getChatMemberCount for each channel and, for auto_priority channels, uses it as the priority.
+    Shares the validation rate limit and worker count; channels that fail to answer keep their old values.
+    """
+    if telegram is None:
+        from .telegram_api import TelegramClient
+
+        telegram = TelegramClient()
+    limiter = RateLimiter(settings.CHANNEL_VALIDATION_RATE_PER_SECOND)
+
+    def count(channel: Channel) -> int | None:
+        try:
+            limiter.acquire()
+            return telegram.get_chat_member_count(channel.chat_id)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Subscriber count failed chat_id=%s error=%s", channel.chat_id, exc)
+            return None
+
+    channels = list(channels)
+    workers = settings.CHANNEL_VALIDATION_WORKERS
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="channel-count") as executor:
+        counts = list(executor.map(count, channels))
+
+    now = timezone.now()
+    updated = []
+    for channel, subscribers in zip(channels, counts):
+        if subscribers is None:
+            continue
+        channel.subscriber_count = subscribers
+        channel.subscribers_updated_at = now
+        if channel.auto_priority:
+            channel.priority = subscribers
+        updated.append(channel)
+    Channel.objects.bulk_update(updated, ["subscriber_count", "subscribers_updated_at", "priority"], batch_size=500)
+    logger.info("Subscriber counts refreshed updated=%s failed=%s", len(updated), len(channels) - len(updated))
+    return len(updated)
@@ -0,0 +1,79 @@
+"""
+JSON encoding/decoding for upstream API traffic and the JSON views.
+
+orjson is used when installed (JSON_CODEC=auto) and the stdlib json module otherwise; both backends
+accept and produce the same documents, byte for byte except for exponent floats (1e+16 and 1e16 parse alike).
+Errors raised by loads() are ValueError subclasses either way.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import json
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+# requests and httpx already offer gzip by default; pinning the header keeps that independent of client
+# defaults and of whichever optional decoders (brotli, zstd) happen to be installed.
+ACCEPT_ENCODING = {"Accept-Encoding": "gzip, deflate"}
+
+
+@dataclass(frozen=True)
+class JSONCodec:
+    name: str
+    loads: Callable[[bytes | str], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+STDLIB_CODEC = JSONCodec("json", json.loads, _stdlib_dumps)
+
+
+def _orjson_codec() -> JSONCodec | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    encoder = DjangoJSONEncoder()
+
+    def dumps(value: Any) -> bytes:
+        # Dates, times, Decimal and lazy strings go through Django: orjson would keep microseconds where
+        # DjangoJSONEncoder truncates them to milliseconds.
+        return orjson.dumps(value, default=encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+    return JSONCodec("orjson", orjson.loads, dumps)
+
+
+@lru_cache(maxsize=None)
+def get_codec(name: str) -> JSONCodec:
+    if name == "json":
+        return STDLIB_CODEC
+    codec = _orjson_codec()
+    if codec is None:
+        if name == "orjson":
+            raise ImportError("JSON_CODEC=orjson but orjson is not installed")
+        return STDLIB_CODEC
+    return codec
+
+
+def loads(data: bytes | str) -> Any:
+    return get_codec(settings.JSON_CODEC).loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    return get_codec(settings.JSON_CODEC).dumps(value)
+
+
+class JSONResponse(HttpResponse):
+    """JsonResponse counterpart that serializes through the configured codec."""
+
+    def __init__(self, data: Any, **kwargs) -> None:
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
@@ -4,8 +4,9 @@ from pathlib import Path
 
 from django.conf import settings
 
+from .forecast import DayForecast, DayPartForecast
+from .i18n import CAPTION_STRINGS, DAY_PART_TITLES, DEFAULT_LANGUAGE, FORECAST_TITLES, weather_label
 from .models import ForecastType
-from .weather_api import DayForecast
 
 VIDEO_BY_WEATHER = {
     "sunny": "sunny.mp4",
@@ -15,11 +16,7 @@ VIDEO_BY_WEATHER = {
     "thunderstorm": "thunderstorm.mp4",
 }
 
-TITLE_BY_FORECAST = {
-    ForecastType.TODAY: "Сегодня",
-    ForecastType.TOMORROW: "Завтра",
-    ForecastType.THREE_DAYS: "Ближайшие 3 дня",
-}
+SINGLE_DAY_FORECASTS = {ForecastType.TODAY, ForecastType.TOMORROW, ForecastType.HOURLY}
 
 WEATHER_TYPE_PRIORITY = {
     "thunderstorm": 5,
@@ -33,50 +30,77 @@ WEATHER_TYPE_PRIORITY = {
 def choose_visual_weather_type(forecast_type: str, forecast: list[DayForecast]) -> str:
     if not forecast:
         return "cloudy"
-    if forecast_type in {ForecastType.TODAY, ForecastType.TOMORROW}:
+    if forecast_type in SINGLE_DAY_FORECASTS:
         return forecast[0].weather_type
     return max(forecast, key=lambda day: WEATHER_TYPE_PRIORITY.get(day.weather_type, 0)).weather_type
 
 
-def _format_description(day: DayForecast) -> str:
+def _format_description(day: DayForecast | DayPartForecast, language: str) -> str:
+    label = weather_label(day.weather_code, language)
     if settings.WEATHER_INCLUDE_CODE_IN_CAPTION:
-        return f"{day.weather_label_ru} (код: {day.weather_code})"
-    return day.weather_label_ru
+        return f"{label} ({CAPTION_STRINGS[language]['code']}: {day.weather_code})"
+    return label
 
 
-def _format_extra_metrics(day: DayForecast) -> list[str]:
+def _format_extra_metrics(day: DayForecast, language: str) -> list[str]:
+    strings = CAPTION_STRINGS[language]
     lines = []
     if day.humidity_mean is not None:
-        lines.append(f"Влажность: {round(day.humidity_mean)}%")
+        lines.append(strings["humidity"].format(value=round(day.humidity_mean)))
     if day.wind_speed_max is not None:
-        lines.append(f"Ветер: до {round(day.wind_speed_max)} км/ч")
+        lines.append(strings["wind"].format(value=round(day.wind_speed_max)))
     if day.precipitation_probability_max is not None:
-        lines.append(f"Осадки: {round(day.precipitation_probability_max)}%")
+        lines.append(strings["precipitation"].format(value=round(day.precipitation_probability_max)))
     return lines
 
 
-def build_caption(city_name: str, forecast_type: str, forecast: list[DayForecast]) -> str:
-    title = TITLE_BY_FORECAST[forecast_type]
+def build_caption(
+    city_name: str, forecast_type: str, forecast: list[DayForecast], language: str = DEFAULT_LANGUAGE
+) -> str:
+    strings = CAPTION_STRINGS[language]
+    header = strings["header"].format(city=city_name)
+    title = FORECAST_TITLES[language][forecast_type]
+
+    if forecast_type == ForecastType.HOURLY:
+        day = forecast[0]
+        lines = [
+            header,
+            "",
+            f"{title}:",
+            f"{strings['temperature']}: {round(day.temp_min)}..{round(day.temp_max)}°C",
+        ]
+        for part in day.parts:
+            line = (
+                f"{DAY_PART_TITLES[language][part.name]}: "
+                f"{round(part.temp_min)}..{round(part.temp_max)}°C, {_format_description(part, language)}"
+            )
+            if part.precipitation_probability_max is not None:
+                precipitation = strings["precipitation_short"].format(value=round(part.precipitation_probability_max))
+                line = f"{line}; {precipitation}"
+            lines.append(line)
+        lines.extend(_format_extra_metrics(day, language))
+        lines.extend(["", strings["closing_day"]])
+        return "\n".join(lines)
 
     if forecast_type in {ForecastType.TODAY, ForecastType.TOMORROW}:
         day = forecast[0]
         return (
-            f"🌤 Погода в {city_name}\n\n"
+            f"{header}\n\n"
             f"{title}:\n"
-            f"Температура: {round(day.temp_min)}..{round(day.temp_max)}°C\n"
-            f"Описание: {_format_description(day)}\n"
-            f"{chr(10).join(_format_extra_metrics(day))}\n\n"
-            "Хорошего дня ☀️"
+            f"{strings['temperature']}: {round(day.temp_min)}..{round(day.temp_max)}°C\n"
+            f"{strings['description']}: {_format_description(day, language)}\n"
+            f"{chr(10).join(_format_extra_metrics(day, language))}\n\n"
+            f"{strings['closing_day']}"
         )
 
-    lines = [f"🌤 Погода в {city_name}", "", f"{title}:"]
+    lines = [header, "", f"{title}:"]
     for day in forecast:
-        line = f"{day.date}: {round(day.temp_min)}..{round(day.temp_max)}°C, {_format_description(day)}"
-        extras = _format_extra_metrics(day)
+        line = f"{day.date}: {round(day.temp_min)}..{round(day.temp_max)}°C, {_format_description(day, language)}"
+        extras = _format_extra_metrics(day, language)
         if extras:
             line = f"{line}; " + ", ".join(extras)
         lines.append(line)
-    lines.extend(["", "Отличной погоды ☀️"])
+    lines.extend(["", strings["closing_period"]])
     return "\n".join(lines)
 
 
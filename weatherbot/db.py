@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def configure_sqlite(sender, connection, **kwargs) -> None:  # noqa: ARG001
+    """connection_created hook for the "concurrent" SQLite profile: readers no longer block the writer."""
+    if connection.vendor != "sqlite" or settings.SQLITE_PROFILE != "concurrent":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        journal_mode = cursor.fetchone()[0]
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    logger.debug("SQLite connection configured journal_mode=%s", journal_mode)
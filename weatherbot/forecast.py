@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+import logging
+from typing import Collection, List
+
+logger = logging.getLogger(__name__)
+
+
+WEATHER_TYPE_BY_CODE = {
+    0: "sunny",
+    1: "cloudy",
+    2: "cloudy",
+    3: "cloudy",
+    45: "cloudy",
+    48: "cloudy",
+    51: "rain",
+    53: "rain",
+    55: "rain",
+    56: "rain",
+    57: "rain",
+    61: "rain",
+    63: "rain",
+    65: "rain",
+    66: "rain",
+    67: "rain",
+    71: "snow",
+    73: "snow",
+    75: "snow",
+    77: "snow",
+    80: "rain",
+    81: "rain",
+    82: "rain",
+    85: "snow",
+    86: "snow",
+    95: "thunderstorm",
+    96: "thunderstorm",
+    99: "thunderstorm",
+}
+
+CORE_DAILY_VARIABLES = ("weather_code", "temperature_2m_max", "temperature_2m_min")
+EXTRA_DAILY_VARIABLES = (
+    "relative_humidity_2m_mean",
+    "wind_speed_10m_max",
+    "precipitation_probability_max",
+)
+DAILY_VARIABLES = CORE_DAILY_VARIABLES + EXTRA_DAILY_VARIABLES
+HOURLY_VARIABLES = ("temperature_2m", "weather_code", "precipitation_probability")
+# DayForecast attribute filled from each optional daily variable.
+FIELD_BY_DAILY_VARIABLE = {
+    "relative_humidity_2m_mean": "humidity_mean",
+    "wind_speed_10m_max": "wind_speed_max",
+    "precipitation_probability_max": "precipitation_probability_max",
+}
+
+# (name, first hour, last hour) in the location's local time.
+DAY_PARTS = (
+    ("morning", 6, 11),
+    ("afternoon", 12, 17),
+    ("evening", 18, 23),
+)
+
+RUS_WEATHER_LABEL = {
+    "sunny": "ясно",
+    "cloudy": "облачно",
+    "rain": "дождь",
+    "snow": "снег",
+    "thunderstorm": "гроза",
+}
+
+
+def weather_type_for_code(weather_code: int) -> str:
+    weather_type = WEATHER_TYPE_BY_CODE.get(weather_code)
+    if weather_type is None:
+        logger.warning("Unknown weather code=%s, fallback to 'cloudy'", weather_code)
+        return "cloudy"
+    return weather_type
+
+
+@dataclass
+class DayPartForecast:
+    name: str
+    temp_min: float
+    temp_max: float
+    weather_code: int
+    precipitation_probability_max: float | None = None
+
+    @property
+    def weather_type(self) -> str:
+        return weather_type_for_code(self.weather_code)
+
+    @property
+    def weather_label_ru(self) -> str:
+        return RUS_WEATHER_LABEL[self.weather_type]
+
+
+@dataclass
+class DayForecast:
+    date: str
+    temp_min: float
+    temp_max: float
+    weather_code: int
+    humidity_mean: float | None = None
+    wind_speed_max: float | None = None
+    precipitation_probability_max: float | None = None
+    parts: list[DayPartForecast] = field(default_factory=list)
+
+    @property
+    def weather_type(self) -> str:
+        return weather_type_for_code(self.weather_code)
+
+    @property
+    def weather_label_ru(self) -> str:
+        return RUS_WEATHER_LABEL[self.weather_type]
+
+
+def restrict_day(day: DayForecast, daily_variables: Collection[str], hourly: bool) -> DayForecast:
+    """The day as a fetch of exactly these variables would have returned it, whatever the cache held."""
+    cleared = {name: None for variable, name in FIELD_BY_DAILY_VARIABLE.items() if variable not in daily_variables}
+    if not hourly:
+        cleared["parts"] = []
+    return replace(day, **cleared) if cleared else day
+
+
+def parse_forecast_payload(payload: dict) -> List[DayForecast]:
+    daily = payload.get("daily", {})
+    dates = daily.get("time", [])
+    temp_max = daily.get("temperature_2m_max", [])
+    temp_min = daily.get("temperature_2m_min", [])
+    weather_codes = daily.get("weather_code") or daily.get("weathercode", [])
+    humidity_mean = daily.get("relative_humidity_2m_mean", [])
+    wind_speed_max = daily.get("wind_speed_10m_max", [])
+    precipitation_probability_max = daily.get("precipitation_probability_max", [])
+    parts_by_date = _parse_day_parts(payload.get("hourly") or {})
+
+    forecast = []
+    for index, day_date in enumerate(dates):
+        try:
+            forecast.append(
+                DayForecast(
+                    date=day_date,
+                    temp_min=temp_min[index],
+                    temp_max=temp_max[index],
+                    weather_code=weather_codes[index],
+                    humidity_mean=humidity_mean[index] if index < len(humidity_mean) else None,
+                    wind_speed_max=wind_speed_max[index] if index < len(wind_speed_max) else None,
+                    precipitation_probability_max=(
+                        precipitation_probability_max[index]
+                        if index < len(precipitation_probability_max)
+                        else None
+                    ),
+                    parts=parts_by_date.get(day_date, []),
+                )
+            )
+        except IndexError:
+            logger.warning("Incomplete weather payload for date=%s", day_date)
+    return forecast
+
+
+def _parse_day_parts(hourly: dict) -> dict[str, list[DayPartForecast]]:
+    times = hourly.get("time", [])
+    temperatures = hourly.get("temperature_2m", [])
+    weather_codes = hourly.get("weather_code", [])
+    precipitation = hourly.get("precipitation_probability", [])
+
+    buckets: dict[tuple[str, str], list[int]] = {}
+    for index, timestamp in enumerate(times):
+        if index >= len(temperatures) or index >= len(weather_codes):
+            break
+        day_date, _, clock = timestamp.partition("T")
+        hour = int(clock[:2] or 0)
+        for name, first_hour, last_hour in DAY_PARTS:
+            if first_hour <= hour <= last_hour:
+                buckets.setdefault((day_date, name), []).append(index)
+                break
+
+    parts_by_date: dict[str, list[DayPartForecast]] = {}
+    for (day_date, name), indexes in buckets.items():
+        temps = [temperatures[index] for index in indexes if temperatures[index] is not None]
+        codes = [weather_codes[index] for index in indexes if weather_codes[index] is not None]
+        probabilities = [
+            precipitation[index]
+            for index in indexes
+            if index < len(precipitation) and precipitation[index] is not None
+        ]
+        if not temps or not codes:
+            continue
+        parts_by_date.setdefault(day_date, []).append(
+            DayPartForecast(
+                name=name,
+                temp_min=min(temps),
+                temp_max=max(temps),
+                weather_code=max(codes),
+                precipitation_probability_max=max(probabilities) if probabilities else None,
+            )
+        )
+
+    part_order = {name: position for position, (name, _first, _last) in enumerate(DAY_PARTS)}
+    for parts in parts_by_date.values():
+        parts.sort(key=lambda part: part_order[part.name])
+    return parts_by_date
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import math
+
+from django.conf import settings
+
+# Guards floor() against 51.2 / 0.1 == 511.99999999999994.
+_EPSILON = 1e-9
+
+
+def snap_to_grid(latitude: float, longitude: float, step: float | None = None) -> tuple[float, float]:
+    """
+    Centre of the WEATHER_GRID_STEP_DEGREES cell containing the point. Open-Meteo answers from its model
+    grid anyway, so every city inside one cell can share a single request and cache entry. With a step of 0
+    (the default) the point itself is kept.
+    """
+    step = settings.WEATHER_GRID_STEP_DEGREES if step is None else step
+    if step > 0:
+        latitude = (math.floor(latitude / step + _EPSILON) + 0.5) * step
+        longitude = (math.floor(longitude / step + _EPSILON) + 0.5) * step
+    # The centre of a cell on the pole or the antimeridian lies past it.
+    return round(min(max(latitude, -90.0), 90.0), 4), round(min(max(longitude, -180.0), 180.0), 4)
+
+
+def grid_cell(latitude: float | None, longitude: float | None) -> str:
+    if latitude is None or longitude is None:
+        return ""
+    cell_latitude, cell_longitude = snap_to_grid(latitude, longitude)
+    return f"{cell_latitude:.4f},{cell_longitude:.4f}"
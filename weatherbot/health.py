@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Channel
+
+logger = logging.getLogger(__name__)
+
+MAX_COOLDOWN_DOUBLINGS = 6
+
+
+def is_permanent_failure(exc: Exception) -> bool:
+    """403 and chat-level 400s from Telegram (chat not found, bot kicked); everything else is transient."""
+    from .telegram_api import TelegramAPIError
+
+    return isinstance(exc, TelegramAPIError) and exc.is_chat_unreachable
+
+
+def circuit_is_open(channel: Channel) -> bool:
+    """Open until circuit_open_until; afterwards the channel is half-open and gets one probe."""
+    return channel.circuit_open_until is not None and channel.circuit_open_until > timezone.now()
+
+
+def needs_probe(channel: Channel) -> bool:
+    return channel.circuit_open_until is not None and not circuit_is_open(channel)
+
+
+def record_success(channel: Channel) -> None:
+    if not channel.consecutive_failures and channel.circuit_open_until is None:
+        return
+    logger.info("Channel recovered chat_id=%s after failures=%s", channel.chat_id, channel.consecutive_failures)
+    channel.consecutive_failures = 0
+    channel.circuit_open_until = None
+    Channel.objects.filter(pk=channel.pk).update(consecutive_failures=0, circuit_open_until=None)
+
+
+def record_failure(channel: Channel, exc: Exception) -> None:
+    permanent = is_permanent_failure(exc)
+    now = timezone.now()
+    channel.consecutive_failures += 1
+    channel.last_error_code = getattr(exc, "error_code", None)
+    channel.last_failure_at = now
+
+    if permanent or channel.consecutive_failures >= settings.CHANNEL_CIRCUIT_FAILURE_THRESHOLD:
+        doublings = min(channel.consecutive_failures - 1, MAX_COOLDOWN_DOUBLINGS)
+        cooldown = timedelta(minutes=settings.CHANNEL_CIRCUIT_COOLDOWN_MINUTES * 2**doublings)
+        channel.circuit_open_until = now + cooldown
+    if permanent and channel.consecutive_failures >= settings.CHANNEL_DEACTIVATE_AFTER_FAILURES:
+        channel.active = False
+        logger.warning(
+            "Channel deactivated chat_id=%s failures=%s error_code=%s",
+            channel.chat_id,
+            channel.consecutive_failures,
+            channel.last_error_code,
+        )
+
+    Channel.objects.filter(pk=channel.pk).update(
+        consecutive_failures=channel.consecutive_failures,
+        last_error_code=channel.last_error_code,
+        last_failure_at=now,
+        circuit_open_until=channel.circuit_open_until,
+        active=channel.active,
+    )
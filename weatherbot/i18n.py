@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from .forecast import weather_type_for_code
+from .models import ForecastType, Language
+
+DEFAULT_LANGUAGE = Language.RU
+
+WEATHER_LABELS = {
+    Language.RU: {
+        0: "ясно",
+        1: "преимущественно ясно",
+        2: "переменная облачность",
+        3: "пасмурно",
+        45: "туман",
+        48: "туман с изморозью",
+        51: "слабая морось",
+        53: "морось",
+        55: "сильная морось",
+        56: "слабая ледяная морось",
+        57: "сильная ледяная морось",
+        61: "небольшой дождь",
+        63: "дождь",
+        65: "сильный дождь",
+        66: "слабый ледяной дождь",
+        67: "сильный ледяной дождь",
+        71: "небольшой снег",
+        73: "снег",
+        75: "сильный снег",
+        77: "снежная крупа",
+        80: "небольшой ливень",
+        81: "ливень",
+        82: "сильный ливень",
+        85: "небольшой снегопад",
+        86: "сильный снегопад",
+        95: "гроза",
+        96: "гроза с небольшим градом",
+        99: "гроза с сильным градом",
+    },
+    Language.EN: {
+        0: "clear sky",
+        1: "mainly clear",
+        2: "partly cloudy",
+        3: "overcast",
+        45: "fog",
+        48: "depositing rime fog",
+        51: "light drizzle",
+        53: "drizzle",
+        55: "dense drizzle",
+        56: "light freezing drizzle",
+        57: "dense freezing drizzle",
+        61: "light rain",
+        63: "rain",
+        65: "heavy rain",
+        66: "light freezing rain",
+        67: "heavy freezing rain",
+        71: "light snow",
+        73: "snow",
+        75: "heavy snow",
+        77: "snow grains",
+        80: "light rain showers",
+        81: "rain showers",
+        82: "violent rain showers",
+        85: "light snow showers",
+        86: "heavy snow showers",
+        95: "thunderstorm",
+        96: "thunderstorm with light hail",
+        99: "thunderstorm with heavy hail",
+    },
+    Language.KK: {
+        0: "ашық",
+        1: "негізінен ашық",
+        2: "ауыспалы бұлтты",
+        3: "бұлыңғыр",
+        45: "тұман",
+        48: "қырау тұман",
+        51: "әлсіз сіркіреме",
+        53: "сіркіреме",
+        55: "қатты сіркіреме",
+        56: "әлсіз мұзды сіркіреме",
+        57: "қатты мұзды сіркіреме",
+        61: "аздаған жаңбыр",
+        63: "жаңбыр",
+        65: "қатты жаңбыр",
+        66: "әлсіз мұзды жаңбыр",
+        67: "қатты мұзды жаңбыр",
+        71: "аздаған қар",
+        73: "қар",
+        75: "қалың қар",
+        77: "қар түйіршіктері",
+        80: "аздаған нөсер",
+        81: "нөсер",
+        82: "қатты нөсер",
+        85: "аздаған қар жауыны",
+        86: "қатты қар жауыны",
+        95: "найзағай",
+        96: "аздаған бұршақты найзағай",
+        99: "қатты бұршақты найзағай",
+    },
+}
+
+# Fallback for codes Open-Meteo may add later.
+WEATHER_TYPE_LABELS = {
+    Language.RU: {"sunny": "ясно", "cloudy": "облачно", "rain": "дождь", "snow": "снег", "thunderstorm": "гроза"},
+    Language.EN: {"sunny": "clear", "cloudy": "cloudy", "rain": "rain", "snow": "snow", "thunderstorm": "thunderstorm"},
+    Language.KK: {"sunny": "ашық", "cloudy": "бұлтты", "rain": "жаңбыр", "snow": "қар", "thunderstorm": "найзағай"},
+}
+
+FORECAST_TITLES = {
+    Language.RU: {
+        ForecastType.TODAY: "Сегодня",
+        ForecastType.TOMORROW: "Завтра",
+        ForecastType.THREE_DAYS: "Ближайшие 3 дня",
+        ForecastType.HOURLY: "Сегодня по времени суток",
+        ForecastType.WEEK: "Ближайшие 7 дней",
+    },
+    Language.EN: {
+        ForecastType.TODAY: "Today",
+        ForecastType.TOMORROW: "Tomorrow",
+        ForecastType.THREE_DAYS: "Next 3 days",
+        ForecastType.HOURLY: "Today by time of day",
+        ForecastType.WEEK: "Next 7 days",
+    },
+    Language.KK: {
+        ForecastType.TODAY: "Бүгін",
+        ForecastType.TOMORROW: "Ертең",
+        ForecastType.THREE_DAYS: "Алдағы 3 күн",
+        ForecastType.HOURLY: "Бүгін тәулік бөліктері бойынша",
+        ForecastType.WEEK: "Алдағы 7 күн",
+    },
+}
+
+DAY_PART_TITLES = {
+    Language.RU: {"morning": "Утро", "afternoon": "День", "evening": "Вечер"},
+    Language.EN: {"morning": "Morning", "afternoon": "Afternoon", "evening": "Evening"},
+    Language.KK: {"morning": "Таңертең", "afternoon": "Күндіз", "evening": "Кешке"},
+}
+
+CAPTION_STRINGS = {
+    Language.RU: {
+        "header": "🌤 Погода в {city}",
+        "temperature": "Температура",
+        "description": "Описание",
+        "code": "код",
+        "humidity": "Влажность: {value}%",
+        "wind": "Ветер: до {value} км/ч",
+        "precipitation": "Осадки: {value}%",
+        "precipitation_short": "осадки {value}%",
+        "closing_day": "Хорошего дня ☀️",
+        "closing_period": "Отличной погоды ☀️",
+    },
+    Language.EN: {
+        "header": "🌤 Weather in {city}",
+        "temperature": "Temperature",
+        "description": "Conditions",
+        "code": "code",
+        "humidity": "Humidity: {value}%",
+        "wind": "Wind: up to {value} km/h",
+        "precipitation": "Precipitation: {value}%",
+        "precipitation_short": "precipitation {value}%",
+        "closing_day": "Have a nice day ☀️",
+        "closing_period": "Enjoy the weather ☀️",
+    },
+    Language.KK: {
+        "header": "🌤 {city} ауа райы",
+        "temperature": "Температура",
+        "description": "Сипаттама",
+        "code": "код",
+        "humidity": "Ылғалдылық: {value}%",
+        "wind": "Жел: {value} км/сағ дейін",
+        "precipitation": "Жауын-шашын: {value}%",
+        "precipitation_short": "жауын-шашын {value}%",
+        "closing_day": "Күніңіз сәтті өтсін ☀️",
+        "closing_period": "Ауа райы жақсы болсын ☀️",
+    },
+}
+
+
+def weather_label(weather_code: int, language: str = DEFAULT_LANGUAGE) -> str:
+    label = WEATHER_LABELS[language].get(weather_code)
+    if label is None:
+        return WEATHER_TYPE_LABELS[language][weather_type_for_code(weather_code)]
+    return label
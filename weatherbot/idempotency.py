@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import PublishRequest
+
+logger = logging.getLogger(__name__)
+
+RETENTION = timedelta(days=7)
+CLAIM_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class Claim:
+    record: PublishRequest | None
+    replay: dict | None = None
+    in_progress: bool = False
+    # The key was derived from the forecast type and date rather than sent by the client.
+    derived: bool = False
+
+
+def claim_publish_request(key: str, forecast_type: str, derived: bool = False) -> Claim:
+    """
+    One lookup decides the outcome: a fresh completed run is replayed, a live one is reported as in progress,
+    anything else (new key, failed or expired run, stuck run) is claimed by this request.
+    """
+    now = timezone.now()
+    for _attempt in range(CLAIM_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                record = PublishRequest.objects.create(key=key, forecast_type=forecast_type)
+        except IntegrityError:
+            try:
+                record = PublishRequest.objects.get(key=key)
+            except PublishRequest.DoesNotExist:
+                # The holder released the key between our insert and this read; try the insert again.
+                continue
+            break
+        else:
+            PublishRequest.objects.filter(created_at__lt=now - RETENTION).delete()
+            return Claim(record, derived=derived)
+    else:
+        logger.warning("Publish key keeps changing hands, reporting in progress key=%s", key)
+        return Claim(None, in_progress=True)
+
+    age = now - record.updated_at
+    if record.status == PublishRequest.Status.DONE and age < timedelta(seconds=settings.PUBLISH_IDEMPOTENCY_TTL_SECONDS):
+        logger.info("Replaying publish result key=%s", key)
+        return Claim(None, replay=record.response)
+    if record.status == PublishRequest.Status.RUNNING and age < timedelta(
+        seconds=settings.PUBLISH_IDEMPOTENCY_RUNNING_TIMEOUT_SECONDS
+    ):
+        logger.info("Publish already in progress key=%s", key)
+        return Claim(None, in_progress=True)
+
+    # Conditional update so two retries racing for an expired record do not both run.
+    taken = PublishRequest.objects.filter(pk=record.pk, status=record.status, updated_at=record.updated_at).update(
+        status=PublishRequest.Status.RUNNING, response=None, updated_at=now
+    )
+    if not taken:
+        return Claim(None, in_progress=True)
+    record.status = PublishRequest.Status.RUNNING
+    return Claim(record, derived=derived)
+
+
+def complete_publish_request(record: PublishRequest, response: dict) -> None:
+    record.status = PublishRequest.Status.DONE
+    record.response = response
+    record.save(update_fields=["status", "response", "updated_at"])
+
+
+def release_publish_request(record: PublishRequest) -> None:
+    """Drops the record, so the next request with the same key runs again instead of replaying."""
+    record.delete()
+
+
+def fail_publish_request(record: PublishRequest) -> None:
+    record.status = PublishRequest.Status.FAILED
+    record.save(update_fields=["status", "updated_at"])
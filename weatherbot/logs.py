@@ -0,0 +1,161 @@
+"""
+Logging plumbing referenced from settings.LOGGING.
+
+Only the standard library is imported here: dictConfig loads this module while settings are still being set up.
+"""
+from __future__ import annotations
+
+import atexit
+from contextlib import contextmanager
+from contextvars import ContextVar
+import copy
+from datetime import datetime, timezone
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import threading
+import time
+
+CONTEXT_FIELDS = ("run_id", "channel", "forecast_type")
+
+_context: ContextVar[dict[str, str]] = ContextVar("log_context", default={})
+_exception_formatter = logging.Formatter()
+
+
+@contextmanager
+def log_context(**fields):
+    """Adds fields to every record logged inside the block, including from other modules and asyncio tasks."""
+    token = _context.set({**_context.get(), **{key: str(value) for key, value in fields.items()}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current log_context onto the record; must run in the emitting thread, i.e. on the handler."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = _context.get()
+        for name in CONTEXT_FIELDS:
+            setattr(record, name, fields.get(name, ""))
+        record.context = "".join(f" {name}={fields[name]}" for name in CONTEXT_FIELDS if name in fields)
+        return True
+
+
+class DuplicateFilter(logging.Filter):
+    """
+    Lets the first of identical warnings (same logger, template and arguments) through per `window` seconds.
+    The next one after the window reports how many were suppressed in between.
+    """
+
+    def __init__(self, window: float = 60, max_keys: int = 1000) -> None:
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self._seen: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.window <= 0 or record.levelno != logging.WARNING:
+            return True
+        try:
+            key = (record.name, record.msg, record.args)
+            hash(key)
+        except TypeError:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            suppressed = entry[1] if entry is not None else 0
+            if len(self._seen) >= self.max_keys:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+            self._seen[key] = [now, 0]
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} (repeated {suppressed} times in the last {self.window:g}s)"
+            record.args = None
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, "")
+            if value:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Puts records on an in-process queue; a listener thread formats them and writes to stderr. Emitting
+    threads no longer wait on the stream lock or the write itself. When the queue is full, records are
+    dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, queue_size: int = 10000) -> None:
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        self.target = logging.StreamHandler()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt: logging.Formatter | None) -> None:  # noqa: N802
+        # Formatting happens in the listener thread, on the target handler.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message now: arguments may be mutated after the call returns. Everything else is
+        # left for the listener. The copy keeps the original intact for any other handler.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Blocks until the listener has written everything queued so far."""
+        if self.listener._thread is not None:
+            self.queue.join()
+        self.target.flush()
+
+    def close(self) -> None:
+        if self.listener._thread is not None:
+            self.listener.stop()
+            if self.dropped:
+                record = logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Log queue overflowed, dropped {self.dropped} records",
+                    }
+                )
+                ContextFilter().filter(record)
+                self.target.handle(record)
+        super().close()
@@ -4,6 +4,12 @@ from django.core.management.base import BaseCommand
 
 from weatherbot.models import BotConfig, ForecastType, Schedule
 
+DEFAULT_SCHEDULES = {
+    ForecastType.TODAY: time(hour=8, minute=0),
+    ForecastType.TOMORROW: time(hour=13, minute=0),
+    ForecastType.THREE_DAYS: time(hour=18, minute=0),
+}
+
 
 class Command(BaseCommand):
     help = "Create default bot config and schedules"
@@ -11,13 +17,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         BotConfig.get_solo()
 
-        defaults = {
-            ForecastType.TODAY: time(hour=8, minute=0),
-            ForecastType.TOMORROW: time(hour=13, minute=0),
-            ForecastType.THREE_DAYS: time(hour=18, minute=0),
-        }
-
-        for forecast_type, publish_time in defaults.items():
+        for forecast_type, publish_time in DEFAULT_SCHEDULES.items():
             Schedule.objects.update_or_create(
                 forecast_type=forecast_type,
                 defaults={"publish_time": publish_time, "active": True},
@@ -0,0 +1,34 @@
+import logging
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weatherbot.channels import ChannelValidator, import_channels, parse_channel_rows
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Import channels from CSV/JSON, validating them against Telegram getChat/getChatMember"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV with a chat_id column (name optional) or JSON list")
+        parser.add_argument("--format", choices=["csv", "json"], help="Defaults to the file extension")
+        parser.add_argument("--no-validate", action="store_true", help="Insert without calling Telegram")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        try:
+            rows = parse_channel_rows(path.read_text(encoding="utf-8-sig"), file_format)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        validator = None if options["no_validate"] else ChannelValidator()
+        result = import_channels(rows, validator)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Channels: {len(rows)} in file, created {result.created} ({result.inactive} inactive), "
+                f"already known {result.existing}, deactivated {result.deactivated}"
+            )
+        )
@@ -0,0 +1,91 @@
+from collections import defaultdict
+from datetime import timedelta
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from weatherbot.models import BotConfig, City, ForecastType, Schedule
+from weatherbot.publisher import FORECAST_WINDOWS
+from weatherbot.weather_api import WeatherClient
+
+
+class Command(BaseCommand):
+    help = "Show how many upstream forecast requests a slot would make after grid-cell deduplication"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "forecast_type",
+            nargs="*",
+            choices=[choice[0] for choice in ForecastType.choices],
+            help="Defaults to the forecast types of active schedules",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the plan as JSON")
+
+    def handle(self, *args, **options):
+        forecast_types = options["forecast_type"] or sorted(
+            set(Schedule.objects.filter(active=True).values_list("forecast_type", flat=True))
+        )
+        config = BotConfig.get_solo()
+        slot_city = config.default_city or City.objects.filter(active=True).first()
+
+        cells: dict[str, list[City]] = defaultdict(list)
+        ungeocoded = []
+        for city in City.objects.filter(active=True).order_by("grid_cell", "name"):
+            if city.grid_cell:
+                cells[city.grid_cell].append(city)
+            else:
+                ungeocoded.append(city.name)
+
+        weather = WeatherClient()
+        plan = {}
+        for forecast_type in forecast_types:
+            window = FORECAST_WINDOWS[forecast_type]
+            start_date = timezone.localdate() + timedelta(days=window.offset_days)
+
+            def cached(city: City) -> bool:
+                return weather.is_cached(
+                    city.latitude,
+                    city.longitude,
+                    start_date,
+                    window.days,
+                    daily_variables=window.daily_variables,
+                    hourly=window.hourly,
+                )
+
+            slot_calls = 0
+            if slot_city is not None:
+                slot_calls = 1 if slot_city.latitude is None or not cached(slot_city) else 0
+            plan[forecast_type] = {
+                "slot_calls": slot_calls,
+                "all_cities_calls": sum(not cached(members[0]) for members in cells.values()) + len(ungeocoded),
+            }
+
+        report = {
+            "grid_step_degrees": settings.WEATHER_GRID_STEP_DEGREES,
+            "slot_city": slot_city.name if slot_city else None,
+            "cities": sum(len(members) for members in cells.values()) + len(ungeocoded),
+            "grid_cells": len(cells),
+            "ungeocoded": ungeocoded,
+            "forecasts": plan,
+            "cells": {cell: [city.name for city in members] for cell, members in cells.items()},
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False))
+            return
+
+        self.stdout.write(
+            f"Cities: {report['cities']}, grid cells: {report['grid_cells']} "
+            f"(step {report['grid_step_degrees']}°), without coordinates: {len(ungeocoded)}"
+        )
+        self.stdout.write(f"Slot city: {report['slot_city'] or '-'}")
+        for forecast_type, calls in plan.items():
+            self.stdout.write(
+                f"{forecast_type}: upstream calls for the slot {calls['slot_calls']}, "
+                f"for all active cities {calls['all_cities_calls']}"
+            )
+        if options["verbosity"] > 1:
+            for cell, names in report["cells"].items():
+                self.stdout.write(f"  {cell}: {', '.join(names)}")
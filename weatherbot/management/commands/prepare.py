@@ -0,0 +1,124 @@
+import hashlib
+from io import StringIO
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from weatherbot.management.commands.bootstrap_defaults import DEFAULT_SCHEDULES
+from weatherbot.models import PrepareState
+
+logger = logging.getLogger(__name__)
+
+STEPS = ("migrate", "bootstrap_defaults", "collectstatic", "superuser")
+STATIC_HASH_FILENAME = ".prepare-static.sha256"
+MIGRATION_LOCK_ID = 724_311_026
+
+
+def static_inputs_hash() -> str:
+    digest = hashlib.sha256()
+    entries = []
+    for finder in get_finders():
+        for path, storage in finder.list([]):
+            stat = os.stat(storage.path(path))
+            entries.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    for entry in sorted(entries):
+        digest.update(entry.encode())
+    digest.update(repr(settings.STORAGES.get("staticfiles")).encode())
+    return digest.hexdigest()
+
+
+def bootstrap_inputs_hash() -> str:
+    payload = ";".join(
+        f"{forecast_type}={publish_time}" for forecast_type, publish_time in DEFAULT_SCHEDULES.items()
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Command(BaseCommand):
+    help = "Release-phase bootstrap: migrate, defaults, collectstatic and superuser in one process"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--skip", action="append", choices=STEPS, default=[], help="Step to skip")
+        parser.add_argument("--force", action="store_true", help="Run every step even if inputs are unchanged")
+
+    def handle(self, *args, **options):
+        self.force = options["force"]
+        started = time.perf_counter()
+        for step in STEPS:
+            if step in options["skip"]:
+                self._report(step, "skipped (--skip)", 0.0)
+                continue
+            step_started = time.perf_counter()
+            outcome = getattr(self, f"_step_{step}")()
+            self._report(step, outcome, time.perf_counter() - step_started)
+
+        total = time.perf_counter() - started
+        logger.info("prepare finished in %.3fs", total)
+        self.stdout.write(self.style.SUCCESS(f"Prepare finished in {total * 1000:.1f}ms"))
+
+    def _report(self, step: str, outcome: str, seconds: float) -> None:
+        logger.info("prepare step=%s outcome=%s took=%.3fs", step, outcome, seconds)
+        self.stdout.write(f"{step:<20} {outcome:<40} {seconds * 1000:8.1f}ms")
+
+    def _step_migrate(self) -> str:
+        connection = connections[DEFAULT_DB_ALIAS]
+        locked = connection.vendor == "postgresql"
+        if locked:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(%s)", [MIGRATION_LOCK_ID])
+        try:
+            executor = MigrationExecutor(connection)
+            plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+            if not plan and not self.force:
+                return "up to date"
+            call_command("migrate", interactive=False, verbosity=0)
+            return f"applied {len(plan)} migration(s)"
+        finally:
+            if locked:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", [MIGRATION_LOCK_ID])
+
+    def _step_bootstrap_defaults(self) -> str:
+        input_hash = bootstrap_inputs_hash()
+        already_applied = PrepareState.objects.filter(step="bootstrap_defaults", input_hash=input_hash).exists()
+        if already_applied and not self.force:
+            return "unchanged"
+        started = time.perf_counter()
+        call_command("bootstrap_defaults", stdout=StringIO())
+        PrepareState.objects.update_or_create(
+            step="bootstrap_defaults",
+            defaults={"input_hash": input_hash, "duration_ms": int((time.perf_counter() - started) * 1000)},
+        )
+        return "applied"
+
+    def _step_collectstatic(self) -> str:
+        static_root = Path(settings.STATIC_ROOT)
+        hash_file = static_root / STATIC_HASH_FILENAME
+        input_hash = static_inputs_hash()
+        if not self.force and hash_file.exists() and hash_file.read_text().strip() == input_hash:
+            return "unchanged"
+        call_command("collectstatic", interactive=False, verbosity=0)
+        static_root.mkdir(parents=True, exist_ok=True)
+        hash_file.write_text(input_hash)
+        return "collected"
+
+    def _step_superuser(self) -> str:
+        username = os.getenv("DJANGO_SUPERUSER_USERNAME")
+        password = os.getenv("DJANGO_SUPERUSER_PASSWORD")
+        if not username or not password:
+            return "not configured"
+        user_model = get_user_model()
+        if user_model.objects.filter(username=username).exists():
+            return "exists"
+        email = os.getenv("DJANGO_SUPERUSER_EMAIL", "admin@example.com")
+        user_model.objects.create_superuser(username=username, email=email, password=password)
+        return "created"
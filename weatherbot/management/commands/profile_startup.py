@@ -0,0 +1,104 @@
+from collections import defaultdict
+from dataclasses import dataclass
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Cold start of `manage.py <command>` up to the point where handle() would run.
+STARTUP_SCRIPT = """
+import sys
+import manage
+
+manage.configure_environment(["manage.py", *sys.argv[1:]])
+import django
+from django.core.management import get_commands, load_command_class
+
+django.setup()
+name = sys.argv[1]
+command = load_command_class(get_commands()[name], name)
+if command.requires_system_checks:
+    from django.core import checks
+    checks.run_checks()
+"""
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".", 1)[0]
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        timings.append(ImportTiming(parts[2].strip(), int(parts[0]), int(parts[1])))
+    return timings
+
+
+class Command(BaseCommand):
+    help = "Report cold-start wall time and import time per module for a management command"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", nargs="?", default="publish_forecast", help="Command to profile")
+        parser.add_argument("--profile", choices=["web", "worker"], help="DJANGO_SETTINGS_PROFILE for the child")
+        parser.add_argument("--repeat", type=int, default=5, help="Cold starts to time")
+        parser.add_argument("--limit", type=int, default=20, help="Modules to list")
+
+    def handle(self, *args, **options):
+        target = options["target"]
+        env = dict(os.environ)
+        if options["profile"]:
+            env["DJANGO_SETTINGS_PROFILE"] = options["profile"]
+
+        wall_times = []
+        for _ in range(max(options["repeat"], 1)):
+            started = time.perf_counter()
+            self._run(target, env)
+            wall_times.append((time.perf_counter() - started) * 1000)
+        timings = parse_importtime(self._run(target, env, importtime=True))
+
+        profile = options["profile"] or "default"
+        self.stdout.write(
+            f"{target} profile={profile} cold start: median {statistics.median(wall_times):.1f}ms "
+            f"min {min(wall_times):.1f}ms over {len(wall_times)} run(s), {len(timings)} modules imported"
+        )
+
+        per_package = defaultdict(int)
+        for timing in timings:
+            per_package[timing.package] += timing.self_us
+        self.stdout.write("\nBy top-level package (self time):")
+        for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[: options["limit"]]:
+            self.stdout.write(f"  {self_us / 1000:8.1f}ms  {package}")
+
+        self.stdout.write("\nSlowest modules (self / cumulative):")
+        for timing in sorted(timings, key=lambda item: -item.self_us)[: options["limit"]]:
+            self.stdout.write(
+                f"  {timing.self_us / 1000:8.1f}ms {timing.cumulative_us / 1000:8.1f}ms  {timing.module}"
+            )
+
+    @staticmethod
+    def _run(target: str, env: dict, importtime: bool = False) -> str:
+        command = [sys.executable]
+        if importtime:
+            command += ["-X", "importtime"]
+        command += ["-c", STARTUP_SCRIPT, target]
+        result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f"Startup of {target} failed:\n{result.stderr[-2000:]}")
+        return result.stderr
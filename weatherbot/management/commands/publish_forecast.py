@@ -1,25 +1,114 @@
+from dataclasses import asdict
+import json
 import logging
+import subprocess
+import sys
+import time
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
 from weatherbot.models import ForecastType
-from weatherbot.publisher import WeatherPublisher
+from weatherbot.publisher import PublishSummary, WeatherPublisher
 
 logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
     help = "Publish weather forecast to active Telegram channels"
+    requires_system_checks = []
 
     def add_arguments(self, parser):
         parser.add_argument("forecast_type", choices=[choice[0] for choice in ForecastType.choices])
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=settings.PUBLISH_SHARDS,
+            help="Split active channels by crc32(chat_id) into N shards",
+        )
+        parser.add_argument(
+            "--shard-index",
+            type=int,
+            help="Publish only this shard; without it N worker processes are started and their results merged",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the run summary as JSON")
 
     def handle(self, *args, **options):
         forecast_type = options["forecast_type"]
+        shards = options["shards"]
+        if shards < 1:
+            raise CommandError("--shards must be at least 1")
+
+        started = time.perf_counter()
+        if shards > 1 and options["shard_index"] is None:
+            summary = self._supervise(forecast_type, shards)
+        else:
+            summary = self._publish_shard(forecast_type, shards, options["shard_index"] or 0)
+        duration_ms = int((time.perf_counter() - started) * 1000)
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps(
+                    {**asdict(summary), "duration_ms": duration_ms, "weighted_delay_s": summary.weighted_delay_seconds}
+                )
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Published successfully: {summary.published} "
+                f"(channels {summary.channels}, failed {summary.failed}, skipped {summary.skipped}, "
+                f"{duration_ms}ms, subscriber-weighted delay {summary.weighted_delay_seconds}s)"
+            )
+        )
+
+    def _publish_shard(self, forecast_type: str, shards: int, shard_index: int) -> PublishSummary:
         try:
-            count = WeatherPublisher().publish(forecast_type)
+            publisher = WeatherPublisher(shards, shard_index)
+            publisher.publish(forecast_type)
         except Exception as exc:  # noqa: BLE001
-            logger.exception("publish_forecast failed")
+            logger.exception("publish_forecast failed shard=%s/%s", shard_index, shards)
             raise CommandError(str(exc)) from exc
+        return publisher.summary
+
+    def _supervise(self, forecast_type: str, shards: int) -> PublishSummary:
+        try:
+            WeatherPublisher().prefetch(forecast_type)
+        except Exception:  # noqa: BLE001
+            logger.warning("Forecast prefetch failed, shards will fetch it themselves", exc_info=True)
+
+        # Separate interpreters rather than fork(): every shard opens its own DB and HTTP connections.
+        manage_py = str(settings.BASE_DIR / "manage.py")
+        workers = [
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    manage_py,
+                    "publish_forecast",
+                    forecast_type,
+                    f"--shards={shards}",
+                    f"--shard-index={index}",
+                    "--json",
+                ],
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            for index in range(shards)
+        ]
+
+        summary = PublishSummary()
+        failed_shards = []
+        for index, worker in enumerate(workers):
+            output, _ = worker.communicate()
+            lines = output.strip().splitlines()
+            if worker.returncode != 0 or not lines:
+                failed_shards.append(index)
+                continue
+            shard_result = json.loads(lines[-1])
+            shard_result.pop("duration_ms", None)
+            shard_result.pop("weighted_delay_s", None)
+            summary.merge(PublishSummary(**shard_result))
+            logger.info("Shard finished shard=%s/%s summary=%s", index, shards, shard_result)
 
-        self.stdout.write(self.style.SUCCESS(f"Published successfully: {count}"))
+        if failed_shards:
+            raise CommandError(f"Shards failed: {failed_shards}; merged so far: {asdict(summary)}")
+        return summary
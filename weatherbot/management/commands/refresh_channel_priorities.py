@@ -0,0 +1,22 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weatherbot.channels import refresh_subscriber_counts
+from weatherbot.models import Channel
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Refresh channel subscriber counts from Telegram and derive publish priorities from them"
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        try:
+            updated = refresh_subscriber_counts(Channel.objects.filter(active=True))
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("refresh_channel_priorities failed")
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(f"Channels updated: {updated}"))
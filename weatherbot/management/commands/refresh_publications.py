@@ -0,0 +1,21 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weatherbot.refresher import PublicationRefresher
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Edit today's published messages whose forecast caption has changed"
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        try:
+            edited = PublicationRefresher().refresh()
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("refresh_publications failed")
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(f"Edited messages: {edited}"))
@@ -0,0 +1,57 @@
+import logging
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from weatherbot.bot import BotUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Answer bot commands via getUpdates long polling (local alternative to the webhook)"
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        processor = BotUpdateProcessor()
+        stop_event = threading.Event()
+
+        def shutdown_handler(signum, frame):  # noqa: ARG001
+            logger.info("Received signal %s, stopping bot polling", signum)
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, shutdown_handler)
+        signal.signal(signal.SIGTERM, shutdown_handler)
+
+        offset = None
+        logger.info("Bot polling started")
+        try:
+            while not stop_event.is_set():
+                try:
+                    updates = processor.telegram.get_updates(
+                        offset=offset,
+                        timeout=settings.BOT_POLL_TIMEOUT_SECONDS,
+                    )
+                except Exception:  # noqa: BLE001
+                    logger.exception("getUpdates failed, retrying in 5s")
+                    stop_event.wait(5)
+                    continue
+
+                if not updates:
+                    continue
+                offset = max(update["update_id"] for update in updates) + 1
+                started = time.perf_counter()
+                processor.process(updates)
+                close_old_connections()
+                logger.info(
+                    "Bot polling batch size=%s took=%.3fs",
+                    len(updates),
+                    time.perf_counter() - started,
+                )
+        finally:
+            processor.shutdown()
+            logger.info("Bot polling stopped")
@@ -3,45 +3,72 @@ import signal
 import threading
 import time
 
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from django.conf import settings
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from django.db.utils import OperationalError
+from django.db.utils import DatabaseError, OperationalError
 from django.utils import timezone
 
-from weatherbot.models import Schedule
+from weatherbot.memory import MemoryMonitor, current_rss_bytes
+from weatherbot.models import Schedule, SchedulerHeartbeat, SchedulerRun
 
 logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
     help = "Run scheduler for weather publications"
+    requires_system_checks = []
 
     def handle(self, *args, **options):
         scheduler = BackgroundScheduler(timezone=timezone.get_current_timezone())
+        scheduler.add_listener(self._on_job_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+        self._timings = {}
+        self._job_specs = {}
+        self._memory = MemoryMonitor(settings.MEMORY_TRACEMALLOC_FRAMES, settings.MEMORY_TOP_ALLOCATIONS)
+        snapshot_interval = settings.MEMORY_SNAPSHOT_INTERVAL_MINUTES * 60
+        if snapshot_interval:
+            self._memory.start()
+        next_snapshot = time.monotonic() + snapshot_interval
 
         stop_event = threading.Event()
+        self._dump_requested = False
 
         def shutdown_handler(signum, frame):  # noqa: ARG001
             logger.info("Received signal %s, stopping scheduler", signum)
             stop_event.set()
 
+        def dump_handler(signum, frame):  # noqa: ARG001
+            # Only a flag: no locks in a signal handler. The main loop dumps within 30 seconds.
+            self._dump_requested = True
+
         signal.signal(signal.SIGINT, shutdown_handler)
         signal.signal(signal.SIGTERM, shutdown_handler)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, dump_handler)
 
         self._sync_jobs(scheduler)
         if settings.SCHEDULER_STARTUP_CATCHUP:
             self._run_startup_catchup()
         scheduler.start()
-        logger.info("Scheduler started")
+        logger.info("Scheduler started rss_mb=%.1f", current_rss_bytes() / 2**20)
+        started_at = timezone.now()
+        _heartbeat(started_at)
 
         try:
             while not stop_event.is_set():
                 time.sleep(30)
+                _heartbeat(started_at)
+                if self._dump_requested:
+                    self._dump_requested = False
+                    self._memory.dump("SIGUSR1")
                 self._sync_jobs(scheduler)
+                if snapshot_interval and time.monotonic() >= next_snapshot:
+                    self._memory.dump("interval")
+                    next_snapshot = time.monotonic() + snapshot_interval
         finally:
             scheduler.shutdown(wait=False)
             logger.info("Scheduler stopped")
@@ -57,61 +84,240 @@ class Command(BaseCommand):
         for schedule in schedules:
             job_id = f"publish_{schedule.forecast_type}"
             active_ids.add(job_id)
-            trigger = CronTrigger(
-                hour=schedule.publish_time.hour,
-                minute=schedule.publish_time.minute,
+            self._ensure_job(
+                scheduler,
+                job_id,
+                ("cron", schedule.publish_time.hour, schedule.publish_time.minute),
+                [self._run_publication, schedule.forecast_type],
+                settings.SCHEDULER_MISFIRE_GRACE_SECONDS,
             )
 
-            scheduler.add_job(
-                self._run_publication,
-                trigger=trigger,
-                id=job_id,
-                replace_existing=True,
-                args=[schedule.forecast_type],
-                max_instances=1,
-                coalesce=True,
-                misfire_grace_time=settings.SCHEDULER_MISFIRE_GRACE_SECONDS,
+        if settings.TEST_SIMULATE_EVERY_MINUTE:
+            test_job_id = "simulate_every_minute"
+            active_ids.add(test_job_id)
+            self._ensure_job(
+                scheduler,
+                test_job_id,
+                ("interval", 1),
+                [self._run_simulation, settings.TEST_PUBLISH_FORECAST_TYPE],
+                120,
             )
 
-        if settings.TEST_PUBLISH_EVERY_MINUTE:
-            test_job_id = "publish_test_every_minute"
-            active_ids.add(test_job_id)
-            scheduler.add_job(
-                self._run_publication,
-                trigger=IntervalTrigger(minutes=1),
-                id=test_job_id,
-                replace_existing=True,
-                args=[settings.TEST_PUBLISH_FORECAST_TYPE],
-                max_instances=1,
-                coalesce=True,
-                misfire_grace_time=120,
+        if settings.PUBLICATION_REFRESH_INTERVAL_MINUTES > 0:
+            refresh_job_id = "refresh_publications"
+            active_ids.add(refresh_job_id)
+            self._ensure_job(
+                scheduler,
+                refresh_job_id,
+                ("interval", settings.PUBLICATION_REFRESH_INTERVAL_MINUTES),
+                [self._run_refresh],
+                300,
+            )
+
+        if settings.CHANNEL_PRIORITY_REFRESH_HOURS > 0:
+            priority_job_id = "refresh_channel_priorities"
+            active_ids.add(priority_job_id)
+            self._ensure_job(
+                scheduler,
+                priority_job_id,
+                ("interval", settings.CHANNEL_PRIORITY_REFRESH_HOURS * 60),
+                [self._run_priority_refresh],
+                3600,
             )
 
         for job in scheduler.get_jobs():
             if job.id not in active_ids:
                 scheduler.remove_job(job.id)
+                self._job_specs.pop(job.id, None)
+
+    def _ensure_job(
+        self, scheduler: BackgroundScheduler, job_id: str, trigger: tuple, args: list, grace: int
+    ) -> None:
+        """
+        Re-registers a job only when its definition changed. Replacing every job on each 30-second sync
+        rebuilt triggers and job objects for nothing and reset their next run computation.
+        """
+        spec = (trigger, tuple(args), grace)
+        if self._job_specs.get(job_id) == spec and scheduler.get_job(job_id) is not None:
+            return
+        if trigger[0] == "cron":
+            trigger_instance = CronTrigger(hour=trigger[1], minute=trigger[2])
+        else:
+            trigger_instance = IntervalTrigger(minutes=trigger[1])
+        scheduler.add_job(
+            self._timed_job,
+            trigger=trigger_instance,
+            id=job_id,
+            replace_existing=True,
+            args=[job_id, *args],
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=grace,
+        )
+        self._job_specs[job_id] = spec
+        logger.info("Scheduler job registered job=%s trigger=%s", job_id, trigger)
+
+    def _timed_job(self, job_id: str, func, *args) -> None:
+        started_at = timezone.now()
+        started = time.perf_counter()
+        rss_before = current_rss_bytes()
+        try:
+            func(*args)
+        finally:
+            # Picked up by _on_job_event; max_instances=1 keeps one entry per job id.
+            self._timings[job_id] = (
+                started_at,
+                int((time.perf_counter() - started) * 1000),
+                _memory_usage(job_id, rss_before),
+            )
+
+    def _on_job_event(self, event) -> None:
+        started_at, duration_ms, memory = self._timings.pop(event.job_id, (None, None, (None, None)))
+        if event.code == EVENT_JOB_MISSED:
+            status, error = SchedulerRun.Status.MISSED, ""
+        elif event.exception is not None:
+            status, error = SchedulerRun.Status.FAILED, repr(event.exception)
+        else:
+            status, error = SchedulerRun.Status.SUCCESS, ""
+        record_run(event.job_id, event.scheduled_run_time, started_at, duration_ms, status, error, memory=memory)
 
     @staticmethod
     def _run_publication(forecast_type: str) -> None:
         logger.info("Trigger publication type=%s", forecast_type)
         call_command("publish_forecast", forecast_type)
 
+    @staticmethod
+    def _run_simulation(forecast_type: str) -> None:
+        logger.info("Trigger simulated publication type=%s", forecast_type)
+        call_command(
+            "simulate_load",
+            channels=settings.TEST_SIMULATE_CHANNELS,
+            slots=1,
+            forecast_type=forecast_type,
+            json=True,
+        )
+
+    @staticmethod
+    def _run_refresh() -> None:
+        logger.info("Trigger publication refresh")
+        call_command("refresh_publications")
+
+    @staticmethod
+    def _run_priority_refresh() -> None:
+        logger.info("Trigger channel priority refresh")
+        call_command("refresh_channel_priorities")
+
     def _run_startup_catchup(self) -> None:
         """
-        Run once on scheduler startup to catch missed slots after process downtime.
-        Publish is idempotent, so repeated runs are safe.
+        Run once on scheduler startup for today's past slots that have no successful SchedulerRun,
+        i.e. were missed while the process was down or failed.
         """
         now = timezone.localtime()
-        now_hhmm = now.time().replace(second=0, microsecond=0)
         logger.info("Startup catch-up check at %s", now.strftime("%Y-%m-%d %H:%M:%S %Z"))
 
-        schedules = list(Schedule.objects.filter(active=True))
-        for schedule in schedules:
-            schedule_hhmm = schedule.publish_time.replace(second=0, microsecond=0)
-            if schedule_hhmm <= now_hhmm:
+        for schedule in Schedule.objects.filter(active=True):
+            slot = now.replace(
+                hour=schedule.publish_time.hour,
+                minute=schedule.publish_time.minute,
+                second=0,
+                microsecond=0,
+            )
+            if slot > now:
+                continue
+            job_id = f"publish_{schedule.forecast_type}"
+            already_ran = SchedulerRun.objects.filter(
+                job_id=job_id, scheduled_at=slot, status=SchedulerRun.Status.SUCCESS
+            ).exists()
+            if already_ran:
                 logger.info(
-                    "Startup catch-up trigger type=%s slot=%s",
-                    schedule.forecast_type,
-                    schedule.publish_time.strftime("%H:%M"),
+                    "Startup catch-up skip type=%s slot=%s: already ran", schedule.forecast_type, f"{slot:%H:%M}"
                 )
+                continue
+
+            logger.info("Startup catch-up trigger type=%s slot=%s", schedule.forecast_type, f"{slot:%H:%M}")
+            started_at = timezone.now()
+            started = time.perf_counter()
+            rss_before = current_rss_bytes()
+            status, error = SchedulerRun.Status.SUCCESS, ""
+            try:
                 self._run_publication(schedule.forecast_type)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Startup catch-up failed type=%s", schedule.forecast_type)
+                status, error = SchedulerRun.Status.FAILED, repr(exc)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            record_run(
+                job_id,
+                slot,
+                started_at,
+                duration_ms,
+                status,
+                error,
+                SchedulerRun.Trigger.CATCHUP,
+                memory=_memory_usage(job_id, rss_before),
+            )
+
+
+def _heartbeat(started_at) -> None:
+    try:
+        SchedulerHeartbeat.beat(started_at)
+    except DatabaseError:
+        logger.warning("Failed to write scheduler heartbeat", exc_info=True)
+
+
+def _memory_usage(job_id: str, rss_before: int) -> tuple[int, int]:
+    """RSS after the job and its growth during it, in KiB; warns once the process nears the memory limit."""
+    rss_after = current_rss_bytes()
+    rss_kb, delta_kb = rss_after // 1024, (rss_after - rss_before) // 1024
+    if settings.MEMORY_RSS_WARNING_MB and rss_after > settings.MEMORY_RSS_WARNING_MB * 2**20:
+        logger.warning(
+            "Scheduler RSS above limit job=%s rss_mb=%.1f limit_mb=%s",
+            job_id,
+            rss_after / 2**20,
+            settings.MEMORY_RSS_WARNING_MB,
+        )
+    return rss_kb, delta_kb
+
+
+def record_run(
+    job_id: str,
+    scheduled_at,
+    started_at,
+    duration_ms: int | None,
+    status: str,
+    error: str = "",
+    trigger: str = SchedulerRun.Trigger.SCHEDULE,
+    memory: tuple[int | None, int | None] = (None, None),
+) -> None:
+    rss_kb, rss_delta_kb = memory
+    lag_ms = int((started_at - scheduled_at).total_seconds() * 1000) if started_at else None
+    if status == SchedulerRun.Status.MISSED:
+        logger.warning("Scheduler job missed job=%s scheduled_at=%s", job_id, scheduled_at)
+    elif lag_ms is not None and lag_ms > settings.SCHEDULER_LAG_WARNING_SECONDS * 1000:
+        logger.warning(
+            "Scheduler job fired late job=%s scheduled_at=%s lag=%.1fs", job_id, scheduled_at, lag_ms / 1000
+        )
+    logger.info(
+        "Scheduler run job=%s status=%s trigger=%s lag_ms=%s duration_ms=%s rss_kb=%s rss_delta_kb=%s",
+        job_id,
+        status,
+        trigger,
+        lag_ms,
+        duration_ms,
+        rss_kb,
+        rss_delta_kb,
+    )
+    try:
+        SchedulerRun.objects.create(
+            job_id=job_id,
+            trigger=trigger,
+            status=status,
+            scheduled_at=scheduled_at,
+            started_at=started_at,
+            lag_ms=lag_ms,
+            duration_ms=duration_ms,
+            rss_kb=rss_kb,
+            rss_delta_kb=rss_delta_kb,
+            error=error,
+        )
+    except DatabaseError:
+        logger.warning("Failed to record scheduler run job=%s", job_id, exc_info=True)
@@ -0,0 +1,129 @@
+from dataclasses import asdict
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from weatherbot.models import BotConfig, ForecastType
+from weatherbot.publisher import PublishSummary
+from weatherbot.simulation import (
+    NAME_ORDER,
+    PRIORITY_ORDER,
+    FakeTelegramClient,
+    FakeWeatherClient,
+    LatencyModel,
+    QueryStats,
+    create_simulated_channels,
+    remove_simulated_channels,
+    simulate_slot,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Dry-run publication slots against fake Telegram/Open-Meteo and report throughput and DB contention"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--channels", type=int, default=100, help="Number of simulated channels")
+        parser.add_argument("--slots", type=int, default=3, help="Number of publication slots to run")
+        parser.add_argument("--interval", type=float, default=0, help="Seconds between slot starts")
+        parser.add_argument("--workers", type=int, default=1, help="Shard threads per slot")
+        parser.add_argument(
+            "--forecast-type",
+            choices=[choice[0] for choice in ForecastType.choices],
+            default=settings.TEST_PUBLISH_FORECAST_TYPE,
+        )
+        parser.add_argument("--telegram-latency-ms", type=float, default=80, help="Median Telegram call latency")
+        parser.add_argument("--telegram-sigma", type=float, default=0.5, help="Log-normal spread of Telegram latency")
+        parser.add_argument("--telegram-failure-rate", type=float, default=0.01)
+        parser.add_argument("--weather-latency-ms", type=float, default=300, help="Median Open-Meteo call latency")
+        parser.add_argument("--weather-failure-rate", type=float, default=0.0)
+        parser.add_argument(
+            "--order",
+            choices=("priority", "name"),
+            default="priority",
+            help="Send order: by priority as in production, or alphabetical for comparison",
+        )
+        parser.add_argument("--seed", type=int, help="Seed for reproducible latencies and failures")
+        parser.add_argument("--keep", action="store_true", help="Keep simulated channels and their logs")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        if options["channels"] < 1 or options["slots"] < 1 or options["workers"] < 1:
+            raise CommandError("--channels, --slots and --workers must be at least 1")
+        if not BotConfig.get_solo().service_enabled:
+            raise CommandError("Service is disabled in BotConfig: nothing would be published")
+
+        telegram = FakeTelegramClient(
+            LatencyModel(
+                options["telegram_latency_ms"], options["telegram_sigma"], options["telegram_failure_rate"]
+            ),
+            options["seed"],
+        )
+        weather = FakeWeatherClient(
+            LatencyModel(options["weather_latency_ms"], failure_rate=options["weather_failure_rate"]),
+            options["seed"],
+        )
+        stats = QueryStats()
+        summary = PublishSummary()
+        slot_durations_ms = []
+        slot_errors = 0
+        overruns = 0
+
+        order_by = PRIORITY_ORDER if options["order"] == "priority" else NAME_ORDER
+        create_simulated_channels(options["channels"], options["seed"])
+        try:
+            for slot in range(options["slots"]):
+                started = time.perf_counter()
+                try:
+                    summary.merge(
+                        simulate_slot(
+                            options["forecast_type"], telegram, weather, stats, options["workers"], order_by
+                        )
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    slot_errors += 1
+                    logger.warning("Simulated slot failed slot=%s error=%s", slot, exc)
+                elapsed = time.perf_counter() - started
+                slot_durations_ms.append(int(elapsed * 1000))
+
+                if slot == options["slots"] - 1:
+                    break
+                if options["interval"] and elapsed > options["interval"]:
+                    overruns += 1
+                    logger.warning("Simulated slot overran interval slot=%s elapsed=%.1fs", slot, elapsed)
+                time.sleep(max(options["interval"] - elapsed, 0))
+        finally:
+            if not options["keep"]:
+                remove_simulated_channels()
+
+        busy_seconds = sum(slot_durations_ms) / 1000
+        report = {
+            **asdict(summary),
+            "channels": options["channels"],
+            "slots": options["slots"],
+            "slot_errors": slot_errors,
+            "slot_overruns": overruns,
+            "slot_ms_max": max(slot_durations_ms),
+            "slot_ms_mean": int(busy_seconds * 1000 / len(slot_durations_ms)),
+            "messages_per_second": round(summary.published / busy_seconds, 1) if busy_seconds else None,
+            "order": options["order"],
+            "weighted_delay_s": summary.weighted_delay_seconds,
+            "telegram_calls": telegram.calls,
+            "telegram_failures": telegram.failures,
+            "weather_calls": weather.calls,
+            "db_queries": stats.queries,
+            "db_time_ms": int(stats.time_ms),
+            "db_lock_errors": stats.lock_errors,
+        }
+        logger.info("Load simulation finished report=%s", report)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report))
+            return
+        for key, value in report.items():
+            self.stdout.write(f"{key}: {value}")
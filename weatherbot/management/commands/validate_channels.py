@@ -0,0 +1,31 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weatherbot.channels import ChannelValidator, deactivate_unreachable
+from weatherbot.models import Channel
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Check active channels against Telegram getChat/getChatMember and deactivate unreachable ones"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chat-id", action="append", dest="chat_ids", help="Only these chats (repeatable)")
+
+    def handle(self, *args, **options):
+        channels = Channel.objects.filter(active=True)
+        if options["chat_ids"]:
+            channels = channels.filter(chat_id__in=options["chat_ids"])
+        try:
+            deactivated, checks = deactivate_unreachable(channels, ChannelValidator())
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("validate_channels failed")
+            raise CommandError(str(exc)) from exc
+
+        unknown = sum(check.reachable is None for check in checks.values())
+        self.stdout.write(
+            self.style.SUCCESS(f"Channels checked: {len(checks)}, deactivated {deactivated}, unknown {unknown}")
+        )
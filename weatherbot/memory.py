@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import logging
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_IGNORED_FRAMES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def current_rss_bytes() -> int:
+    """Resident set size now; outside Linux falls back to the peak RSS reported by getrusage."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryMonitor:
+    """
+    tracemalloc snapshots for a long-running process. Each dump logs the allocation sites that grew most
+    since the previous snapshot, which is what points at a leak; the totals alone only confirm one.
+    """
+
+    def __init__(self, frames: int = 1, top: int = 15) -> None:
+        self.frames = max(frames, 1)
+        self.top = top
+        self._previous: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        with self._lock:
+            self._previous = self._take()
+        logger.info("tracemalloc started frames=%s rss_mb=%.1f", self.frames, current_rss_bytes() / 2**20)
+
+    def dump(self, reason: str) -> list[str]:
+        """Logs and returns the top allocation diffs against the previous snapshot."""
+        if not tracemalloc.is_tracing():
+            self.start()
+            logger.info("Memory baseline taken reason=%s; the next dump shows growth since now", reason)
+            return []
+
+        with self._lock:
+            snapshot = self._take()
+            previous, self._previous = self._previous, snapshot
+        traced, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"{stat.traceback} size={stat.size / 1024:.1f}KiB "
+            f"diff={stat.size_diff / 1024:+.1f}KiB count_diff={stat.count_diff:+d}"
+            for stat in snapshot.compare_to(previous, "lineno")[: self.top]
+        ]
+        logger.info(
+            "Memory dump reason=%s rss_mb=%.1f traced_mb=%.1f traced_peak_mb=%.1f top_diffs:\n  %s",
+            reason,
+            current_rss_bytes() / 2**20,
+            traced / 2**20,
+            peak / 2**20,
+            "\n  ".join(lines) or "(no change)",
+        )
+        return lines
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-19 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='publicationlog',
+            name='forecast_type',
+            field=models.CharField(choices=[('today', 'Сегодня'), ('tomorrow', 'Завтра'), ('three_days', '3 дня'), ('hourly', 'Сегодня по времени суток'), ('week', '7 дней')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='schedule',
+            name='forecast_type',
+            field=models.CharField(choices=[('today', 'Сегодня'), ('tomorrow', 'Завтра'), ('three_days', '3 дня'), ('hourly', 'Сегодня по времени суток'), ('week', '7 дней')], max_length=20, unique=True),
+        ),
+    ]
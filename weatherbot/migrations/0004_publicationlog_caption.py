@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-19 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0003_forecast_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicationlog',
+            name='caption',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='publicationlog',
+            name='has_video',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-19 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0004_publicationlog_caption'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrepareState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.CharField(max_length=40, unique=True)),
+                ('input_hash', models.CharField(max_length=64)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('completed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0005_prepare_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicationlog',
+            name='duration_ms',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='publicationlog',
+            index=models.Index(fields=['target_date'], name='publog_target_date_idx'),
+        ),
+    ]
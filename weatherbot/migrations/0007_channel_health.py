@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0006_publicationlog_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='circuit_open_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='consecutive_failures',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='last_error_code',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='last_failure_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
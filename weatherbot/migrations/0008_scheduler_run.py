@@ -0,0 +1,32 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0007_channel_health'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=64)),
+                ('trigger', models.CharField(choices=[('schedule', 'По расписанию'), ('catchup', 'Догон при старте')], default='schedule', max_length=20)),
+                ('status', models.CharField(choices=[('success', 'Выполнен'), ('failed', 'Ошибка'), ('missed', 'Пропущен')], max_length=20)),
+                ('scheduled_at', models.DateTimeField()),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('lag_ms', models.IntegerField(blank=True, null=True)),
+                ('duration_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-scheduled_at'],
+                'indexes': [models.Index(fields=['job_id', 'scheduled_at'], name='schedrun_job_scheduled_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0008_scheduler_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=128, unique=True)),
+                ('forecast_type', models.CharField(choices=[('today', 'Сегодня'), ('tomorrow', 'Завтра'), ('three_days', '3 дня'), ('hourly', 'Сегодня по времени суток'), ('week', '7 дней')], max_length=20)),
+                ('status', models.CharField(choices=[('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='running', max_length=20)),
+                ('response', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0009_publish_request'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='language',
+            field=models.CharField(choices=[('ru', 'Русский'), ('en', 'English'), ('kk', 'Қазақша')], default='ru', max_length=8),
+        ),
+    ]
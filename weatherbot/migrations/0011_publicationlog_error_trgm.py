@@ -0,0 +1,34 @@
+from django.db import migrations
+
+INDEX_NAME = "publog_error_upper_trgm_idx"
+
+
+def create_error_trigram_index(apps, schema_editor):
+    # Admin search runs error__icontains, which Postgres renders as UPPER("error"::text) LIKE UPPER(%s);
+    # the index is built on that exact expression. SQLite has no equivalent and keeps the plain scan.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} '
+        f'ON weatherbot_publicationlog USING gin (UPPER("error"::text) gin_trgm_ops)'
+    )
+
+
+def drop_error_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY cannot run inside a transaction; it keeps a large log table writable while indexing.
+    atomic = False
+
+    dependencies = [
+        ('weatherbot', '0010_channel_language'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_error_trigram_index, drop_error_trigram_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:22
+
+from django.db import migrations, models
+
+from weatherbot.grid import grid_cell
+
+
+def fill_grid_cells(apps, schema_editor):
+    City = apps.get_model('weatherbot', 'City')
+    cities = list(City.objects.exclude(latitude=None).exclude(longitude=None))
+    for city in cities:
+        city.grid_cell = grid_cell(city.latitude, city.longitude)
+    City.objects.bulk_update(cities, ['grid_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0011_publicationlog_error_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='city',
+            name='grid_cell',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(fill_grid_cells, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0012_city_grid_cell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedulerrun',
+            name='rss_delta_kb',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='schedulerrun',
+            name='rss_kb',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
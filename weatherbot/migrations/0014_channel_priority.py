@@ -0,0 +1,37 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0013_schedulerrun_rss'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='channel',
+            options={'ordering': ['-priority', 'name']},
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='auto_priority',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='priority',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='subscriber_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='subscribers_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
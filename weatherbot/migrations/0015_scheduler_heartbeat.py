@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weatherbot', '0014_channel_priority'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerHeartbeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('singleton', models.BooleanField(default=True, unique=True)),
+                ('beat_at', models.DateTimeField()),
+                ('started_at', models.DateTimeField()),
+                ('hostname', models.CharField(blank=True, max_length=255)),
+                ('pid', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+        ),
+    ]
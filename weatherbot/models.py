@@ -1,16 +1,32 @@
+import os
+import socket
+
 from django.db import models
+from django.utils import timezone
+
+from .grid import grid_cell
 
 
 class ForecastType(models.TextChoices):
     TODAY = "today", "Сегодня"
     TOMORROW = "tomorrow", "Завтра"
     THREE_DAYS = "three_days", "3 дня"
+    HOURLY = "hourly", "Сегодня по времени суток"
+    WEEK = "week", "7 дней"
+
+
+class Language(models.TextChoices):
+    RU = "ru", "Русский"
+    EN = "en", "English"
+    KK = "kk", "Қазақша"
 
 
 class City(models.Model):
     name = models.CharField(max_length=120, unique=True)
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    # Upstream forecast grid cell, kept in sync on save; cities sharing it share one forecast fetch.
+    grid_cell = models.CharField(max_length=32, blank=True, db_index=True, editable=False)
     active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -21,16 +37,37 @@ class City(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.grid_cell = grid_cell(self.latitude, self.longitude)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "grid_cell"}
+        super().save(*args, **kwargs)
+
+
+# chat_id prefix of the channels simulate_load creates; their logs are left out of refreshes and reports.
+SIMULATED_CHAT_PREFIX = "sim:"
+
 
 class Channel(models.Model):
     name = models.CharField(max_length=120)
     chat_id = models.CharField(max_length=64, unique=True)
     active = models.BooleanField(default=True)
+    language = models.CharField(max_length=8, choices=Language.choices, default=Language.RU)
+    # Higher goes out first. With auto_priority the refresh job keeps it equal to the subscriber count.
+    priority = models.PositiveIntegerField(default=0)
+    auto_priority = models.BooleanField(default=True)
+    subscriber_count = models.PositiveIntegerField(null=True, blank=True)
+    subscribers_updated_at = models.DateTimeField(null=True, blank=True)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    last_error_code = models.PositiveIntegerField(null=True, blank=True)
+    last_failure_at = models.DateTimeField(null=True, blank=True)
+    circuit_open_until = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ["name"]
+        ordering = ["-priority", "name"]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.chat_id})"
@@ -74,8 +111,11 @@ class PublicationLog(models.Model):
     forecast_type = models.CharField(max_length=20, choices=ForecastType.choices)
     target_date = models.DateField()
     message_id = models.CharField(max_length=64, blank=True)
+    caption = models.TextField(blank=True)
+    has_video = models.BooleanField(default=False)
     success = models.BooleanField(default=False)
     error = models.TextField(blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -85,7 +125,105 @@ class PublicationLog(models.Model):
                 name="uniq_channel_forecast_date",
             )
         ]
+        indexes = [models.Index(fields=["target_date"], name="publog_target_date_idx")]
         ordering = ["-created_at"]
 
     def __str__(self) -> str:
         return f"{self.channel} {self.forecast_type} {self.target_date}"
+
+
+class ForecastSnapshot(models.Model):
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    payload = models.JSONField(default=list)
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["latitude", "longitude"], name="uniq_forecast_snapshot_point")
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.latitude},{self.longitude} @ {self.fetched_at}"
+
+
+class PrepareState(models.Model):
+    step = models.CharField(max_length=40, unique=True)
+    input_hash = models.CharField(max_length=64)
+    duration_ms = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.step} {self.input_hash[:12]}"
+
+
+class SchedulerRun(models.Model):
+    class Status(models.TextChoices):
+        SUCCESS = "success", "Выполнен"
+        FAILED = "failed", "Ошибка"
+        MISSED = "missed", "Пропущен"
+
+    class Trigger(models.TextChoices):
+        SCHEDULE = "schedule", "По расписанию"
+        CATCHUP = "catchup", "Догон при старте"
+
+    job_id = models.CharField(max_length=64)
+    trigger = models.CharField(max_length=20, choices=Trigger.choices, default=Trigger.SCHEDULE)
+    status = models.CharField(max_length=20, choices=Status.choices)
+    scheduled_at = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    lag_ms = models.IntegerField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    rss_kb = models.PositiveIntegerField(null=True, blank=True)
+    rss_delta_kb = models.IntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["job_id", "scheduled_at"], name="schedrun_job_scheduled_idx")]
+        ordering = ["-scheduled_at"]
+
+    def __str__(self) -> str:
+        return f"{self.job_id} {self.scheduled_at:%Y-%m-%d %H:%M} {self.status}"
+
+
+class PublishRequest(models.Model):
+    class Status(models.TextChoices):
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    key = models.CharField(max_length=128, unique=True)
+    forecast_type = models.CharField(max_length=20, choices=ForecastType.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.RUNNING)
+    response = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.key} {self.status}"
+
+
+class SchedulerHeartbeat(models.Model):
+    """Single row touched by run_scheduler on every loop; /ready/ reads its age."""
+
+    singleton = models.BooleanField(default=True, unique=True)
+    beat_at = models.DateTimeField()
+    started_at = models.DateTimeField()
+    hostname = models.CharField(max_length=255, blank=True)
+    pid = models.PositiveIntegerField(null=True, blank=True)
+
+    @classmethod
+    def beat(cls, started_at) -> None:
+        cls.objects.update_or_create(
+            singleton=True,
+            defaults={
+                "beat_at": timezone.now(),
+                "started_at": started_at,
+                "hostname": socket.gethostname()[:255],
+                "pid": os.getpid(),
+            },
+        )
+
+    def __str__(self) -> str:
+        return f"{self.hostname}:{self.pid} @ {self.beat_at}"
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from functools import cached_property
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+
+
+def estimated_row_count(queryset: QuerySet) -> int | None:
+    """Planner estimate from pg_class for an unfiltered queryset on Postgres; None where there is none."""
+    if not isinstance(queryset, QuerySet) or queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # -1 until the table has been vacuumed or analyzed at least once.
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Skips COUNT(*) over the whole table once it passes ADMIN_ESTIMATED_COUNT_THRESHOLD rows: the admin
+    only needs the total for the page links. Filtered lists and small tables are still counted exactly.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        estimate = estimated_row_count(self.object_list)
+        if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
@@ -1,80 +1,422 @@
 from __future__ import annotations
 
+import asyncio
+from dataclasses import asdict, dataclass
 import logging
-from datetime import date
+from datetime import date, timedelta
+from functools import cached_property
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING
+import uuid
+import zlib
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
 
 from .content import build_caption, choose_visual_weather_type, pick_video_path
+from .forecast import CORE_DAILY_VARIABLES, DAILY_VARIABLES, DayForecast
+from .health import circuit_is_open, needs_probe, record_failure, record_success
+from .i18n import DEFAULT_LANGUAGE
+from .logs import log_context
 from .models import BotConfig, Channel, City, ForecastType, PublicationLog
-from .telegram_api import TelegramClient
-from .weather_api import WeatherClient
+
+if TYPE_CHECKING:
+    from .telegram_api import AsyncTelegramClient, TelegramClient
+    from .weather_api import AsyncWeatherClient, WeatherClient
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ForecastWindow:
+    offset_days: int
+    days: int
+    daily_variables: tuple[str, ...] = DAILY_VARIABLES
+    hourly: bool = False
+
+
+FORECAST_WINDOWS = {
+    ForecastType.TODAY: ForecastWindow(offset_days=0, days=1),
+    ForecastType.TOMORROW: ForecastWindow(offset_days=1, days=1),
+    ForecastType.THREE_DAYS: ForecastWindow(offset_days=0, days=3),
+    ForecastType.HOURLY: ForecastWindow(offset_days=0, days=1, hourly=True),
+    ForecastType.WEEK: ForecastWindow(offset_days=0, days=7, daily_variables=CORE_DAILY_VARIABLES),
+}
+
+
+def _window_request(city: City, forecast_type: str) -> tuple[tuple, dict]:
+    window = FORECAST_WINDOWS[forecast_type]
+    start_date = timezone.localdate() + timedelta(days=window.offset_days)
+    args = (city.latitude, city.longitude, start_date, window.days)
+    return args, {"daily_variables": window.daily_variables, "hourly": window.hourly}
+
+
+def fetch_window_forecast(weather: WeatherClient, city: City, forecast_type: str) -> list[DayForecast]:
+    args, kwargs = _window_request(city, forecast_type)
+    return weather.get_forecast(*args, **kwargs)
+
+
+async def afetch_window_forecast(weather: AsyncWeatherClient, city: City, forecast_type: str) -> list[DayForecast]:
+    args, kwargs = _window_request(city, forecast_type)
+    return await weather.aget_forecast(*args, **kwargs)
+
+
+@dataclass(frozen=True)
+class PreparedPublication:
+    city: City
+    forecast_type: str
+    target_date: date
+    caption: str
+    video_path: Path
+
+
+def render_publication(
+    city: City, forecast_type: str, selected_days: list[DayForecast], language: str = DEFAULT_LANGUAGE
+) -> PreparedPublication:
+    primary_day = selected_days[0]
+    target_date = date.fromisoformat(primary_day.date)
+    visual_weather_type = choose_visual_weather_type(forecast_type, selected_days)
+    logger.info(
+        "Prepared forecast type=%s language=%s target_date=%s weather_code=%s weather_type=%s",
+        forecast_type,
+        language,
+        target_date,
+        primary_day.weather_code,
+        visual_weather_type,
+    )
+    return PreparedPublication(
+        city=city,
+        forecast_type=forecast_type,
+        target_date=target_date,
+        caption=build_caption(city.name, forecast_type, selected_days, language),
+        video_path=pick_video_path(visual_weather_type),
+    )
+
+
+def render_for_channels(
+    city: City, forecast_type: str, selected_days: list[DayForecast], channels: list[Channel]
+) -> dict[str, PreparedPublication]:
+    """One caption per distinct language in the run, however many channels share it."""
+    return {
+        language: render_publication(city, forecast_type, selected_days, language)
+        for language in sorted({channel.language for channel in channels})
+    }
+
+
+def shard_for(chat_id: str, shards: int) -> int:
+    """Stable across processes and hosts, unlike hash() with PYTHONHASHSEED."""
+    return zlib.crc32(chat_id.encode()) % shards
+
+
+@dataclass
+class PublishSummary:
+    channels: int = 0
+    published: int = 0
+    failed: int = 0
+    skipped: int = 0
+    # Subscribers reached and the sum of subscribers x seconds from the start of the run to their delivery.
+    audience: int = 0
+    subscriber_seconds: float = 0.0
+
+    def merge(self, other: PublishSummary) -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    @property
+    def weighted_delay_seconds(self) -> float | None:
+        """Delivery delay as the average subscriber saw it, rather than the average channel."""
+        return round(self.subscriber_seconds / self.audience, 2) if self.audience else None
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+def _log_open_circuit(channel: Channel) -> None:
+    logger.info(
+        "Skip channel with open circuit chat_id=%s failures=%s until=%s",
+        channel.chat_id,
+        channel.consecutive_failures,
+        channel.circuit_open_until,
+    )
+
+
 class WeatherPublisher:
-    def __init__(self) -> None:
-        self.weather = WeatherClient()
-        self.telegram = TelegramClient()
+    def __init__(self, shards: int = 1, shard_index: int = 0) -> None:
+        if shards < 1 or not 0 <= shard_index < shards:
+            raise ValueError(f"Invalid shard {shard_index} of {shards}")
+        self.shards = shards
+        self.shard_index = shard_index
+        self.summary = PublishSummary()
+        self._started = time.perf_counter()
+        # Carried by every log record of the run (see weatherbot.logs), including client and cache modules.
+        self.run_id = uuid.uuid4().hex[:12]
 
-    def publish(self, forecast_type: str) -> int:
+    # HTTP clients (requests/httpx) are imported on first use so that loading a
+    # management command or the URLconf does not pay for them up front.
+    @cached_property
+    def weather(self) -> WeatherClient:
+        from .weather_api import WeatherClient
+
+        return WeatherClient()
+
+    @cached_property
+    def telegram(self) -> TelegramClient:
+        from .telegram_api import TelegramClient
+
+        return TelegramClient()
+
+    def prefetch(self, forecast_type: str) -> None:
+        """Fetches the forecast once so parallel shard workers find a fresh ForecastSnapshot."""
         config = BotConfig.get_solo()
-        if not config.service_enabled:
-            logger.info("Service disabled: skip publish for %s", forecast_type)
+        if config.service_enabled:
+            self._fetch_forecast(self._resolve_city(config), forecast_type)
+
+    def publish(self, forecast_type: str) -> int:
+        with log_context(run_id=self.run_id, forecast_type=forecast_type):
+            return self._publish(forecast_type)
+
+    async def apublish(self, forecast_type: str) -> int:
+        # Tasks created by gather() inside copy this context, so per-channel fields stay per task.
+        with log_context(run_id=self.run_id, forecast_type=forecast_type):
+            return await self._apublish(forecast_type)
+
+    def _publish(self, forecast_type: str) -> int:
+        self._started = time.perf_counter()
+        context = self._load_context(forecast_type)
+        if context is None:
             return 0
+        city, channels = context
 
-        city = self._resolve_city(config)
-        channels = list(Channel.objects.filter(active=True))
-        if not channels:
-            logger.info("No active channels found")
+        rendered = render_for_channels(city, forecast_type, self._fetch_forecast(city, forecast_type), channels)
+        successful = 0
+        for channel in channels:
+            with log_context(channel=channel.chat_id):
+                prepared = rendered[channel.language]
+                if self._is_already_published(channel, forecast_type, prepared.target_date):
+                    self._log_duplicate(channel, prepared)
+                    self.summary.skipped += 1
+                    continue
+                if not self._circuit_allows(channel):
+                    self.summary.skipped += 1
+                    continue
+                if self._send(channel, prepared):
+                    successful += 1
+                else:
+                    self.summary.failed += 1
+
+        self.summary.published = successful
+        self._log_completed(forecast_type)
+        return successful
+
+    async def _apublish(self, forecast_type: str) -> int:
+        self._started = time.perf_counter()
+        context = await sync_to_async(self._load_context)(forecast_type)
+        if context is None:
             return 0
+        city, channels = context
+
+        from .telegram_api import AsyncTelegramClient
+        from .weather_api import AsyncWeatherClient
 
-        forecast = self.weather.get_daily_forecast(city.latitude, city.longitude, days=3)
-        selected_days = self._select_days(forecast_type, forecast)
-        primary_day = selected_days[0]
-        target_date = date.fromisoformat(primary_day.date)
-        visual_weather_type = choose_visual_weather_type(forecast_type, selected_days)
+        weather = AsyncWeatherClient()
+        telegram = AsyncTelegramClient()
+        try:
+            selected_days = await afetch_window_forecast(weather, city, forecast_type)
+            rendered = render_for_channels(city, forecast_type, selected_days, channels)
+            # The clip depends only on the weather, so every language shares one upload buffer.
+            video_path = next(iter(rendered.values())).video_path
+            video = None
+            if video_path.exists():
+                video = await asyncio.to_thread(video_path.read_bytes)
+            else:
+                logger.warning("Video file is missing, fallback to text message path=%s", video_path)
 
-        caption = build_caption(city.name, forecast_type, selected_days)
-        video_path = pick_video_path(visual_weather_type)
+            # gather() starts the coroutines in list order and the semaphore wakes waiters FIFO, so sends
+            # keep the priority order while every slot of the semaphore stays busy.
+            semaphore = asyncio.Semaphore(settings.ASYNC_PUBLISH_CONCURRENCY)
+            results = await asyncio.gather(
+                *(
+                    self._asend(telegram, semaphore, channel, rendered[channel.language], video)
+                    for channel in channels
+                )
+            )
+        finally:
+            await telegram.aclose()
+            await weather.aclose()
+
+        successful = sum(results)
+        self.summary.published = successful
+        self._log_completed(forecast_type)
+        return successful
+
+    def _log_completed(self, forecast_type: str) -> None:
         logger.info(
-            "Prepared forecast type=%s target_date=%s weather_code=%s weather_type=%s",
+            "Publish completed type=%s successful=%s audience=%s weighted_delay_s=%s",
             forecast_type,
-            target_date,
-            primary_day.weather_code,
-            visual_weather_type,
+            self.summary.published,
+            self.summary.audience,
+            self.summary.weighted_delay_seconds,
         )
 
-        successful = 0
-        for channel in channels:
-            if self._is_already_published(channel, forecast_type, target_date):
-                logger.info(
-                    "Skip duplicated publication channel=%s type=%s date=%s",
-                    channel.chat_id,
-                    forecast_type,
-                    target_date,
-                )
-                continue
+    def _record_delivery(self, channel: Channel) -> None:
+        # Channels without a known count weigh as one subscriber, so they still show up in the total.
+        subscribers = channel.subscriber_count or 1
+        self.summary.audience += subscribers
+        self.summary.subscriber_seconds += subscribers * (time.perf_counter() - self._started)
+
+    def _load_context(self, forecast_type: str) -> tuple[City, list[Channel]] | None:
+        config = BotConfig.get_solo()
+        if not config.service_enabled:
+            logger.info("Service disabled: skip publish for %s", forecast_type)
+            return None
 
+        city = self._resolve_city(config)
+        channels = list(self._channel_queryset())
+        if self.shards > 1:
+            channels = [channel for channel in channels if shard_for(channel.chat_id, self.shards) == self.shard_index]
+        self.summary.channels = len(channels)
+        if not channels:
+            logger.info("No active channels found shard=%s/%s", self.shard_index, self.shards)
+            return None
+        return city, channels
+
+    def _channel_queryset(self) -> QuerySet[Channel]:
+        # Largest audiences first: under rate limits or a long slot they are not left waiting behind small chats.
+        return Channel.objects.filter(active=True).order_by("-priority", "name")
+
+    def _circuit_allows(self, channel: Channel) -> bool:
+        if circuit_is_open(channel):
+            _log_open_circuit(channel)
+            return False
+        if needs_probe(channel):
             try:
-                if video_path.exists():
-                    message_id = self.telegram.send_video(channel.chat_id, caption, video_path)
-                else:
-                    logger.warning(
-                        "Video file is missing, fallback to text message path=%s",
-                        video_path,
-                    )
-                    message_id = self.telegram.send_message(channel.chat_id, caption)
-                self._save_log(channel, city, forecast_type, target_date, True, message_id, "")
-                successful += 1
+                self.telegram.get_chat(channel.chat_id)
             except Exception as exc:  # noqa: BLE001
-                logger.exception("Publish failed channel=%s type=%s", channel.chat_id, forecast_type)
-                self._save_log(channel, city, forecast_type, target_date, False, "", str(exc))
+                logger.warning("Channel probe failed chat_id=%s error=%s", channel.chat_id, exc)
+                record_failure(channel, exc)
+                return False
+            # The chat answers, so earlier failures were not about it; the send below starts a fresh count.
+            record_success(channel)
+        return True
 
-        logger.info("Publish completed type=%s successful=%s", forecast_type, successful)
-        return successful
+    async def _acircuit_allows(self, telegram: AsyncTelegramClient, channel: Channel) -> bool:
+        if circuit_is_open(channel):
+            _log_open_circuit(channel)
+            return False
+        if needs_probe(channel):
+            try:
+                await telegram.get_chat(channel.chat_id)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Channel probe failed chat_id=%s error=%s", channel.chat_id, exc)
+                await sync_to_async(record_failure)(channel, exc)
+                return False
+            await sync_to_async(record_success)(channel)
+        return True
+
+    def _send(self, channel: Channel, prepared: PreparedPublication) -> bool:
+        has_video = prepared.video_path.exists()
+        started = time.perf_counter()
+        try:
+            if has_video:
+                message_id = self.telegram.send_video(channel.chat_id, prepared.caption, prepared.video_path)
+            else:
+                logger.warning(
+                    "Video file is missing, fallback to text message path=%s",
+                    prepared.video_path,
+                )
+                message_id = self.telegram.send_message(channel.chat_id, prepared.caption)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Publish failed channel=%s type=%s", channel.chat_id, prepared.forecast_type)
+            self._save_result(channel, prepared, False, "", str(exc), has_video, _elapsed_ms(started))
+            record_failure(channel, exc)
+            return False
+
+        self._record_delivery(channel)
+        self._save_result(channel, prepared, True, message_id, "", has_video, _elapsed_ms(started))
+        record_success(channel)
+        return True
+
+    async def _asend(
+        self,
+        telegram: AsyncTelegramClient,
+        semaphore: asyncio.Semaphore,
+        channel: Channel,
+        prepared: PreparedPublication,
+        video: bytes | None,
+    ) -> bool:
+        with log_context(channel=channel.chat_id):
+            async with semaphore:
+                already_published = await sync_to_async(self._is_already_published)(
+                    channel, prepared.forecast_type, prepared.target_date
+                )
+                if already_published:
+                    self._log_duplicate(channel, prepared)
+                    self.summary.skipped += 1
+                    return False
+                if not await self._acircuit_allows(telegram, channel):
+                    self.summary.skipped += 1
+                    return False
+
+                started = time.perf_counter()
+                try:
+                    if video is not None:
+                        message_id = await telegram.send_video(
+                            channel.chat_id, prepared.caption, video, prepared.video_path.name
+                        )
+                    else:
+                        message_id = await telegram.send_message(channel.chat_id, prepared.caption)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("Publish failed channel=%s type=%s", channel.chat_id, prepared.forecast_type)
+                    await sync_to_async(self._save_result)(
+                        channel, prepared, False, "", str(exc), video is not None, _elapsed_ms(started)
+                    )
+                    await sync_to_async(record_failure)(channel, exc)
+                    self.summary.failed += 1
+                    return False
+
+                self._record_delivery(channel)
+                await sync_to_async(self._save_result)(
+                    channel, prepared, True, message_id, "", video is not None, _elapsed_ms(started)
+                )
+                await sync_to_async(record_success)(channel)
+                return True
+
+    def _save_result(
+        self,
+        channel: Channel,
+        prepared: PreparedPublication,
+        success: bool,
+        message_id: str,
+        error: str,
+        has_video: bool,
+        duration_ms: int | None = None,
+    ) -> None:
+        self._save_log(
+            channel,
+            prepared.city,
+            prepared.forecast_type,
+            prepared.target_date,
+            success,
+            message_id,
+            error,
+            prepared.caption if success else "",
+            has_video,
+            duration_ms,
+        )
+
+    @staticmethod
+    def _log_duplicate(channel: Channel, prepared: PreparedPublication) -> None:
+        logger.info(
+            "Skip duplicated publication channel=%s type=%s date=%s",
+            channel.chat_id,
+            prepared.forecast_type,
+            prepared.target_date,
+        )
 
     def _resolve_city(self, config: BotConfig) -> City:
         city = config.default_city or City.objects.filter(active=True).first()
@@ -88,15 +430,8 @@ class WeatherPublisher:
             city.save(update_fields=["latitude", "longitude", "updated_at"])
         return city
 
-    @staticmethod
-    def _select_days(forecast_type: str, forecast):
-        if forecast_type == ForecastType.TODAY:
-            return [forecast[0]]
-        if forecast_type == ForecastType.TOMORROW:
-            if len(forecast) < 2:
-                raise ValueError("Недостаточно данных для прогноза на завтра")
-            return [forecast[1]]
-        return forecast[:3]
+    def _fetch_forecast(self, city: City, forecast_type: str) -> list[DayForecast]:
+        return fetch_window_forecast(self.weather, city, forecast_type)
 
     @staticmethod
     def _is_already_published(channel: Channel, forecast_type: str, target_date: date) -> bool:
@@ -118,6 +453,9 @@ class WeatherPublisher:
         success: bool,
         message_id: str,
         error: str,
+        caption: str = "",
+        has_video: bool = False,
+        duration_ms: int | None = None,
     ) -> None:
         try:
             with transaction.atomic():
@@ -129,6 +467,9 @@ class WeatherPublisher:
                     success=success,
                     message_id=message_id,
                     error=error,
+                    caption=caption,
+                    has_video=has_video,
+                    duration_ms=duration_ms,
                 )
         except IntegrityError:
             logger.warning(
@@ -0,0 +1,186 @@
+"""
+Dependency probes behind /ready/.
+
+Probes run in one background thread per process and store their last result; the view only reads those
+results, so a platform health check every few seconds costs no queries and no Telegram calls. A result
+older than three probe intervals counts as failed: a dead probe thread must not keep reporting "ready".
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ForecastSnapshot, SchedulerHeartbeat
+
+logger = logging.getLogger(__name__)
+
+# A failed probe is retried sooner than its interval, so a blip does not keep the instance unready for long.
+FAILED_PROBE_RETRY_SECONDS = 15
+
+
+class ProbeFailed(Exception):
+    def __init__(self, message: str, **detail: Any) -> None:
+        super().__init__(message)
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class Probe:
+    name: str
+    check: Callable[[], dict]
+    interval: float
+    # Non-critical probes are reported but do not turn the endpoint into 503.
+    critical: bool = True
+
+
+@dataclass
+class ProbeResult:
+    ok: bool
+    checked_at: float
+    duration_ms: float
+    detail: dict = field(default_factory=dict)
+    error: str = ""
+
+
+def probe_database() -> dict:
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return {"latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def probe_scheduler() -> dict:
+    if not settings.ENABLE_INTERNAL_SCHEDULER:
+        return {"enabled": False}
+    heartbeat = SchedulerHeartbeat.objects.filter(singleton=True).first()
+    if heartbeat is None:
+        raise ProbeFailed("no heartbeat yet", enabled=True)
+    age = (timezone.now() - heartbeat.beat_at).total_seconds()
+    detail = {"enabled": True, "heartbeat_age_s": round(age, 1), "host": heartbeat.hostname, "pid": heartbeat.pid}
+    if age > settings.READINESS_SCHEDULER_MAX_AGE_SECONDS:
+        raise ProbeFailed("heartbeat is stale", **detail)
+    return detail
+
+
+def probe_weather() -> dict:
+    # Open-Meteo is only called around publication slots, so this reports the last persisted success
+    # instead of spending an upstream request on every probe.
+    last_success = ForecastSnapshot.objects.aggregate(last=Max("fetched_at"))["last"]
+    if last_success is None:
+        return {"last_success": None, "age_s": None}
+    return {
+        "last_success": last_success.isoformat(),
+        "age_s": round((timezone.now() - last_success).total_seconds(), 1),
+    }
+
+
+def probe_telegram() -> dict:
+    from .telegram_api import TelegramClient
+
+    me = TelegramClient().get_me()
+    return {"username": me.get("username", "")}
+
+
+class ReadinessMonitor:
+    def __init__(self, probes: list[Probe]) -> None:
+        self.probes = probes
+        self._results: dict[str, ProbeResult] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def ensure_started(self) -> None:
+        """Starts the probe thread on first use, i.e. in the serving process after any fork."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="readiness-probes", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def refresh_due(self) -> bool:
+        now = time.time()
+        ran = False
+        for probe in self.probes:
+            result = self._results.get(probe.name)
+            if result is not None:
+                interval = probe.interval if result.ok else min(probe.interval, FAILED_PROBE_RETRY_SECONDS)
+                if now - result.checked_at < interval:
+                    continue
+            self._results[probe.name] = self._check(probe)
+            ran = True
+        return ran
+
+    def report(self) -> tuple[bool, dict]:
+        now = time.time()
+        ready = True
+        checks = {}
+        for probe in self.probes:
+            result = self._results.get(probe.name)
+            if result is None:
+                ok, entry = False, {"ok": False, "error": "pending"}
+            else:
+                age = now - result.checked_at
+                ok = result.ok and age <= probe.interval * 3
+                entry = {
+                    "ok": ok,
+                    "checked_s_ago": round(age, 1),
+                    "duration_ms": result.duration_ms,
+                    **result.detail,
+                }
+                if result.error or not ok:
+                    entry["error"] = result.error or "stale result"
+            if probe.critical:
+                ready = ready and ok
+            else:
+                entry["critical"] = False
+            checks[probe.name] = entry
+        return ready, checks
+
+    def _check(self, probe: Probe) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            detail, error, ok = probe.check(), "", True
+        except ProbeFailed as exc:
+            detail, error, ok = exc.detail, str(exc), False
+        except Exception as exc:  # noqa: BLE001
+            detail, error, ok = {}, f"{type(exc).__name__}: {exc}", False
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        if not ok:
+            logger.warning("Readiness probe failed probe=%s error=%s", probe.name, error)
+        return ProbeResult(ok, time.time(), duration_ms, detail, error)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.refresh_due():
+                    # The thread's own connection; reopening it per round means a restarted database
+                    # never leaves the probes on a dead socket.
+                    connection.close()
+            except Exception:  # noqa: BLE001
+                logger.exception("Readiness probe round failed")
+            self._stop.wait(1)
+
+
+readiness_monitor = ReadinessMonitor(
+    [
+        Probe("database", probe_database, settings.READINESS_PROBE_INTERVAL_SECONDS),
+        Probe("scheduler", probe_scheduler, settings.READINESS_PROBE_INTERVAL_SECONDS),
+        Probe("weather", probe_weather, settings.READINESS_PROBE_INTERVAL_SECONDS, critical=False),
+        Probe("telegram", probe_telegram, settings.READINESS_TELEGRAM_INTERVAL_SECONDS),
+    ]
+)
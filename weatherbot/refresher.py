@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from .content import build_caption
+from .models import SIMULATED_CHAT_PREFIX, PublicationLog
+from .publisher import fetch_window_forecast
+from .telegram_api import TelegramClient
+from .throttling import RateLimiter
+from .weather_api import WeatherClient
+
+logger = logging.getLogger(__name__)
+
+
+class PublicationRefresher:
+    """
+    Re-renders today's successful publications and edits only messages whose caption changed.
+    The video itself is not replaced: editMessageMedia would mean re-uploading it.
+    """
+
+    def __init__(self, telegram: TelegramClient | None = None, weather: WeatherClient | None = None) -> None:
+        self.telegram = telegram or TelegramClient()
+        self.weather = weather or WeatherClient()
+        self.limiter = RateLimiter(settings.TELEGRAM_EDIT_RATE_PER_SECOND)
+
+    def refresh(self) -> int:
+        today = timezone.localdate()
+        day_start = timezone.make_aware(datetime.combine(today, time.min))
+        logs = (
+            PublicationLog.objects.filter(success=True, created_at__gte=day_start)
+            .exclude(message_id="")
+            .exclude(caption="")
+            # Simulated deliveries carry fake message ids; editing them would call Telegram for "sim:" chats.
+            .exclude(channel__chat_id__startswith=SIMULATED_CHAT_PREFIX)
+            .select_related("channel", "city")
+            .order_by("city_id", "forecast_type")
+        )
+
+        groups: dict[tuple[int, str], list[PublicationLog]] = {}
+        for log in logs:
+            groups.setdefault((log.city_id, log.forecast_type), []).append(log)
+
+        checked = 0
+        edited = 0
+        pending: list[PublicationLog] = []
+        for (_city_id, forecast_type), group in groups.items():
+            city = group[0].city
+            try:
+                forecast = fetch_window_forecast(self.weather, city, forecast_type)
+            except Exception:  # noqa: BLE001
+                logger.exception("Refresh forecast failed city=%s type=%s", city.name, forecast_type)
+                continue
+
+            target_date = date.fromisoformat(forecast[0].date)
+            captions: dict[str, str] = {}
+            for log in group:
+                if log.target_date != target_date:
+                    continue
+                checked += 1
+                language = log.channel.language
+                if language not in captions:
+                    captions[language] = build_caption(city.name, forecast_type, forecast, language)
+                caption = captions[language]
+                if log.caption == caption or not self._edit(log, caption):
+                    continue
+                log.caption = caption
+                pending.append(log)
+                edited += 1
+                if len(pending) >= settings.PUBLICATION_REFRESH_BATCH_SIZE:
+                    PublicationLog.objects.bulk_update(pending, ["caption"])
+                    pending = []
+
+        if pending:
+            PublicationLog.objects.bulk_update(pending, ["caption"])
+        logger.info("Publication refresh checked=%s edited=%s groups=%s", checked, edited, len(groups))
+        return edited
+
+    def _edit(self, log: PublicationLog, caption: str) -> bool:
+        self.limiter.acquire()
+        try:
+            if log.has_video:
+                self.telegram.edit_message_caption(log.channel.chat_id, log.message_id, caption)
+            else:
+                self.telegram.edit_message_text(log.channel.chat_id, log.message_id, caption)
+        except Exception:  # noqa: BLE001
+            logger.exception(
+                "Edit failed channel=%s message_id=%s type=%s",
+                log.channel.chat_id,
+                log.message_id,
+                log.forecast_type,
+            )
+            return False
+        return True
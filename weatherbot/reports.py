@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import csv
+from datetime import date
+from typing import Iterator
+
+from django.conf import settings
+from django.db.models import Avg, Count, F, FloatField, Max, Q, QuerySet
+from django.db.models.functions import Cast
+
+from . import codec
+from .models import SIMULATED_CHAT_PREFIX, ForecastType, PublicationLog
+
+EXPORT_FIELDS = (
+    "id",
+    "created_at",
+    "target_date",
+    "forecast_type",
+    "channel__chat_id",
+    "channel__name",
+    "city__name",
+    "success",
+    "message_id",
+    "duration_ms",
+    "error",
+)
+
+_BOOLEAN_VALUES = {"true": True, "1": True, "false": False, "0": False}
+
+
+def filter_publication_logs(params) -> QuerySet:
+    """Applies date_from/date_to (target_date), channel (chat_id), success and forecast_type filters."""
+    queryset = PublicationLog.objects.exclude(channel__chat_id__startswith=SIMULATED_CHAT_PREFIX)
+    try:
+        if params.get("date_from"):
+            queryset = queryset.filter(target_date__gte=date.fromisoformat(params["date_from"]))
+        if params.get("date_to"):
+            queryset = queryset.filter(target_date__lte=date.fromisoformat(params["date_to"]))
+    except ValueError as exc:
+        raise ValueError("date_from/date_to must be YYYY-MM-DD") from exc
+
+    if params.get("channel"):
+        queryset = queryset.filter(channel__chat_id=params["channel"])
+    if params.get("success"):
+        success = _BOOLEAN_VALUES.get(params["success"].lower())
+        if success is None:
+            raise ValueError("success must be true or false")
+        queryset = queryset.filter(success=success)
+    if params.get("forecast_type"):
+        if params["forecast_type"] not in ForecastType.values:
+            raise ValueError("Invalid forecast_type")
+        queryset = queryset.filter(forecast_type=params["forecast_type"])
+    return queryset
+
+
+def _export_rows(queryset: QuerySet) -> Iterator[tuple]:
+    return queryset.order_by("id").values_list(*EXPORT_FIELDS).iterator(chunk_size=settings.LOG_EXPORT_CHUNK_SIZE)
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(queryset: QuerySet) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in _export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def iter_jsonl(queryset: QuerySet) -> Iterator[bytes]:
+    for row in _export_rows(queryset):
+        yield codec.dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n"
+
+
+def channel_daily_stats(queryset: QuerySet) -> QuerySet:
+    """Success rate and send latency per channel per target date, aggregated by the database."""
+    return (
+        queryset.values("target_date", chat_id=F("channel__chat_id"), channel_name=F("channel__name"))
+        .annotate(
+            total=Count("id"),
+            successful=Count("id", filter=Q(success=True)),
+            avg_duration_ms=Avg("duration_ms"),
+            max_duration_ms=Max("duration_ms"),
+        )
+        .annotate(success_rate=Cast("successful", FloatField()) / Cast("total", FloatField()))
+        .order_by("target_date", "chat_id")
+    )
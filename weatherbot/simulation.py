@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+import itertools
+import random
+import threading
+import time
+
+from django.db import OperationalError, connection
+from django.db.models import QuerySet
+
+from .forecast import DAILY_VARIABLES, DayForecast, DayPartForecast
+from .models import SIMULATED_CHAT_PREFIX, BotConfig, Channel, City, PublicationLog
+from .publisher import PublishSummary, WeatherPublisher
+from .telegram_api import TelegramAPIError
+
+SIMULATED_WEATHER_CODES = (0, 2, 3, 61, 63, 71, 95)
+SIMULATED_LARGEST_AUDIENCE = 100_000
+PRIORITY_ORDER = ("-priority", "name")
+NAME_ORDER = ("name",)
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Log-normal latency: `median_ms` is the typical call, `sigma` widens the tail (p95 ≈ median·e^(1.645σ))."""
+
+    median_ms: float = 0.0
+    sigma: float = 0.5
+    failure_rate: float = 0.0
+
+    def wait(self, rng: random.Random) -> None:
+        if self.median_ms > 0:
+            time.sleep(rng.lognormvariate(0, self.sigma) * self.median_ms / 1000)
+
+    def fails(self, rng: random.Random) -> bool:
+        return self.failure_rate > 0 and rng.random() < self.failure_rate
+
+
+class _FakeTransport:
+    def __init__(self, latency: LatencyModel, seed: int | None = None) -> None:
+        self.latency = latency
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self) -> bool:
+        with self._lock:
+            self.calls += 1
+            failed = self.latency.fails(self._rng)
+            if failed:
+                self.failures += 1
+        self.latency.wait(self._rng)
+        return failed
+
+
+class FakeTelegramClient(_FakeTransport):
+    """In-process stand-in for TelegramClient: never opens a socket."""
+
+    _message_ids = itertools.count(1)
+
+    def _respond(self, chat_id: str) -> str:
+        if self._call():
+            raise TelegramAPIError(
+                {"ok": False, "error_code": 500, "description": "Simulated failure"}, status_code=500
+            )
+        return str(next(self._message_ids))
+
+    def send_video(self, chat_id: str, caption: str, video_path) -> str:  # noqa: ARG002
+        return self._respond(chat_id)
+
+    def send_message(self, chat_id: str, text: str) -> str:  # noqa: ARG002
+        return self._respond(chat_id)
+
+    def get_chat(self, chat_id: str) -> dict:
+        self._respond(chat_id)
+        return {"id": chat_id, "type": "channel"}
+
+
+class FakeWeatherClient(_FakeTransport):
+    """
+    Replaces the whole WeatherClient rather than its HTTP session, so generated forecasts never reach
+    the shared ForecastSnapshot cache that real publications read.
+    """
+
+    def geocode_city(self, city_name: str) -> dict[str, float]:  # noqa: ARG002
+        self._call()
+        return {"latitude": 51.17, "longitude": 71.43}
+
+    def get_forecast(
+        self,
+        latitude: float,  # noqa: ARG002
+        longitude: float,  # noqa: ARG002
+        start_date: date,
+        days: int = 1,
+        *,
+        daily_variables: tuple[str, ...] = DAILY_VARIABLES,  # noqa: ARG002
+        hourly: bool = False,
+    ) -> list[DayForecast]:
+        if self._call():
+            raise ValueError("Simulated weather API failure")
+        forecast = []
+        for offset in range(max(days, 1)):
+            code = self._rng.choice(SIMULATED_WEATHER_CODES)
+            low = self._rng.randint(-15, 20)
+            parts = []
+            if hourly:
+                parts = [
+                    DayPartForecast(name=name, temp_min=low, temp_max=low + 4, weather_code=code)
+                    for name in ("morning", "afternoon", "evening")
+                ]
+            forecast.append(
+                DayForecast(
+                    date=(start_date + timedelta(days=offset)).isoformat(),
+                    temp_min=low,
+                    temp_max=low + 6,
+                    weather_code=code,
+                    parts=parts,
+                )
+            )
+        return forecast
+
+
+class SimulatedPublisher(WeatherPublisher):
+    """WeatherPublisher restricted to simulated channels and wired to fake transports."""
+
+    def __init__(
+        self,
+        telegram: FakeTelegramClient,
+        weather: FakeWeatherClient,
+        shards: int = 1,
+        shard_index: int = 0,
+        order_by: tuple[str, ...] = PRIORITY_ORDER,
+    ) -> None:
+        super().__init__(shards, shard_index)
+        self.order_by = order_by
+        # Instance attributes shadow the cached_property clients, so the real ones are never built.
+        self.telegram = telegram
+        self.weather = weather
+
+    def _channel_queryset(self) -> QuerySet[Channel]:
+        return Channel.objects.filter(chat_id__startswith=SIMULATED_CHAT_PREFIX).order_by(*self.order_by)
+
+    def _resolve_city(self, config: BotConfig) -> City:
+        city = config.default_city or City.objects.filter(active=True).first()
+        if not city:
+            raise ValueError("Не найден активный город для публикации")
+        if city.latitude is None or city.longitude is None:
+            # Unsaved copy: simulated coordinates must not overwrite the real city.
+            coordinates = self.weather.geocode_city(city.name)
+            city = City(pk=city.pk, name=city.name, **coordinates)
+        return city
+
+
+def create_simulated_channels(count: int, seed: int | None = None) -> int:
+    """
+    Simulated channels stay inactive, so a real publish run never picks them up. Audiences follow a Zipf
+    curve (a few large channels, a long tail) shuffled across names, so alphabetical order is not size order.
+    """
+    remove_simulated_channels()
+    ranks = list(range(1, count + 1))
+    random.Random(seed).shuffle(ranks)
+    Channel.objects.bulk_create(
+        Channel(
+            name=f"Simulation {index}",
+            chat_id=f"{SIMULATED_CHAT_PREFIX}{index}",
+            active=False,
+            subscriber_count=SIMULATED_LARGEST_AUDIENCE // rank,
+            priority=SIMULATED_LARGEST_AUDIENCE // rank,
+        )
+        for index, rank in enumerate(ranks)
+    )
+    return count
+
+
+def remove_simulated_channels() -> int:
+    deleted, _ = Channel.objects.filter(chat_id__startswith=SIMULATED_CHAT_PREFIX).delete()
+    return deleted
+
+
+class QueryStats:
+    """connection.execute_wrapper hook: query count, time spent in the database and "database is locked" errors."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.time_ms = 0.0
+        self.lock_errors = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as exc:
+            if "locked" in str(exc).lower():
+                with self._lock:
+                    self.lock_errors += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.queries += 1
+                self.time_ms += elapsed_ms
+
+
+def simulate_slot(
+    forecast_type: str,
+    telegram: FakeTelegramClient,
+    weather: FakeWeatherClient,
+    stats: QueryStats,
+    workers: int = 1,
+    order_by: tuple[str, ...] = PRIORITY_ORDER,
+) -> PublishSummary:
+    """One scheduled slot: `workers` threads each publish their crc32 shard, like publish_forecast --shards."""
+    # A slot is a fresh publication, not a duplicate of the previous simulated one.
+    PublicationLog.objects.filter(channel__chat_id__startswith=SIMULATED_CHAT_PREFIX).delete()
+
+    summary = PublishSummary()
+    errors: list[Exception] = []
+    merge_lock = threading.Lock()
+
+    def run_shard(shard_index: int) -> None:
+        publisher = SimulatedPublisher(telegram, weather, workers, shard_index, order_by)
+        try:
+            with connection.execute_wrapper(stats):
+                publisher.publish(forecast_type)
+        except Exception as exc:  # noqa: BLE001
+            with merge_lock:
+                errors.append(exc)
+        with merge_lock:
+            summary.merge(publisher.summary)
+
+    if workers == 1:
+        run_shard(0)
+    else:
+        threads = [threading.Thread(target=_in_own_connection, args=(run_shard, index)) for index in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+    return summary
+
+
+def _in_own_connection(func, *args) -> None:
+    try:
+        func(*args)
+    finally:
+        connection.close()
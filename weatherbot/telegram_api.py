@@ -2,55 +2,179 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import requests
 from django.conf import settings
 
+from . import codec
+from .codec import ACCEPT_ENCODING
+
+if TYPE_CHECKING:
+    import httpx
+
 logger = logging.getLogger(__name__)
 
 
+# 400 descriptions that mean the chat itself is gone or closed to the bot. Other 400s are about the request
+# (caption too long, bad file, unparsable entities) and say nothing about the chat.
+UNREACHABLE_CHAT_DESCRIPTIONS = (
+    "chat not found",
+    "bot was kicked",
+    "bot is not a member",
+    "have no rights to send",
+    "chat_write_forbidden",
+)
+
+
+class TelegramAPIError(RuntimeError):
+    def __init__(self, payload: dict, status_code: int | None = None) -> None:
+        super().__init__(f"Telegram API error: {payload}")
+        self.payload = payload
+        self.status_code = status_code
+        self.error_code = payload.get("error_code") or status_code
+        self.description = payload.get("description", "")
+
+    @property
+    def is_not_modified(self) -> bool:
+        return "message is not modified" in self.description.lower()
+
+    @property
+    def is_chat_unreachable(self) -> bool:
+        """Chat deleted, unknown or the bot was removed: retrying will not help."""
+        if self.error_code == 403:
+            return True
+        description = self.description.lower()
+        return self.error_code == 400 and any(text in description for text in UNREACHABLE_CHAT_DESCRIPTIONS)
+
+
+def _bot_base_url() -> str:
+    token = settings.TELEGRAM_BOT_TOKEN
+    if not token:
+        raise ValueError("TELEGRAM_BOT_TOKEN не задан")
+    return f"https://api.telegram.org/bot{token}"
+
+
+def _unwrap(payload: dict, status_code: int) -> dict:
+    if not payload.get("ok"):
+        raise TelegramAPIError(payload, status_code)
+    return payload.get("result", {})
+
+
 class TelegramClient:
     def __init__(self) -> None:
-        token = settings.TELEGRAM_BOT_TOKEN
-        if not token:
-            raise ValueError("TELEGRAM_BOT_TOKEN не задан")
-        self.base_url = f"https://api.telegram.org/bot{token}"
+        self.base_url = _bot_base_url()
         self.timeout = settings.DEFAULT_REQUEST_TIMEOUT
 
     def send_video(self, chat_id: str, caption: str, video_path: Path) -> str:
         if not video_path.exists():
             raise FileNotFoundError(f"Видео файл не найден: {video_path}")
 
-        url = f"{self.base_url}/sendVideo"
         with video_path.open("rb") as video_file:
-            response = requests.post(
-                url,
+            result = self._call(
+                "sendVideo",
                 data={"chat_id": chat_id, "caption": caption},
                 files={"video": video_file},
-                timeout=self.timeout,
             )
 
-        response.raise_for_status()
-        payload = response.json()
-        if not payload.get("ok"):
-            raise RuntimeError(f"Telegram API error: {payload}")
-
-        message_id = payload.get("result", {}).get("message_id")
+        message_id = result.get("message_id")
         logger.info("Telegram message sent chat_id=%s message_id=%s", chat_id, message_id)
         return str(message_id)
 
     def send_message(self, chat_id: str, text: str) -> str:
-        url = f"{self.base_url}/sendMessage"
+        result = self._call("sendMessage", data={"chat_id": chat_id, "text": text})
+
+        message_id = result.get("message_id")
+        logger.info("Telegram message sent chat_id=%s message_id=%s", chat_id, message_id)
+        return str(message_id)
+
+    def edit_message_caption(self, chat_id: str, message_id: str, caption: str) -> None:
+        self._edit("editMessageCaption", {"chat_id": chat_id, "message_id": message_id, "caption": caption})
+
+    def edit_message_text(self, chat_id: str, message_id: str, text: str) -> None:
+        self._edit("editMessageText", {"chat_id": chat_id, "message_id": message_id, "text": text})
+
+    def _edit(self, method: str, data: dict) -> None:
+        try:
+            self._call(method, data=data)
+        except TelegramAPIError as exc:
+            if not exc.is_not_modified:
+                raise
+        logger.info("Telegram message edited chat_id=%s message_id=%s", data["chat_id"], data["message_id"])
+
+    def get_me(self) -> dict:
+        return self._call("getMe", data={})
+
+    def get_chat(self, chat_id: str) -> dict:
+        return self._call("getChat", data={"chat_id": chat_id})
+
+    def get_chat_member(self, chat_id: str, user_id: int) -> dict:
+        return self._call("getChatMember", data={"chat_id": chat_id, "user_id": user_id})
+
+    def get_chat_member_count(self, chat_id: str) -> int:
+        return int(self._call("getChatMemberCount", data={"chat_id": chat_id}))
+
+    def get_updates(self, offset: int | None = None, timeout: int = 0) -> list[dict]:
+        data = {"timeout": timeout, "allowed_updates": '["message"]'}
+        if offset is not None:
+            data["offset"] = offset
+        return self._call("getUpdates", data=data, timeout=self.timeout + timeout)
+
+    def _call(self, method: str, data: dict, files: dict | None = None, timeout: float | None = None):
         response = requests.post(
-            url,
-            data={"chat_id": chat_id, "text": text},
-            timeout=self.timeout,
+            f"{self.base_url}/{method}",
+            data=data,
+            files=files,
+            headers=ACCEPT_ENCODING,
+            timeout=timeout or self.timeout,
+        )
+        try:
+            payload = codec.loads(response.content)
+        except ValueError:
+            response.raise_for_status()
+            raise
+        return _unwrap(payload, response.status_code)
+
+
+class AsyncTelegramClient:
+    """asyncio counterpart of TelegramClient for the ASGI publish path."""
+
+    def __init__(self, client: httpx.AsyncClient | None = None) -> None:
+        self.base_url = _bot_base_url()
+        self.timeout = settings.DEFAULT_REQUEST_TIMEOUT
+        if client is None:
+            import httpx
+
+            client = httpx.AsyncClient(timeout=self.timeout, headers=ACCEPT_ENCODING)
+        self._client = client
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def send_video(self, chat_id: str, caption: str, video: bytes, filename: str = "video.mp4") -> str:
+        result = await self._call(
+            "sendVideo",
+            data={"chat_id": chat_id, "caption": caption},
+            files={"video": (filename, video, "video/mp4")},
         )
-        response.raise_for_status()
-        payload = response.json()
-        if not payload.get("ok"):
-            raise RuntimeError(f"Telegram API error: {payload}")
+        message_id = result.get("message_id")
+        logger.info("Telegram message sent chat_id=%s message_id=%s", chat_id, message_id)
+        return str(message_id)
 
-        message_id = payload.get("result", {}).get("message_id")
+    async def send_message(self, chat_id: str, text: str) -> str:
+        result = await self._call("sendMessage", data={"chat_id": chat_id, "text": text})
+        message_id = result.get("message_id")
         logger.info("Telegram message sent chat_id=%s message_id=%s", chat_id, message_id)
         return str(message_id)
+
+    async def get_chat(self, chat_id: str) -> dict:
+        return await self._call("getChat", data={"chat_id": chat_id})
+
+    async def _call(self, method: str, data: dict, files: dict | None = None) -> dict:
+        response = await self._client.post(f"{self.base_url}/{method}", data=data, files=files)
+        try:
+            payload = codec.loads(response.content)
+        except ValueError:
+            response.raise_for_status()
+            raise
+        return _unwrap(payload, response.status_code)
@@ -1,10 +1,97 @@
-from unittest.mock import patch
+import asyncio
+from datetime import time as dt_time, timedelta
+from io import StringIO
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from django.test import Client, TestCase, override_settings
+import httpx
+import requests
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, JobExecutionEvent
+from apscheduler.schedulers.background import BackgroundScheduler
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
+from weatherbot.bot import BotUpdateProcessor, parse_update
+from weatherbot.channels import ChannelValidator, import_channels, parse_channel_rows, refresh_subscriber_counts
+from weatherbot.codec import STDLIB_CODEC, _orjson_codec, get_codec
 from weatherbot.content import build_caption, choose_visual_weather_type
-from weatherbot.models import ForecastType
-from weatherbot.weather_api import DayForecast
+from weatherbot.forecast import WEATHER_TYPE_BY_CODE
+from weatherbot.grid import snap_to_grid
+from weatherbot.i18n import FORECAST_TITLES, WEATHER_LABELS, weather_label
+from weatherbot.logs import ContextFilter, DuplicateFilter, JSONFormatter, QueueLogHandler, log_context
+from weatherbot.management.commands.profile_startup import parse_importtime
+from weatherbot.management.commands.run_scheduler import Command as SchedulerCommand
+from weatherbot.memory import MemoryMonitor
+from weatherbot.models import (
+    BotConfig,
+    Channel,
+    City,
+    ForecastSnapshot,
+    ForecastType,
+    Language,
+    PublicationLog,
+    PublishRequest,
+    Schedule,
+    SchedulerHeartbeat,
+    SchedulerRun,
+)
+from weatherbot.publisher import PublishSummary, WeatherPublisher, fetch_window_forecast, shard_for
+from weatherbot.readiness import readiness_monitor
+from weatherbot.refresher import PublicationRefresher
+from weatherbot.telegram_api import AsyncTelegramClient, TelegramAPIError, TelegramClient
+from weatherbot.weather_api import (
+    CORE_DAILY_VARIABLES,
+    DAILY_VARIABLES,
+    EXTRA_DAILY_VARIABLES,
+    AsyncWeatherClient,
+    DayForecast,
+    DayPartForecast,
+    WeatherClient,
+    forecast_cache,
+    upstream_latency,
+    weather_stats,
+)
+
+
+def _forecast_payload(dates, hourly_times=None):
+    payload = {
+        "daily": {
+            "time": dates,
+            "weather_code": [0] * len(dates),
+            "temperature_2m_max": [3] * len(dates),
+            "temperature_2m_min": [-2] * len(dates),
+            "relative_humidity_2m_mean": [70] * len(dates),
+            "wind_speed_10m_max": [10] * len(dates),
+            "precipitation_probability_max": [20] * len(dates),
+        }
+    }
+    if hourly_times is not None:
+        payload["hourly"] = {
+            "time": hourly_times,
+            "temperature_2m": [float(index) for index in range(len(hourly_times))],
+            "weather_code": [61 if index % 2 else 0 for index in range(len(hourly_times))],
+            "precipitation_probability": [10 * index for index in range(len(hourly_times))],
+        }
+    return payload
+
+
+def _json_response(payload):
+    response = MagicMock()
+    response.json.return_value = payload
+    response.content = json.dumps(payload).encode()
+    return response
 
 
 class ContentTests(TestCase):
@@ -54,6 +141,1069 @@ class ContentTests(TestCase):
         self.assertEqual(visual_type, "snow")
 
 
+    def test_build_caption_hourly_lists_day_parts(self):
+        day = DayForecast(
+            date="2026-02-12",
+            temp_min=-4,
+            temp_max=2,
+            weather_code=61,
+            parts=[
+                DayPartForecast(name="morning", temp_min=-4, temp_max=-1, weather_code=0),
+                DayPartForecast(
+                    name="evening",
+                    temp_min=-2,
+                    temp_max=0,
+                    weather_code=61,
+                    precipitation_probability_max=60,
+                ),
+            ],
+        )
+        caption = build_caption("Москва", ForecastType.HOURLY, [day])
+        self.assertIn("Утро: -4..-1°C, ясно", caption)
+        self.assertIn("Вечер: -2..0°C, небольшой дождь; осадки 60%", caption)
+
+    def test_build_caption_in_english(self):
+        day = DayForecast(date="2026-02-12", temp_min=-2, temp_max=3, weather_code=73, wind_speed_max=12.2)
+        caption = build_caption("Astana", ForecastType.TODAY, [day], Language.EN)
+        self.assertIn("Weather in Astana", caption)
+        self.assertIn("Conditions: snow", caption)
+        self.assertIn("Wind: up to 12 km/h", caption)
+
+    def test_every_weather_code_is_labelled_in_every_language(self):
+        for language in Language.values:
+            self.assertEqual(set(WEATHER_LABELS[language]), set(WEATHER_TYPE_BY_CODE), language)
+            self.assertEqual(set(FORECAST_TITLES[language]), set(ForecastType.values), language)
+        self.assertEqual(weather_label(42, Language.EN), "cloudy")
+
+
+class WeatherClientForecastTests(TestCase):
+    def setUp(self):
+        forecast_cache.clear()
+        self.weather = WeatherClient()
+        self.today = timezone.localdate()
+        self.dates = [(self.today + timedelta(days=offset)).isoformat() for offset in range(3)]
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_cached_series_is_reused_for_overlapping_windows(self, mocked_get):
+        mocked_get.return_value = _json_response(_forecast_payload(self.dates))
+        self.weather.get_forecast(55.75, 37.62, self.today, 3)
+        tomorrow = self.weather.get_forecast(55.75, 37.62, self.today + timedelta(days=1), 1)
+
+        self.assertEqual(mocked_get.call_count, 1)
+        self.assertEqual([day.date for day in tomorrow], [self.dates[1]])
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_only_missing_dates_are_requested(self, mocked_get):
+        mocked_get.side_effect = [
+            _json_response(_forecast_payload(self.dates[:1])),
+            _json_response(_forecast_payload(self.dates[1:])),
+        ]
+        self.weather.get_forecast(55.75, 37.62, self.today, 1, daily_variables=CORE_DAILY_VARIABLES)
+        forecast = self.weather.get_forecast(
+            55.75, 37.62, self.today, 3, daily_variables=CORE_DAILY_VARIABLES
+        )
+
+        self.assertEqual(len(forecast), 3)
+        params = mocked_get.call_args.kwargs["params"]
+        self.assertEqual((params["start_date"], params["end_date"]), (self.dates[1], self.dates[2]))
+        self.assertEqual(params["daily"], ",".join(CORE_DAILY_VARIABLES))
+        self.assertNotIn("hourly", params)
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_core_range_fetch_keeps_fuller_cached_day(self, mocked_get):
+        hours = [f"{self.dates[1]}T{hour:02d}:00" for hour in range(6, 24)]
+        mocked_get.side_effect = [
+            _json_response(_forecast_payload(self.dates[1:2], hours)),
+            _json_response(_forecast_payload(self.dates)),
+        ]
+        tomorrow = self.today + timedelta(days=1)
+        self.weather.get_forecast(55.75, 37.62, tomorrow, hourly=True)
+        # Today and the day after are missing, so the range fetch covers tomorrow again with fewer fields.
+        self.weather.get_forecast(55.75, 37.62, self.today, 3, daily_variables=CORE_DAILY_VARIABLES)
+        day = self.weather.get_forecast(55.75, 37.62, tomorrow, hourly=True)[0]
+
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertEqual(len(day.parts), 3)
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_week_after_today_gets_the_same_fields_on_every_day(self, mocked_get):
+        week_dates = [(self.today + timedelta(days=offset)).isoformat() for offset in range(7)]
+        week_payload = _forecast_payload(week_dates[1:])
+        for variable in EXTRA_DAILY_VARIABLES:
+            del week_payload["daily"][variable]
+        mocked_get.side_effect = [
+            _json_response(_forecast_payload(self.dates[:1])),
+            _json_response(week_payload),
+        ]
+        city = City(name="Москва", latitude=55.75, longitude=37.62)
+
+        fetch_window_forecast(self.weather, city, ForecastType.TODAY)
+        week = fetch_window_forecast(self.weather, city, ForecastType.WEEK)
+
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertEqual(len(week), 7)
+        self.assertEqual(
+            {(day.humidity_mean, day.wind_speed_max, day.precipitation_probability_max) for day in week},
+            {(None, None, None)},
+        )
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_async_client_keeps_a_sync_api_and_single_flight(self, mocked_get):
+        mocked_get.return_value = _json_response(_forecast_payload(self.dates))
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, content=json.dumps(_forecast_payload(self.dates[:1])))
+
+        async def fetch_concurrently():
+            weather = AsyncWeatherClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+            try:
+                return await asyncio.gather(*(weather.aget_forecast(43.24, 76.89, self.today) for _ in range(5)))
+            finally:
+                await weather.aclose()
+
+        results = asyncio.run(fetch_concurrently())
+        sync_days = AsyncWeatherClient().get_daily_forecast(55.75, 37.62)
+
+        self.assertEqual(len(requests_seen), 1)
+        self.assertEqual({len(days) for days in results}, {1})
+        self.assertEqual([day.date for day in sync_days], self.dates)
+
+    @patch("weatherbot.weather_api.GEOCODE_CACHE_SIZE", 2)
+    @patch.dict("weatherbot.weather_api._geocode_cache", clear=True)
+    @patch("weatherbot.weather_api.requests.get")
+    def test_geocode_cache_evicts_least_recently_used(self, mocked_get):
+        mocked_get.return_value = _json_response({"results": [{"latitude": 51.17, "longitude": 71.43}]})
+        for name in ("Астана", "Алматы", "Астана", "Караганда", "Астана", "Алматы"):
+            self.weather.geocode_city(name)
+
+        # Астана stays cached as the most recently used; Алматы was evicted by Караганда and fetched again.
+        self.assertEqual(mocked_get.call_count, 4)
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_hourly_window_is_aggregated_into_day_parts(self, mocked_get):
+        hours = [f"{self.dates[0]}T{hour:02d}:00" for hour in range(6, 24)]
+        mocked_get.return_value = _json_response(_forecast_payload(self.dates[:1], hours))
+
+        day = self.weather.get_forecast(55.75, 37.62, self.today, hourly=True)[0]
+
+        params = mocked_get.call_args.kwargs["params"]
+        self.assertEqual(params["start_hour"], f"{self.dates[0]}T06:00")
+        self.assertEqual(params["end_hour"], f"{self.dates[0]}T23:00")
+        self.assertEqual([part.name for part in day.parts], ["morning", "afternoon", "evening"])
+        self.assertEqual((day.parts[0].temp_min, day.parts[0].temp_max), (0.0, 5.0))
+        self.assertEqual(day.parts[0].weather_code, 61)
+        self.assertEqual(day.parts[2].precipitation_probability_max, 170)
+
+
+class LoggingTests(TestCase):
+    def _logger(self, handler):
+        logger = logging.getLogger(f"weatherbot.tests.{self._testMethodName}")
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger
+
+    def test_queue_handler_writes_json_with_context_from_listener(self):
+        handler = QueueLogHandler(queue_size=100)
+        self.addCleanup(handler.close)
+        handler.target.setStream(StringIO())
+        handler.setFormatter(JSONFormatter())
+        handler.addFilter(ContextFilter())
+        logger = self._logger(handler)
+
+        with log_context(run_id="run1", channel="@a"):
+            logger.info("Telegram message sent chat_id=%s", "@a")
+        logger.info("outside")
+        handler.flush()
+
+        lines = [json.loads(line) for line in handler.target.stream.getvalue().splitlines()]
+        self.assertEqual(
+            [(line["message"], line.get("run_id"), line.get("channel")) for line in lines],
+            [("Telegram message sent chat_id=@a", "run1", "@a"), ("outside", None, None)],
+        )
+
+    def test_repeated_warnings_are_logged_once_per_window(self):
+        stream = StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.addFilter(DuplicateFilter(window=60))
+        logger = self._logger(handler)
+
+        with patch("weatherbot.logs.time.monotonic", return_value=100.0):
+            for _ in range(5):
+                logger.warning("Unknown weather code=%s, fallback to 'cloudy'", 42)
+            logger.warning("Unknown weather code=%s, fallback to 'cloudy'", 43)
+            logger.info("not deduplicated")
+            logger.info("not deduplicated")
+        with patch("weatherbot.logs.time.monotonic", return_value=161.0):
+            logger.warning("Unknown weather code=%s, fallback to 'cloudy'", 42)
+
+        self.assertEqual(
+            stream.getvalue().splitlines(),
+            [
+                "Unknown weather code=42, fallback to 'cloudy'",
+                "Unknown weather code=43, fallback to 'cloudy'",
+                "not deduplicated",
+                "not deduplicated",
+                "Unknown weather code=42, fallback to 'cloudy' (repeated 4 times in the last 60s)",
+            ],
+        )
+
+
+class JSONCodecTests(TestCase):
+    def test_codecs_agree_on_forecast_payload(self):
+        payload = _forecast_payload(["2026-02-12", "2026-02-13"], ["2026-02-12T06:00", "2026-02-12T07:00"])
+        raw = STDLIB_CODEC.dumps(payload)
+        for json_codec in filter(None, (STDLIB_CODEC, _orjson_codec())):
+            self.assertEqual(json_codec.loads(raw), payload, json_codec.name)
+            self.assertEqual(json.loads(json_codec.dumps(payload)), payload, json_codec.name)
+
+    def test_codecs_format_datetimes_alike(self):
+        orjson_codec = _orjson_codec()
+        if orjson_codec is None:
+            self.skipTest("orjson is not installed")
+        moment = timezone.now().replace(microsecond=123456)
+        value = {"at": moment, "day": moment.date(), "time": dt_time(6, 30, 0, 999), "name": "Астана"}
+        self.assertEqual(orjson_codec.dumps(value), STDLIB_CODEC.dumps(value))
+
+    def test_auto_falls_back_to_stdlib_without_orjson(self):
+        get_codec.cache_clear()
+        self.addCleanup(get_codec.cache_clear)
+        with patch("weatherbot.codec._orjson_codec", return_value=None):
+            self.assertIs(get_codec("auto"), STDLIB_CODEC)
+            with self.assertRaises(ImportError):
+                get_codec("orjson")
+
+
+@override_settings(WEATHER_GRID_STEP_DEGREES=0.1)
+class ForecastGridTests(TestCase):
+    def setUp(self):
+        forecast_cache.clear()
+        self.today = timezone.localdate()
+
+    def test_city_snaps_to_grid_cell_on_save(self):
+        city = City.objects.create(name="Астана", latitude=51.17, longitude=71.43)
+        self.assertEqual(city.grid_cell, "51.1500,71.4500")
+        self.assertEqual(snap_to_grid(51.2, 71.4), (51.25, 71.45))
+
+        city.latitude = 43.24
+        city.save(update_fields=["latitude"])
+        self.assertEqual(City.objects.get(pk=city.pk).grid_cell, "43.2500,71.4500")
+
+    def test_snapped_cell_stays_within_coordinate_ranges(self):
+        self.assertEqual(snap_to_grid(90, 180), (90.0, 180.0))
+        self.assertEqual(snap_to_grid(-90, -180, step=1), (-89.5, -179.5))
+        self.assertEqual(snap_to_grid(51.17, 71.43, step=0), (51.17, 71.43))
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_nearby_cities_share_one_upstream_fetch(self, mocked_get):
+        mocked_get.return_value = _json_response(_forecast_payload([self.today.isoformat()]))
+        weather = WeatherClient()
+        weather.get_forecast(51.17, 71.43, self.today)
+        weather.get_forecast(51.12, 71.48, self.today)
+
+        self.assertEqual(mocked_get.call_count, 1)
+        params = mocked_get.call_args.kwargs["params"]
+        self.assertEqual((params["latitude"], params["longitude"]), (51.15, 71.45))
+
+    def test_plan_counts_one_call_per_uncached_cell(self):
+        astana = City.objects.create(name="Астана", latitude=51.17, longitude=71.43)
+        City.objects.create(name="Астана-2", latitude=51.12, longitude=71.48)
+        City.objects.create(name="Алматы", latitude=43.24, longitude=76.89)
+        City.objects.create(name="Без координат")
+        BotConfig.objects.update_or_create(singleton=True, defaults={"default_city": astana})
+        forecast_cache.merge(
+            snap_to_grid(51.17, 71.43),
+            [DayForecast(date=self.today.isoformat(), temp_min=-3, temp_max=4, weather_code=0)],
+            DAILY_VARIABLES,
+            False,
+            self.today.isoformat(),
+        )
+
+        out = StringIO()
+        call_command("plan_forecast_fetches", "today", json=True, stdout=out)
+
+        plan = json.loads(out.getvalue())
+        self.assertEqual((plan["cities"], plan["grid_cells"]), (4, 2))
+        self.assertEqual(plan["forecasts"]["today"], {"slot_calls": 0, "all_cities_calls": 2})
+
+
+class WeatherClientResilienceTests(TestCase):
+    def setUp(self):
+        forecast_cache.clear()
+        upstream_latency.clear()
+        weather_stats.clear()
+        self.weather = WeatherClient()
+        self.today = timezone.localdate()
+
+    @override_settings(WEATHER_CACHE_TTL_SECONDS=0)
+    @patch.object(WeatherClient, "_start_background_refresh")
+    @patch("weatherbot.weather_api.requests.get")
+    def test_stale_snapshot_is_served_when_upstream_fails(self, mocked_get, mocked_refresh):
+        mocked_get.return_value = _json_response(_forecast_payload([self.today.isoformat()]))
+        self.weather.get_forecast(55.75, 37.62, self.today)
+        forecast_cache.clear()
+        mocked_get.side_effect = requests.Timeout("upstream timeout")
+
+        forecast = self.weather.get_forecast(55.75, 37.62, self.today)
+
+        self.assertEqual(forecast[0].date, self.today.isoformat())
+        self.assertEqual(weather_stats.snapshot()["stale_served"], 1)
+        mocked_refresh.assert_called_once()
+
+    @override_settings(WEATHER_CACHE_TTL_SECONDS=0, WEATHER_STALE_MAX_AGE_SECONDS=0)
+    @patch("weatherbot.weather_api.requests.get")
+    def test_too_old_snapshot_is_not_served(self, mocked_get):
+        mocked_get.return_value = _json_response(_forecast_payload([self.today.isoformat()]))
+        self.weather.get_forecast(55.75, 37.62, self.today)
+        mocked_get.side_effect = requests.ConnectionError("down")
+
+        with self.assertRaises(requests.ConnectionError):
+            self.weather.get_forecast(55.75, 37.62, self.today)
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_fresh_snapshot_avoids_upstream_request(self, mocked_get):
+        mocked_get.return_value = _json_response(_forecast_payload([self.today.isoformat()]))
+        self.weather.get_forecast(55.75, 37.62, self.today)
+        forecast_cache.clear()
+
+        self.weather.get_forecast(55.75, 37.62, self.today)
+
+        self.assertEqual(mocked_get.call_count, 1)
+        self.assertEqual(weather_stats.snapshot()["snapshot_hits"], 1)
+
+    @override_settings(WEATHER_HEDGE_DELAY_SECONDS=0.05)
+    @patch("weatherbot.weather_api.requests.get")
+    def test_slow_request_is_hedged(self, mocked_get):
+        fast_payload = _forecast_payload([self.today.isoformat()])
+        calls = []
+
+        def fake_get(*args, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                time.sleep(0.5)
+            return _json_response(fast_payload)
+
+        mocked_get.side_effect = fake_get
+        started = time.perf_counter()
+        self.weather.get_forecast(55.75, 37.62, self.today)
+
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(weather_stats.snapshot()["hedged_requests"], 1)
+
+
+def _command_update(update_id, chat_id, text):
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": text}}
+
+
+class BotUpdateProcessorTests(TestCase):
+    def setUp(self):
+        forecast_cache.clear()
+        self.telegram = MagicMock()
+        self.processor = BotUpdateProcessor(telegram=self.telegram, weather=WeatherClient(), max_workers=4)
+        City.objects.create(name="Москва", latitude=55.75, longitude=37.62)
+
+    def tearDown(self):
+        self.processor.shutdown()
+
+    def test_parse_update_accepts_bot_mention(self):
+        command = parse_update(_command_update(1, -100, "/weather@forecast_bot  Казань"))
+        self.assertEqual((command.chat_id, command.city_query), ("-100", "Казань"))
+        self.assertIsNone(parse_update(_command_update(2, -100, "hello")))
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_burst_for_one_city_costs_one_upstream_request(self, mocked_get):
+        mocked_get.return_value = _json_response(_forecast_payload([timezone.localdate().isoformat()]))
+        updates = [_command_update(index, 1000 + index % 50, "/weather москва") for index in range(300)]
+
+        sent = self.processor.process(updates)
+
+        self.assertEqual(mocked_get.call_count, 1)
+        self.assertEqual(sent, 50)
+        self.assertEqual(self.telegram.send_message.call_count, 50)
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_replies_for_one_chat_are_coalesced(self, mocked_get):
+        mocked_get.return_value = _json_response(_forecast_payload([timezone.localdate().isoformat()]))
+        updates = [
+            _command_update(1, 7, "/weather Москва"),
+            _command_update(2, 7, "/weather Нигдевилль"),
+            _command_update(3, 7, "/weather"),
+        ]
+
+        self.processor.process(updates)
+
+        self.telegram.send_message.assert_called_once()
+        text = self.telegram.send_message.call_args.args[1]
+        self.assertIn("Погода в Москва", text)
+        self.assertIn("Город не найден: Нигдевилль", text)
+        self.assertEqual(text.count("Погода в Москва"), 1)
+
+
+class BotWorkerConnectionTests(TransactionTestCase):
+    @patch("weatherbot.bot.close_old_connections")
+    @patch("weatherbot.weather_api.requests.get")
+    def test_reply_rendered_on_worker_manages_its_connection(self, mocked_get, mocked_close):
+        forecast_cache.clear()
+        City.objects.create(name="Москва", latitude=55.75, longitude=37.62)
+        mocked_get.return_value = _json_response(_forecast_payload([timezone.localdate().isoformat()]))
+        threads = []
+        mocked_close.side_effect = lambda: threads.append(threading.current_thread().name)
+        processor = BotUpdateProcessor(telegram=MagicMock(), weather=WeatherClient(), max_workers=2)
+        try:
+            sent = processor.process([_command_update(1, 7, "/weather Москва")])
+        finally:
+            processor.shutdown()
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith("bot-worker") for name in threads))
+        self.assertEqual(ForecastSnapshot.objects.count(), 1)
+
+
+class TelegramWebhookTests(TestCase):
+    @override_settings(TELEGRAM_WEBHOOK_SECRET="hook-secret")
+    def test_webhook_requires_secret(self):
+        response = Client().post("/telegram/webhook/", data="{}", content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(TELEGRAM_WEBHOOK_SECRET="hook-secret")
+    @patch("weatherbot.views.get_update_dispatcher")
+    def test_webhook_enqueues_update(self, mocked_dispatcher):
+        mocked_dispatcher.return_value.submit.return_value = True
+        update = _command_update(1, 7, "/weather Москва")
+        response = Client().post(
+            "/telegram/webhook/",
+            data=update,
+            content_type="application/json",
+            HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN="hook-secret",
+        )
+        self.assertEqual(response.status_code, 200)
+        mocked_dispatcher.return_value.submit.assert_called_once_with(update)
+
+
+class ChannelImportTests(TestCase):
+    def _telegram(self):
+        telegram = MagicMock()
+        telegram.get_me.return_value = {"id": 42}
+        failures = {
+            "@gone": TelegramAPIError({"ok": False, "error_code": 400, "description": "Bad Request: chat not found"}),
+            "@kicked": TelegramAPIError({"ok": False, "error_code": 403, "description": "Forbidden: bot was kicked"}),
+            "@flaky": TelegramAPIError({"ok": False, "error_code": 502, "description": "Bad Gateway"}),
+        }
+
+        def get_chat(chat_id):
+            if chat_id in failures:
+                raise failures[chat_id]
+            return {"id": -1, "title": f"Title {chat_id}"}
+
+        telegram.get_chat.side_effect = get_chat
+        telegram.get_chat_member.side_effect = lambda chat_id, user_id: {
+            "status": "left" if chat_id == "@left" else "administrator"
+        }
+        return telegram
+
+    def test_parse_channel_rows_csv_and_json(self):
+        csv_rows = parse_channel_rows("chat_id,name\n@a,Alpha\n@b,\n@a,Dup\n", "csv")
+        json_rows = parse_channel_rows('["@a", {"chat_id": -100, "name": "Beta"}]', "json")
+
+        self.assertEqual([(row.chat_id, row.name) for row in csv_rows], [("@a", "Alpha"), ("@b", "")])
+        self.assertEqual([(row.chat_id, row.name) for row in json_rows], [("@a", ""), ("-100", "Beta")])
+        with self.assertRaises(ValueError):
+            parse_channel_rows("name\nAlpha\n", "csv")
+
+    @override_settings(CHANNEL_VALIDATION_RATE_PER_SECOND=0)
+    def test_import_marks_unreachable_channels_inactive(self):
+        Channel.objects.create(name="Old", chat_id="@kicked")
+        rows = parse_channel_rows('["@ok", "@gone", "@left", "@flaky", "@kicked"]', "json")
+
+        result = import_channels(rows, ChannelValidator(self._telegram(), max_workers=4))
+
+        self.assertEqual((result.created, result.inactive, result.existing, result.deactivated), (4, 2, 1, 1))
+        active = dict(Channel.objects.values_list("chat_id", "active"))
+        self.assertEqual(
+            active, {"@ok": True, "@gone": False, "@left": False, "@flaky": True, "@kicked": False}
+        )
+        self.assertEqual(Channel.objects.get(chat_id="@ok").name, "Title @ok")
+
+    @override_settings(CHANNEL_VALIDATION_RATE_PER_SECOND=0)
+    def test_subscriber_refresh_sets_auto_priorities_only(self):
+        Channel.objects.create(name="Big", chat_id="@big")
+        Channel.objects.create(name="Pinned", chat_id="@pinned", priority=5, auto_priority=False)
+        Channel.objects.create(name="Flaky", chat_id="@flaky", priority=7, subscriber_count=70)
+        telegram = MagicMock()
+        counts = {"@big": 12000, "@pinned": 300}
+
+        def get_chat_member_count(chat_id):
+            if chat_id not in counts:
+                raise TelegramAPIError({"ok": False, "error_code": 502, "description": "Bad Gateway"})
+            return counts[chat_id]
+
+        telegram.get_chat_member_count.side_effect = get_chat_member_count
+
+        updated = refresh_subscriber_counts(Channel.objects.all(), telegram)
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(
+            list(Channel.objects.values_list("chat_id", "priority", "subscriber_count")),
+            [("@big", 12000, 12000), ("@flaky", 7, 70), ("@pinned", 5, 300)],
+        )
+
+    def test_admin_import_view(self):
+        admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pass")
+        self.client.force_login(admin_user)
+        self.assertEqual(self.client.get("/admin/weatherbot/channel/import/").status_code, 200)
+
+        upload = SimpleUploadedFile("channels.csv", "chat_id,name\n@a,Альфа\n".encode())
+        response = self.client.post("/admin/weatherbot/channel/import/", {"file": upload})
+
+        self.assertRedirects(response, "/admin/weatherbot/channel/")
+        self.assertEqual(Channel.objects.get(chat_id="@a").name, "Альфа")
+
+    @override_settings(CHANNEL_ADMIN_SYNC_LIMIT=2, CHANNEL_VALIDATION_RATE_PER_SECOND=0)
+    def test_large_admin_batches_go_to_the_command(self):
+        admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pass")
+        self.client.force_login(admin_user)
+        upload = SimpleUploadedFile("channels.json", b'["@ok", "@gone", "@left"]')
+
+        with patch("weatherbot.admin.ChannelValidator") as validator:
+            response = self.client.post(
+                "/admin/weatherbot/channel/import/", {"file": upload, "validate": "on"}, follow=True
+            )
+            self.client.post(
+                "/admin/weatherbot/channel/",
+                {"action": "validate_channels", "_selected_action": list(Channel.objects.values_list("pk", flat=True))},
+            )
+
+        validator.assert_not_called()
+        self.assertContains(response, "validate_channels")
+        self.assertEqual(Channel.objects.filter(active=True).count(), 3)
+
+        with patch("weatherbot.management.commands.validate_channels.ChannelValidator") as validator:
+            validator.return_value = ChannelValidator(self._telegram(), max_workers=2)
+            call_command("validate_channels", stdout=StringIO())
+
+        self.assertEqual(set(Channel.objects.filter(active=True).values_list("chat_id", flat=True)), {"@ok"})
+
+
+class PublicationRefresherTests(TestCase):
+    def setUp(self):
+        forecast_cache.clear()
+        self.today = timezone.localdate()
+        self.city = City.objects.create(name="Москва", latitude=55.75, longitude=37.62)
+        self.telegram = MagicMock()
+
+    def _log(self, chat_id, caption, has_video=True):
+        channel = Channel.objects.create(name=chat_id, chat_id=chat_id)
+        return PublicationLog.objects.create(
+            channel=channel,
+            city=self.city,
+            forecast_type=ForecastType.TODAY,
+            target_date=self.today,
+            message_id="10",
+            caption=caption,
+            has_video=has_video,
+            success=True,
+        )
+
+    @patch("weatherbot.weather_api.requests.get")
+    def test_only_changed_captions_are_edited(self, mocked_get):
+        mocked_get.return_value = _json_response(_forecast_payload([self.today.isoformat()]))
+        current = build_caption(
+            "Москва",
+            ForecastType.TODAY,
+            [
+                DayForecast(
+                    date=self.today.isoformat(),
+                    temp_min=-2,
+                    temp_max=3,
+                    weather_code=0,
+                    humidity_mean=70,
+                    wind_speed_max=10,
+                    precipitation_probability_max=20,
+                )
+            ],
+        )
+        unchanged = self._log("@same", current)
+        video = self._log("@video", "old caption")
+        text = self._log("@text", "old caption", has_video=False)
+        simulated = self._log("sim:0", "old caption")
+
+        edited = PublicationRefresher(telegram=self.telegram, weather=WeatherClient()).refresh()
+
+        self.assertEqual(edited, 2)
+        self.assertEqual(mocked_get.call_count, 1)
+        self.telegram.edit_message_caption.assert_called_once_with("@video", "10", current)
+        self.telegram.edit_message_text.assert_called_once_with("@text", "10", current)
+        for log in (unchanged, video, text):
+            log.refresh_from_db()
+            self.assertEqual(log.caption, current)
+        simulated.refresh_from_db()
+        self.assertEqual(simulated.caption, "old caption")
+
+    @override_settings(TELEGRAM_BOT_TOKEN="token")
+    @patch("weatherbot.telegram_api.requests.post")
+    def test_not_modified_edit_is_not_an_error(self, mocked_post):
+        mocked_post.return_value = _json_response(
+            {"ok": False, "error_code": 400, "description": "Bad Request: message is not modified"}
+        )
+        TelegramClient().edit_message_caption("@chat", "10", "caption")
+        mocked_post.return_value = _json_response(
+            {"ok": False, "error_code": 400, "description": "Bad Request: message to edit not found"}
+        )
+        with self.assertRaises(RuntimeError):
+            TelegramClient().edit_message_caption("@chat", "10", "caption")
+
+
+@patch("weatherbot.publisher.pick_video_path")
+class ChannelHealthTests(TestCase):
+    def setUp(self):
+        forecast_cache.clear()
+        today = timezone.localdate().isoformat()
+        city = City.objects.create(name="Астана", latitude=51.17, longitude=71.43)
+        BotConfig.objects.update_or_create(singleton=True, defaults={"default_city": city})
+        self.channel = Channel.objects.create(name="dead", chat_id="@dead")
+        forecast_cache.merge(
+            snap_to_grid(51.17, 71.43),
+            [DayForecast(date=today, temp_min=-3, temp_max=4, weather_code=0)],
+            DAILY_VARIABLES,
+            False,
+            today,
+        )
+        self.publisher = WeatherPublisher()
+        self.publisher.telegram = MagicMock()
+
+    def _publish_after_cooldown(self):
+        Channel.objects.filter(pk=self.channel.pk).update(circuit_open_until=timezone.now() - timedelta(seconds=1))
+        self.publisher.publish(ForecastType.TODAY)
+        self.channel.refresh_from_db()
+
+    def test_permanent_failures_open_circuit_probe_and_deactivate(self, mocked_video_path):
+        mocked_video_path.return_value = MagicMock(exists=MagicMock(return_value=False))
+        kicked = TelegramAPIError({"ok": False, "error_code": 403, "description": "Forbidden: bot was kicked"})
+        self.publisher.telegram.send_message.side_effect = kicked
+        self.publisher.telegram.get_chat.side_effect = kicked
+
+        self.publisher.publish(ForecastType.TODAY)
+        self.channel.refresh_from_db()
+        self.assertEqual((self.channel.consecutive_failures, self.channel.last_error_code), (1, 403))
+        self.assertGreater(self.channel.circuit_open_until, timezone.now())
+
+        self.publisher.publish(ForecastType.TODAY)
+        self.assertEqual(self.publisher.telegram.get_chat.call_count, 0)
+
+        self._publish_after_cooldown()
+        self._publish_after_cooldown()
+
+        self.assertEqual(self.publisher.telegram.send_message.call_count, 1)
+        self.assertEqual(self.publisher.telegram.get_chat.call_count, 2)
+        self.assertEqual(self.channel.consecutive_failures, 3)
+        self.assertFalse(self.channel.active)
+
+    def test_transient_failures_open_circuit_at_threshold_and_recover(self, mocked_video_path):
+        mocked_video_path.return_value = MagicMock(exists=MagicMock(return_value=False))
+        self.publisher.telegram.send_message.side_effect = requests.Timeout("read timeout")
+
+        for _ in range(2):
+            self.publisher.publish(ForecastType.TODAY)
+        self.channel.refresh_from_db()
+        self.assertIsNone(self.channel.circuit_open_until)
+
+        self.publisher.publish(ForecastType.TODAY)
+        self.channel.refresh_from_db()
+        self.assertIsNotNone(self.channel.circuit_open_until)
+        self.assertTrue(self.channel.active)
+
+        self.publisher.telegram.send_message.side_effect = None
+        self.publisher.telegram.send_message.return_value = "7"
+        self._publish_after_cooldown()
+
+        self.assertEqual((self.channel.consecutive_failures, self.channel.circuit_open_until), (0, None))
+        self.publisher.telegram.get_chat.assert_called_once_with("@dead")
+
+    def test_content_errors_never_deactivate_a_reachable_channel(self, mocked_video_path):
+        mocked_video_path.return_value = MagicMock(exists=MagicMock(return_value=False))
+        self.publisher.telegram.send_message.side_effect = TelegramAPIError(
+            {"ok": False, "error_code": 400, "description": "Bad Request: message caption is too long"}
+        )
+
+        self.publisher.publish(ForecastType.TODAY)
+        for _ in range(settings.CHANNEL_DEACTIVATE_AFTER_FAILURES + 2):
+            self._publish_after_cooldown()
+
+        self.assertTrue(self.channel.active)
+        self.assertEqual(self.channel.last_error_code, 400)
+        self.assertLess(self.channel.consecutive_failures, settings.CHANNEL_DEACTIVATE_AFTER_FAILURES)
+        self.assertEqual(self.publisher.telegram.send_message.call_count, settings.CHANNEL_DEACTIVATE_AFTER_FAILURES + 3)
+
+
+@override_settings(TELEGRAM_BOT_TOKEN="token")
+class AsyncPublishTests(TransactionTestCase):
+    def setUp(self):
+        forecast_cache.clear()
+        self.today = timezone.localdate().isoformat()
+        city = City.objects.create(name="Астана", latitude=51.17, longitude=71.43)
+        BotConfig.objects.update_or_create(singleton=True, defaults={"default_city": city})
+        for index in range(3):
+            Channel.objects.create(name=f"c{index}", chat_id=f"@c{index}")
+        forecast_cache.merge(
+            snap_to_grid(51.17, 71.43),
+            [DayForecast(date=self.today, temp_min=-3, temp_max=4, weather_code=0)],
+            DAILY_VARIABLES,
+            False,
+            self.today,
+        )
+        self.requests = []
+
+    def _async_telegram(self):
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(200, content=json.dumps({"ok": True, "result": {"message_id": 5}}))
+
+        return AsyncTelegramClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    @patch("weatherbot.publisher.pick_video_path")
+    def test_apublish_matches_sync_rendering_and_logs(self, mocked_video_path):
+        mocked_video_path.return_value = MagicMock(exists=MagicMock(return_value=False))
+        with patch("weatherbot.telegram_api.AsyncTelegramClient", side_effect=self._async_telegram):
+            published = asyncio.run(WeatherPublisher().apublish(ForecastType.TODAY))
+
+        self.assertEqual(published, 3)
+        self.assertEqual(len(self.requests), 3)
+        log = PublicationLog.objects.get(channel__chat_id="@c0")
+        self.assertTrue(log.success)
+        self.assertEqual(log.message_id, "5")
+        self.assertIn("Погода в Астана", log.caption)
+
+        with patch("weatherbot.telegram_api.AsyncTelegramClient", side_effect=self._async_telegram):
+            self.assertEqual(asyncio.run(WeatherPublisher().apublish(ForecastType.TODAY)), 0)
+        self.assertEqual(len(self.requests), 3)
+
+    @patch("weatherbot.publisher.pick_video_path")
+    def test_failed_probe_counts_as_one_skip(self, mocked_video_path):
+        mocked_video_path.return_value = MagicMock(exists=MagicMock(return_value=False))
+        Channel.objects.filter(chat_id="@c1").update(
+            consecutive_failures=3, circuit_open_until=timezone.now() - timedelta(minutes=1)
+        )
+
+        def handler(request):
+            self.requests.append(request)
+            if request.url.path.endswith("/getChat"):
+                return httpx.Response(
+                    400, content=json.dumps({"ok": False, "error_code": 400, "description": "chat not found"})
+                )
+            return httpx.Response(200, content=json.dumps({"ok": True, "result": {"message_id": 5}}))
+
+        def telegram():
+            return AsyncTelegramClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+        publisher = WeatherPublisher()
+        with patch("weatherbot.telegram_api.AsyncTelegramClient", side_effect=telegram):
+            self.assertEqual(asyncio.run(publisher.apublish(ForecastType.TODAY)), 2)
+
+        summary = publisher.summary
+        self.assertEqual((summary.published, summary.failed, summary.skipped), (2, 0, 1))
+
+    @override_settings(CRON_SECRET_TOKEN="secret-123")
+    @patch("weatherbot.views.WeatherPublisher")
+    def test_async_endpoint(self, mocked_publisher_cls):
+        mocked_publisher_cls.return_value.apublish = AsyncMock(return_value=2)
+        response = Client().post("/internal/publish-async/today/", HTTP_X_CRON_TOKEN="secret-123")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["published"], 2)
+
+
+@override_settings(TELEGRAM_BOT_TOKEN="token")
+class ShardedPublishTests(TestCase):
+    def setUp(self):
+        forecast_cache.clear()
+        today = timezone.localdate().isoformat()
+        city = City.objects.create(name="Астана", latitude=51.17, longitude=71.43)
+        BotConfig.objects.update_or_create(singleton=True, defaults={"default_city": city})
+        self.chat_ids = [f"@c{index}" for index in range(20)]
+        for chat_id in self.chat_ids:
+            Channel.objects.create(name=chat_id, chat_id=chat_id)
+        forecast_cache.merge(
+            snap_to_grid(51.17, 71.43),
+            [DayForecast(date=today, temp_min=-3, temp_max=4, weather_code=0)],
+            DAILY_VARIABLES,
+            False,
+            today,
+        )
+
+    @patch("weatherbot.publisher.pick_video_path")
+    @patch("weatherbot.telegram_api.requests.post")
+    def test_shards_partition_channels_without_overlap(self, mocked_post, mocked_video_path):
+        mocked_video_path.return_value = MagicMock(exists=MagicMock(return_value=False))
+        mocked_post.return_value = _json_response({"ok": True, "result": {"message_id": 1}})
+
+        summaries = []
+        for index in range(3):
+            out = StringIO()
+            call_command("publish_forecast", "today", shards=3, shard_index=index, json=True, stdout=out)
+            summaries.append(json.loads(out.getvalue()))
+
+        sent_to = sorted(call.kwargs["data"]["chat_id"] for call in mocked_post.call_args_list)
+        self.assertEqual(sent_to, sorted(self.chat_ids))
+        self.assertEqual(sum(summary["published"] for summary in summaries), 20)
+        self.assertEqual(
+            [summary["channels"] for summary in summaries],
+            [sum(shard_for(chat_id, 3) == index for chat_id in self.chat_ids) for index in range(3)],
+        )
+
+    @patch("weatherbot.management.commands.publish_forecast.WeatherPublisher.prefetch")
+    @patch("weatherbot.management.commands.publish_forecast.subprocess.Popen")
+    def test_supervisor_merges_shard_summaries(self, mocked_popen, _mocked_prefetch):
+        workers = []
+        for published in (3, 4):
+            worker = MagicMock(returncode=0)
+            summary = {"channels": 5, "published": published, "failed": 1, "skipped": 0, "duration_ms": 10}
+            worker.communicate.return_value = (f"log line\n{json.dumps(summary)}\n", None)
+            workers.append(worker)
+        mocked_popen.side_effect = workers
+
+        out = StringIO()
+        call_command("publish_forecast", "today", shards=2, json=True, stdout=out)
+
+        merged = json.loads(out.getvalue())
+        self.assertEqual((merged["channels"], merged["published"], merged["failed"]), (10, 7, 2))
+        self.assertIn("--shard-index=1", mocked_popen.call_args_list[1].args[0])
+
+    @patch("weatherbot.publisher.build_caption", wraps=build_caption)
+    @patch("weatherbot.publisher.pick_video_path")
+    @patch("weatherbot.telegram_api.requests.post")
+    def test_caption_is_rendered_once_per_language(self, mocked_post, mocked_video_path, mocked_caption):
+        mocked_video_path.return_value = MagicMock(exists=MagicMock(return_value=False))
+        mocked_post.return_value = _json_response({"ok": True, "result": {"message_id": 1}})
+        Channel.objects.filter(chat_id__in=self.chat_ids[:5]).update(language=Language.EN)
+
+        WeatherPublisher().publish(ForecastType.TODAY)
+
+        self.assertEqual(mocked_caption.call_count, 2)
+        texts = {call.kwargs["data"]["chat_id"]: call.kwargs["data"]["text"] for call in mocked_post.call_args_list}
+        self.assertIn("Weather in Астана", texts["@c0"])
+        self.assertIn("Погода в Астана", texts["@c19"])
+
+    @patch("weatherbot.publisher.pick_video_path")
+    @patch("weatherbot.telegram_api.requests.post")
+    def test_largest_channels_publish_first_and_delay_is_subscriber_weighted(self, mocked_post, mocked_video_path):
+        mocked_video_path.return_value = MagicMock(exists=MagicMock(return_value=False))
+        mocked_post.return_value = _json_response({"ok": True, "result": {"message_id": 1}})
+        Channel.objects.filter(chat_id="@c7").update(priority=50000, subscriber_count=50000)
+        Channel.objects.filter(chat_id="@c3").update(priority=900, subscriber_count=900)
+
+        publisher = WeatherPublisher()
+        publisher.publish(ForecastType.TODAY)
+
+        sent_to = [call.kwargs["data"]["chat_id"] for call in mocked_post.call_args_list]
+        self.assertEqual(sent_to[:3], ["@c7", "@c3", "@c0"])
+        # 18 channels without a known count weigh one subscriber each.
+        self.assertEqual(publisher.summary.audience, 50000 + 900 + 18)
+        self.assertGreater(publisher.summary.subscriber_seconds, 0)
+        self.assertIsNotNone(publisher.summary.weighted_delay_seconds)
+
+
+class SimulateLoadTests(TestCase):
+    def setUp(self):
+        city = City.objects.create(name="Астана", latitude=51.17, longitude=71.43)
+        BotConfig.objects.update_or_create(singleton=True, defaults={"default_city": city})
+        self.real_channel = Channel.objects.create(name="Real", chat_id="@real")
+
+    @patch("weatherbot.telegram_api.requests.post")
+    def test_simulation_publishes_only_to_fake_channels(self, mocked_post):
+        out = StringIO()
+        call_command(
+            "simulate_load",
+            channels=10,
+            slots=2,
+            telegram_latency_ms=0,
+            telegram_failure_rate=0,
+            weather_latency_ms=0,
+            json=True,
+            stdout=out,
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual((report["published"], report["failed"], report["skipped"]), (20, 0, 0))
+        self.assertEqual((report["telegram_calls"], report["weather_calls"]), (20, 2))
+        self.assertGreater(report["db_queries"], 0)
+        mocked_post.assert_not_called()
+        self.assertEqual(list(Channel.objects.values_list("chat_id", flat=True)), ["@real"])
+        self.assertFalse(PublicationLog.objects.exists())
+
+
+class SchedulerRunTests(TestCase):
+    def setUp(self):
+        self.command = SchedulerCommand()
+        self.command._timings = {}
+        self.command._job_specs = {}
+
+    def test_job_events_record_lag_duration_and_misses(self):
+        scheduled_at = timezone.now() - timedelta(seconds=90)
+        self.command._timed_job("publish_today", lambda: None)
+        self.command._on_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, "publish_today", "default", scheduled_at))
+        self.command._on_job_event(JobExecutionEvent(EVENT_JOB_MISSED, "publish_week", "default", scheduled_at))
+
+        executed = SchedulerRun.objects.get(job_id="publish_today")
+        self.assertEqual(executed.status, SchedulerRun.Status.SUCCESS)
+        self.assertGreaterEqual(executed.lag_ms, 90_000)
+        self.assertIsNotNone(executed.duration_ms)
+        self.assertGreater(executed.rss_kb, 0)
+        missed = SchedulerRun.objects.get(job_id="publish_week")
+        self.assertEqual((missed.status, missed.started_at), (SchedulerRun.Status.MISSED, None))
+
+    def test_sync_registers_jobs_only_when_their_definition_changes(self):
+        schedule = Schedule.objects.create(forecast_type=ForecastType.TODAY, publish_time=dt_time(8, 0))
+        scheduler = BackgroundScheduler()
+        with patch.object(scheduler, "add_job", wraps=scheduler.add_job) as mocked_add:
+            self.command._sync_jobs(scheduler)
+            self.command._sync_jobs(scheduler)
+            self.assertEqual(mocked_add.call_count, 1)
+
+            schedule.publish_time = dt_time(9, 30)
+            schedule.save()
+            self.command._sync_jobs(scheduler)
+        self.assertEqual(mocked_add.call_count, 2)
+        self.assertEqual(str(mocked_add.call_args.kwargs["trigger"].fields[5]), "9")
+
+    def test_memory_dump_reports_growth_since_previous_snapshot(self):
+        monitor = MemoryMonitor(top=50)
+        self.addCleanup(tracemalloc.stop)
+        monitor.start()
+        retained = [bytearray(1024) for _ in range(2000)]
+
+        lines = monitor.dump("test")
+
+        self.assertTrue(any("tests.py" in line for line in lines), lines)
+        self.assertEqual(len(retained), 2000)
+
+    @patch.object(SchedulerCommand, "_run_publication")
+    def test_startup_catchup_runs_only_slots_without_successful_run(self, mocked_run):
+        Schedule.objects.create(forecast_type=ForecastType.TODAY, publish_time=dt_time(0, 0))
+        Schedule.objects.create(forecast_type=ForecastType.TOMORROW, publish_time=dt_time(0, 0))
+        slot = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        SchedulerRun.objects.create(job_id="publish_today", status=SchedulerRun.Status.SUCCESS, scheduled_at=slot)
+
+        self.command._run_startup_catchup()
+
+        mocked_run.assert_called_once_with(ForecastType.TOMORROW)
+        catchup = SchedulerRun.objects.get(job_id="publish_tomorrow")
+        self.assertEqual((catchup.trigger, catchup.scheduled_at), (SchedulerRun.Trigger.CATCHUP, slot))
+
+
+class PrepareCommandTests(TestCase):
+    def _prepare(self):
+        out = StringIO()
+        call_command("prepare", skip=["collectstatic", "superuser"], stdout=out)
+        return out.getvalue()
+
+    def test_second_run_skips_unchanged_steps_and_keeps_admin_edits(self):
+        first = self._prepare()
+        self.assertIn("up to date", first)
+        self.assertRegex(first, r"bootstrap_defaults\s+applied")
+        Schedule.objects.filter(forecast_type=ForecastType.TODAY).update(publish_time="07:15")
+
+        second = self._prepare()
+
+        self.assertRegex(second, r"bootstrap_defaults\s+unchanged")
+        self.assertEqual(
+            Schedule.objects.get(forecast_type=ForecastType.TODAY).publish_time.strftime("%H:%M"),
+            "07:15",
+        )
+
+
+@override_settings(CRON_SECRET_TOKEN="secret-123", LOG_EXPORT_CHUNK_SIZE=2)
+class PublicationLogReportTests(TestCase):
+    def setUp(self):
+        city = City.objects.create(name="Астана", latitude=51.16, longitude=71.47)
+        self.first = Channel.objects.create(name="Первый", chat_id="-100")
+        second = Channel.objects.create(name="Второй", chat_id="-200")
+        # A simulate_load leftover: never part of exports or stats.
+        simulated = Channel.objects.create(name="Simulation 0", chat_id="sim:0", active=False)
+        day = timezone.localdate()
+        for channel, forecast_type, success, duration_ms in (
+            (self.first, ForecastType.TODAY, True, 100),
+            (self.first, ForecastType.TOMORROW, False, 300),
+            (self.first, ForecastType.THREE_DAYS, True, 200),
+            (second, ForecastType.TODAY, True, 50),
+            (simulated, ForecastType.TODAY, True, 5),
+        ):
+            PublicationLog.objects.create(
+                channel=channel,
+                city=city,
+                forecast_type=forecast_type,
+                target_date=day,
+                success=success,
+                duration_ms=duration_ms,
+                error="" if success else "Bad Request: chat not found",
+            )
+
+    def _get(self, path, **params):
+        return self.client.get(path, params, HTTP_X_CRON_TOKEN="secret-123")
+
+    def test_admin_changelist_queries_do_not_grow_with_rows(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "pass"))
+
+        def changelist_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get("/admin/weatherbot/publicationlog/").status_code, 200)
+            return len(queries)
+
+        before = changelist_queries()
+        city = City.objects.get()
+        for index in range(5):
+            channel = Channel.objects.create(name=f"Extra {index}", chat_id=f"-9{index}")
+            PublicationLog.objects.create(
+                channel=channel, city=city, forecast_type=ForecastType.TODAY, target_date=timezone.localdate()
+            )
+        self.assertEqual(changelist_queries(), before)
+
+    def test_admin_search_filters_log_columns_only(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "pass"))
+
+        def search(term):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get("/admin/weatherbot/publicationlog/", {"q": term})
+            listing = next(query["sql"] for query in queries if 'FROM "weatherbot_publicationlog"' in query["sql"])
+            return list(response.context["cl"].result_list), listing
+
+        failed, sql = search("chat not found")
+        self.assertEqual([log.forecast_type for log in failed], [ForecastType.TOMORROW])
+        self.assertNotIn('"weatherbot_channel"."name" LIKE', sql)
+        self.assertNotIn('"weatherbot_city"."name" LIKE', sql)
+
+        by_channel, _sql = search("-200")
+        self.assertEqual([log.channel.chat_id for log in by_channel], ["-200"])
+
+    def test_export_streams_filtered_jsonl(self):
+        response = self._get("/internal/logs/export/", format="jsonl", channel="-100", success="true")
+
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["forecast_type"] for row in rows], ["today", "three_days"])
+        self.assertEqual(rows[0]["channel__name"], "Первый")
+
+    def test_export_csv_has_header_and_rejects_bad_filters(self):
+        response = self._get("/internal/logs/export/")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("id,created_at,target_date"))
+        self.assertEqual(len(lines), 5)
+
+        self.assertEqual(self._get("/internal/logs/export/", date_from="yesterday").status_code, 400)
+        self.assertEqual(self.client.get("/internal/logs/export/").status_code, 401)
+
+    def test_stats_aggregate_per_channel_per_day(self):
+        results = self._get("/internal/logs/stats/").json()["results"]
+
+        first = next(row for row in results if row["chat_id"] == "-100")
+        self.assertEqual((first["total"], first["successful"]), (3, 2))
+        self.assertAlmostEqual(first["success_rate"], 2 / 3)
+        self.assertEqual((first["avg_duration_ms"], first["max_duration_ms"]), (200, 300))
+        self.assertEqual(len(results), 2)
+
+
 class InternalPublishEndpointTests(TestCase):
     def setUp(self):
         self.client = Client()
@@ -74,3 +1224,161 @@ class InternalPublishEndpointTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()["published"], 1)
         mocked_publisher_cls.return_value.publish.assert_called_once_with("today")
+
+
+@override_settings(ENABLE_INTERNAL_SCHEDULER=True, TELEGRAM_BOT_TOKEN="token")
+@patch("weatherbot.readiness.ReadinessMonitor.ensure_started")
+class ReadinessTests(TestCase):
+    def setUp(self):
+        readiness_monitor._results.clear()
+        self.addCleanup(readiness_monitor._results.clear)
+
+    @patch("weatherbot.telegram_api.requests.post")
+    def test_ready_serves_cached_probe_results_without_queries(self, mocked_post, _mocked_start):
+        mocked_post.return_value = _json_response({"ok": True, "result": {"id": 1, "username": "weather_bot"}})
+        SchedulerHeartbeat.beat(timezone.now())
+        self.assertEqual(self.client.get("/ready/").status_code, 503)
+
+        readiness_monitor.refresh_due()
+        with self.assertNumQueries(0):
+            response = self.client.get("/ready/")
+
+        self.assertEqual(response.status_code, 200)
+        checks = response.json()["checks"]
+        self.assertEqual({name: check["ok"] for name, check in checks.items()}, dict.fromkeys(checks, True))
+        self.assertIn("latency_ms", checks["database"])
+        self.assertEqual(checks["telegram"]["username"], "weather_bot")
+        self.assertIsNone(checks["weather"]["last_success"])
+        readiness_monitor.refresh_due()
+        self.assertEqual(mocked_post.call_count, 1)
+
+    @patch("weatherbot.telegram_api.requests.post")
+    def test_stale_heartbeat_or_rejected_token_is_unavailable(self, mocked_post, _mocked_start):
+        mocked_post.return_value = _json_response({"ok": False, "error_code": 401, "description": "Unauthorized"})
+        SchedulerHeartbeat.beat(timezone.now())
+        SchedulerHeartbeat.objects.update(beat_at=timezone.now() - timedelta(minutes=10))
+
+        readiness_monitor.refresh_due()
+        response = self.client.get("/ready/")
+
+        self.assertEqual(response.status_code, 503)
+        checks = response.json()["checks"]
+        self.assertEqual(checks["scheduler"]["error"], "heartbeat is stale")
+        self.assertGreater(checks["scheduler"]["heartbeat_age_s"], 590)
+        self.assertIn("Unauthorized", checks["telegram"]["error"])
+        self.assertTrue(checks["database"]["ok"])
+
+
+class SQLiteProfileTests(TestCase):
+    def test_concurrent_profile_is_applied_on_connect(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            busy_timeout = cursor.fetchone()[0]
+        self.assertEqual(busy_timeout, settings.SQLITE_BUSY_TIMEOUT_MS)
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+
+class StartupTests(TestCase):
+    def test_worker_command_does_not_import_web_stack_or_http_clients(self):
+        script = (
+            "import sys, django, manage\n"
+            "manage.configure_environment(['manage.py', 'publish_forecast'])\n"
+            "django.setup()\n"
+            "import weatherbot.management.commands.publish_forecast\n"
+            "print(','.join(m for m in ('requests', 'httpx', 'django.contrib.admin') if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     urllib3.util\n"
+            "import time:      3050 |       3170 |   requests\n"
+        )
+        timings = parse_importtime(output)
+
+        self.assertEqual([timing.module for timing in timings], ["urllib3.util", "requests"])
+        self.assertEqual(timings[1].cumulative_us, 3170)
+        self.assertEqual(timings[0].package, "urllib3")
+
+
+@override_settings(CRON_SECRET_TOKEN="secret-123")
+@patch("weatherbot.views.WeatherPublisher")
+class PublishIdempotencyTests(TestCase):
+    def _post(self, **headers):
+        return self.client.post("/internal/publish/today/", HTTP_X_CRON_TOKEN="secret-123", **headers)
+
+    def _publishes(self, mocked_publisher_cls, published, failed=0):
+        publisher = mocked_publisher_cls.return_value
+        publisher.publish.return_value = published
+        publisher.summary = PublishSummary(published=published, failed=failed)
+        return publisher
+
+    def test_retry_without_key_replays_result_of_derived_key(self, mocked_publisher_cls):
+        self._publishes(mocked_publisher_cls, 2)
+
+        first = self._post()
+        retry = self._post()
+
+        self.assertEqual(mocked_publisher_cls.return_value.publish.call_count, 1)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(PublishRequest.objects.get().key, f"today:{timezone.localdate()}")
+
+        self._post(HTTP_IDEMPOTENCY_KEY="manual-1")
+        self.assertEqual(mocked_publisher_cls.return_value.publish.call_count, 2)
+
+    def test_derived_key_does_not_replay_partial_run(self, mocked_publisher_cls):
+        publisher = self._publishes(mocked_publisher_cls, 1, failed=2)
+
+        self._post()
+        retry = self._post()
+
+        self.assertEqual(publisher.publish.call_count, 2)
+        self.assertFalse(retry.has_header("Idempotent-Replayed"))
+        self.assertFalse(PublishRequest.objects.exists())
+
+    def test_derived_key_does_not_replay_empty_run_but_explicit_key_does(self, mocked_publisher_cls):
+        publisher = self._publishes(mocked_publisher_cls, 0)
+
+        self._post()
+        self._post()
+        self.assertEqual(publisher.publish.call_count, 2)
+
+        self._post(HTTP_IDEMPOTENCY_KEY="manual-1")
+        retry = self._post(HTTP_IDEMPOTENCY_KEY="manual-1")
+        self.assertEqual(publisher.publish.call_count, 3)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_key_released_between_insert_and_read_is_claimed_again(self, mocked_publisher_cls):
+        publisher = self._publishes(mocked_publisher_cls, 2)
+        PublishRequest.objects.create(key=f"today:{timezone.localdate()}", forecast_type=ForecastType.TODAY)
+        original_get = PublishRequest.objects.get
+
+        def released_before_read(**lookup):
+            # The other request finished an unclean run and released the derived key.
+            PublishRequest.objects.filter(**lookup).delete()
+            return original_get(**lookup)
+
+        with patch.object(PublishRequest.objects, "get", side_effect=released_before_read) as mocked_read:
+            response = self._post()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mocked_read.call_count, 1)
+        self.assertEqual(publisher.publish.call_count, 1)
+        self.assertEqual(PublishRequest.objects.get().status, PublishRequest.Status.DONE)
+
+    def test_in_flight_run_returns_conflict_and_failed_run_is_retried(self, mocked_publisher_cls):
+        PublishRequest.objects.create(key="run-1", forecast_type=ForecastType.TODAY)
+        self.assertEqual(self._post(HTTP_IDEMPOTENCY_KEY="run-1").status_code, 409)
+
+        self._publishes(mocked_publisher_cls, 1).publish.side_effect = [RuntimeError("Open-Meteo down"), 1]
+        self.assertEqual(self._post(HTTP_IDEMPOTENCY_KEY="run-2").status_code, 500)
+        self.assertEqual(PublishRequest.objects.get(key="run-2").status, PublishRequest.Status.FAILED)
+
+        response = self._post(HTTP_IDEMPOTENCY_KEY="run-2")
+        self.assertEqual(response.json()["published"], 1)
+        self.assertEqual(PublishRequest.objects.get(key="run-2").status, PublishRequest.Status.DONE)
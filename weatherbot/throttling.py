@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket shared between threads; acquire() blocks until a call is allowed."""
+
+    def __init__(self, rate_per_second: float, burst: int = 1) -> None:
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
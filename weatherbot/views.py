@@ -3,14 +3,28 @@ from __future__ import annotations
 import logging
 from datetime import timedelta
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http import HttpResponseNotAllowed, JsonResponse
+from django.http import HttpResponseNotAllowed, StreamingHttpResponse
 from django.shortcuts import render
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
 
-from .models import BotConfig, Channel, City, ForecastType, PublicationLog, Schedule
-from .publisher import WeatherPublisher
+from . import codec
+from .bot import get_update_dispatcher
+from .codec import JSONResponse
+from .idempotency import (
+    Claim,
+    claim_publish_request,
+    complete_publish_request,
+    fail_publish_request,
+    release_publish_request,
+)
+from .models import BotConfig, Channel, City, ForecastType, PublicationLog, PublishRequest, Schedule
+from .publisher import FORECAST_WINDOWS, PublishSummary, WeatherPublisher
+from .readiness import readiness_monitor
+from .reports import channel_daily_stats, filter_publication_logs, iter_csv, iter_jsonl
 
 logger = logging.getLogger(__name__)
 
@@ -27,49 +41,217 @@ def home(request):
     return render(request, "weatherbot/home.html", context)
 
 
+def readiness(request):
+    """Serves cached probe results only; the probes themselves run in a background thread."""
+    readiness_monitor.ensure_started()
+    ready, checks = readiness_monitor.report()
+    response = JSONResponse(
+        {"status": "ready" if ready else "unavailable", "checks": checks}, status=200 if ready else 503
+    )
+    response["Cache-Control"] = "no-store"
+    return response
+
+
 @csrf_exempt
 def internal_publish(request, forecast_type: str):
+    rejection = _reject_publish_request(request, forecast_type)
+    if rejection is not None:
+        return rejection
+
+    claim = _claim(request, forecast_type)
+    shortcut = _claimed_elsewhere_response(claim)
+    if shortcut is not None:
+        return shortcut
+
+    publisher = WeatherPublisher()
+    try:
+        published = publisher.publish(forecast_type)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Internal publish failed type=%s", forecast_type)
+        if claim.record is not None:
+            fail_publish_request(claim.record)
+        return JSONResponse({"detail": str(exc)}, status=500)
+
+    payload = _publish_payload(forecast_type, published, _build_publish_diagnostics(forecast_type, published))
+    _finish_claim(claim, payload, publisher.summary)
+    return JSONResponse(payload)
+
+
+@csrf_exempt
+async def internal_publish_async(request, forecast_type: str):
+    rejection = _reject_publish_request(request, forecast_type)
+    if rejection is not None:
+        return rejection
+
+    claim = await sync_to_async(_claim)(request, forecast_type)
+    shortcut = _claimed_elsewhere_response(claim)
+    if shortcut is not None:
+        return shortcut
+
+    publisher = WeatherPublisher()
+    try:
+        published = await publisher.apublish(forecast_type)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Internal async publish failed type=%s", forecast_type)
+        if claim.record is not None:
+            await sync_to_async(fail_publish_request)(claim.record)
+        return JSONResponse({"detail": str(exc)}, status=500)
+
+    diagnostics = await sync_to_async(_build_publish_diagnostics)(forecast_type, published)
+    payload = _publish_payload(forecast_type, published, diagnostics)
+    await sync_to_async(_finish_claim)(claim, payload, publisher.summary)
+    return JSONResponse(payload)
+
+
+def _claim(request, forecast_type: str) -> Claim:
+    """
+    Idempotency-Key header, or "<type>:<target date>" so blind cron retries dedupe too.
+    With ALLOW_DUPLICATE_PUBLICATIONS only an explicit header is honoured.
+    """
+    key = request.headers.get("Idempotency-Key", "").strip()
+    if not key:
+        if settings.ALLOW_DUPLICATE_PUBLICATIONS:
+            return Claim(None)
+        target_date = timezone.localdate() + timedelta(days=FORECAST_WINDOWS[forecast_type].offset_days)
+        return claim_publish_request(f"{forecast_type}:{target_date}", forecast_type, derived=True)
+    return claim_publish_request(key, forecast_type)
+
+
+def _finish_claim(claim: Claim, payload: dict, summary: PublishSummary) -> None:
+    """
+    A derived key is shared by every run for the day, so only a clean run is kept for replay: after failed
+    sends or an empty run (service off, no channels yet) a manual re-run has to go through.
+    """
+    if claim.record is None:
+        return
+    if claim.derived and (summary.failed or not summary.published):
+        release_publish_request(claim.record)
+    else:
+        complete_publish_request(claim.record, payload)
+
+
+def _claimed_elsewhere_response(claim: Claim):
+    if claim.replay is not None:
+        response = JSONResponse(claim.replay)
+        response["Idempotent-Replayed"] = "true"
+        return response
+    if claim.in_progress:
+        return JSONResponse({"status": "in_progress"}, status=409)
+    return None
+
+
+def _reject_publish_request(request, forecast_type: str):
     if request.method != "POST":
         return HttpResponseNotAllowed(["POST"])
 
+    rejection = _reject_invalid_cron_token(request)
+    if rejection is not None:
+        return rejection
+
+    allowed_types = {choice for choice, _label in ForecastType.choices}
+    if forecast_type not in allowed_types:
+        return JSONResponse({"detail": "Invalid forecast_type"}, status=400)
+    if len(request.headers.get("Idempotency-Key", "")) > PublishRequest._meta.get_field("key").max_length:
+        return JSONResponse({"detail": "Idempotency-Key is too long"}, status=400)
+    return None
+
+
+def _reject_invalid_cron_token(request):
     cron_token = settings.CRON_SECRET_TOKEN
     if not cron_token:
-        return JsonResponse({"detail": "CRON_SECRET_TOKEN is not configured"}, status=503)
+        return JSONResponse({"detail": "CRON_SECRET_TOKEN is not configured"}, status=503)
 
     provided_token = request.headers.get("X-Cron-Token", "")
     if provided_token != cron_token:
-        return JsonResponse({"detail": "Unauthorized"}, status=401)
+        return JSONResponse({"detail": "Unauthorized"}, status=401)
+    return None
 
-    allowed_types = {choice for choice, _label in ForecastType.choices}
-    if forecast_type not in allowed_types:
-        return JsonResponse({"detail": "Invalid forecast_type"}, status=400)
 
+def _publish_payload(forecast_type: str, published: int, diagnostics: dict) -> dict:
+    return {
+        "status": "ok",
+        "forecast_type": forecast_type,
+        "published": published,
+        "diagnostics": diagnostics,
+    }
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "jsonl": (iter_jsonl, "application/x-ndjson; charset=utf-8"),
+}
+
+
+@gzip_page
+def internal_logs_export(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    rejection = _reject_invalid_cron_token(request)
+    if rejection is not None:
+        return rejection
+
+    export_format = request.GET.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return JSONResponse({"detail": "format must be csv or jsonl"}, status=400)
     try:
-        published = WeatherPublisher().publish(forecast_type)
-    except Exception as exc:  # noqa: BLE001
-        logger.exception("Internal publish failed type=%s", forecast_type)
-        return JsonResponse({"detail": str(exc)}, status=500)
-
-    diagnostics = _build_publish_diagnostics(forecast_type, published)
-    return JsonResponse(
-        {
-            "status": "ok",
-            "forecast_type": forecast_type,
-            "published": published,
-            "diagnostics": diagnostics,
-        }
-    )
+        queryset = filter_publication_logs(request.GET)
+    except ValueError as exc:
+        return JSONResponse({"detail": str(exc)}, status=400)
+
+    render_rows, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(render_rows(queryset), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="publication_logs.{export_format}"'
+    return response
+
+
+@gzip_page
+def internal_logs_stats(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    rejection = _reject_invalid_cron_token(request)
+    if rejection is not None:
+        return rejection
+
+    try:
+        queryset = filter_publication_logs(request.GET)
+    except ValueError as exc:
+        return JSONResponse({"detail": str(exc)}, status=400)
+    return JSONResponse({"results": list(channel_daily_stats(queryset))})
+
+
+@csrf_exempt
+def telegram_webhook(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    webhook_secret = settings.TELEGRAM_WEBHOOK_SECRET
+    if not webhook_secret:
+        return JSONResponse({"detail": "TELEGRAM_WEBHOOK_SECRET is not configured"}, status=503)
+
+    provided_secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if provided_secret != webhook_secret:
+        return JSONResponse({"detail": "Unauthorized"}, status=401)
+
+    try:
+        update = codec.loads(request.body)
+    except ValueError:
+        return JSONResponse({"detail": "Invalid JSON"}, status=400)
+    if not isinstance(update, dict):
+        return JSONResponse({"detail": "Invalid update"}, status=400)
+
+    if not get_update_dispatcher().submit(update):
+        return JSONResponse({"detail": "Update queue is full"}, status=503)
+    return JSONResponse({"status": "ok"})
 
 
 def _build_publish_diagnostics(forecast_type: str, published: int) -> dict:
+    from .weather_api import weather_stats
+
     config = BotConfig.get_solo()
     active_channels = list(Channel.objects.filter(active=True))
     active_city = config.default_city or City.objects.filter(active=True).first()
 
-    today = timezone.localdate()
-    target_date = today
-    if forecast_type == ForecastType.TOMORROW:
-        target_date = today + timedelta(days=1)
+    target_date = timezone.localdate() + timedelta(days=FORECAST_WINDOWS[forecast_type].offset_days)
 
     successful_today = PublicationLog.objects.filter(
         channel__in=active_channels,
@@ -95,4 +277,5 @@ def _build_publish_diagnostics(forecast_type: str, published: int) -> dict:
         "target_date": str(target_date),
         "successful_logs_for_target_date": successful_today,
         "reasons": reasons,
+        "weather": weather_stats.snapshot(),
     }
@@ -1,76 +1,233 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
 import logging
-from typing import Dict, List
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List
 
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
 
-logger = logging.getLogger(__name__)
+from . import codec
+from .codec import ACCEPT_ENCODING
+from .forecast import (  # noqa: F401  re-exported for callers of the weather client
+    CORE_DAILY_VARIABLES,
+    DAILY_VARIABLES,
+    DAY_PARTS,
+    EXTRA_DAILY_VARIABLES,
+    HOURLY_VARIABLES,
+    RUS_WEATHER_LABEL,
+    WEATHER_TYPE_BY_CODE,
+    DayForecast,
+    DayPartForecast,
+    parse_forecast_payload,
+    restrict_day,
+    weather_type_for_code,
+)
+from .grid import snap_to_grid
+from .models import ForecastSnapshot
 
+if TYPE_CHECKING:
+    import httpx
 
-WEATHER_TYPE_BY_CODE = {
-    0: "sunny",
-    1: "cloudy",
-    2: "cloudy",
-    3: "cloudy",
-    45: "cloudy",
-    48: "cloudy",
-    51: "rain",
-    53: "rain",
-    55: "rain",
-    56: "rain",
-    57: "rain",
-    61: "rain",
-    63: "rain",
-    65: "rain",
-    66: "rain",
-    67: "rain",
-    71: "snow",
-    73: "snow",
-    75: "snow",
-    77: "snow",
-    80: "rain",
-    81: "rain",
-    82: "rain",
-    85: "snow",
-    86: "snow",
-    95: "thunderstorm",
-    96: "thunderstorm",
-    99: "thunderstorm",
-}
-
-RUS_WEATHER_LABEL = {
-    "sunny": "ясно",
-    "cloudy": "облачно",
-    "rain": "дождь",
-    "snow": "снег",
-    "thunderstorm": "гроза",
-}
+logger = logging.getLogger(__name__)
 
 
 @dataclass
-class DayForecast:
-    date: str
-    temp_min: float
-    temp_max: float
-    weather_code: int
-    humidity_mean: float | None = None
-    wind_speed_max: float | None = None
-    precipitation_probability_max: float | None = None
-
-    @property
-    def weather_type(self) -> str:
-        weather_type = WEATHER_TYPE_BY_CODE.get(self.weather_code)
-        if weather_type is None:
-            logger.warning("Unknown weather code=%s, fallback to 'cloudy'", self.weather_code)
-            return "cloudy"
-        return weather_type
-
-    @property
-    def weather_label_ru(self) -> str:
-        return RUS_WEATHER_LABEL[self.weather_type]
+class _CachedDay:
+    day: DayForecast
+    daily_variables: frozenset[str]
+    hourly: bool
+    fetched_at: float
+
+    def covers(self, needed: set[str], hourly: bool, max_age: float, now: float) -> bool:
+        return (
+            now - self.fetched_at <= max_age
+            and needed <= self.daily_variables
+            and (self.hourly or not hourly)
+        )
+
+    def supersedes(self, other: "_CachedDay") -> bool:
+        """
+        A fresh entry with strictly more than `other` is kept over it: a WEEK range fetched with the core
+        variables must not strip the extra fields and hourly parts that TODAY cached for the same day.
+        """
+        if other.fetched_at - self.fetched_at > settings.WEATHER_CACHE_TTL_SECONDS:
+            return False
+        if not (other.daily_variables <= self.daily_variables and (self.hourly or not other.hourly)):
+            return False
+        return self.daily_variables != other.daily_variables or self.hourly != other.hourly
+
+    def to_dict(self) -> dict:
+        return {
+            "day": asdict(self.day),
+            "daily_variables": sorted(self.daily_variables),
+            "hourly": self.hourly,
+            "fetched_at": self.fetched_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "_CachedDay":
+        day_data = dict(data["day"])
+        parts = [DayPartForecast(**part) for part in day_data.pop("parts", [])]
+        return cls(
+            day=DayForecast(**day_data, parts=parts),
+            daily_variables=frozenset(data["daily_variables"]),
+            hourly=data["hourly"],
+            fetched_at=data["fetched_at"],
+        )
+
+
+def _select_covered(
+    series: dict[str, _CachedDay],
+    dates: list[str],
+    daily_variables: tuple[str, ...],
+    hourly: bool,
+    max_age: float,
+) -> dict[str, DayForecast] | None:
+    now = time.time()
+    needed = set(daily_variables)
+    selected = {}
+    for day_date in dates:
+        cached = series.get(day_date)
+        if cached is None or not cached.covers(needed, hourly, max_age, now):
+            return None
+        selected[day_date] = restrict_day(cached.day, needed, hourly)
+    return selected
+
+
+class ForecastSeriesCache:
+    """In-process forecast series per coordinate, merged day by day across fetches."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._series: dict[tuple[float, float], dict[str, _CachedDay]] = {}
+
+    def lookup(
+        self,
+        key: tuple[float, float],
+        dates: list[str],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+        max_age: float,
+    ) -> tuple[dict[str, DayForecast], list[str]]:
+        now = time.time()
+        needed = set(daily_variables)
+        found: dict[str, DayForecast] = {}
+        missing: list[str] = []
+        with self._lock:
+            series = self._series.get(key, {})
+            for day_date in dates:
+                cached = series.get(day_date)
+                if cached is not None and cached.covers(needed, hourly, max_age, now):
+                    # A fuller cached day is cut down to what was asked for, so the caption does not depend on
+                    # which forecast type happened to fill the cache first.
+                    found[day_date] = restrict_day(cached.day, needed, hourly)
+                else:
+                    missing.append(day_date)
+        return found, missing
+
+    def merge(
+        self,
+        key: tuple[float, float],
+        days: list[DayForecast],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+        keep_from: str,
+    ) -> None:
+        now = time.time()
+        self.load(
+            key,
+            [_CachedDay(day, frozenset(daily_variables), hourly, now) for day in days],
+            keep_from,
+        )
+
+    def load(self, key: tuple[float, float], entries: list[_CachedDay], keep_from: str) -> None:
+        with self._lock:
+            series = self._series.setdefault(key, {})
+            for entry in entries:
+                current = series.get(entry.day.date)
+                if current is None or current.fetched_at <= entry.fetched_at and not current.supersedes(entry):
+                    series[entry.day.date] = entry
+            for day_date in [day_date for day_date in series if day_date < keep_from]:
+                del series[day_date]
+
+    def export(self, key: tuple[float, float]) -> list[dict]:
+        with self._lock:
+            return [entry.to_dict() for entry in self._series.get(key, {}).values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class LatencyTracker:
+    """Rolling window of upstream latencies used to pick the hedge delay."""
+
+    def __init__(self, size: int = 100, min_samples: int = 20) -> None:
+        self._lock = threading.Lock()
+        self._samples: deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+class WeatherStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Counter[str] = Counter()
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+forecast_cache = ForecastSeriesCache()
+upstream_latency = LatencyTracker()
+weather_stats = WeatherStats()
+
+_hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather-hedge")
+_refreshing: set[tuple[float, float]] = set()
+_refreshing_lock = threading.Lock()
+# Striped rather than one lock per key: the pool stays the same size however many coordinates are seen.
+# Two keys sharing a stripe only serialise their fetches.
+_fetch_locks = tuple(threading.Lock() for _ in range(64))
+GEOCODE_CACHE_SIZE = 1024
+_geocode_cache: OrderedDict[str, Dict[str, float]] = OrderedDict()
+_geocode_cache_lock = threading.Lock()
+
+
+def _fetch_lock(key: tuple[float, float]) -> threading.Lock:
+    return _fetch_locks[hash(key) % len(_fetch_locks)]
 
 
 class WeatherClient:
@@ -79,68 +236,464 @@ class WeatherClient:
         self.timeout = settings.DEFAULT_REQUEST_TIMEOUT
 
     def geocode_city(self, city_name: str) -> Dict[str, float]:
+        cache_key = city_name.strip().casefold()
+        with _geocode_cache_lock:
+            cached = _geocode_cache.get(cache_key)
+            if cached is not None:
+                _geocode_cache.move_to_end(cache_key)
+        if cached is not None:
+            return dict(cached)
+
         response = requests.get(
             "https://geocoding-api.open-meteo.com/v1/search",
             params={"name": city_name, "count": 1, "language": "ru", "format": "json"},
+            headers=ACCEPT_ENCODING,
             timeout=self.timeout,
         )
         response.raise_for_status()
-        payload = response.json()
+        payload = codec.loads(response.content)
         results = payload.get("results") or []
         if not results:
             raise ValueError(f"Город не найден: {city_name}")
 
         first = results[0]
-        return {"latitude": first["latitude"], "longitude": first["longitude"]}
+        coordinates = {"latitude": first["latitude"], "longitude": first["longitude"]}
+        with _geocode_cache_lock:
+            _geocode_cache[cache_key] = coordinates
+            _geocode_cache.move_to_end(cache_key)
+            while len(_geocode_cache) > GEOCODE_CACHE_SIZE:
+                _geocode_cache.popitem(last=False)
+        return dict(coordinates)
 
     def get_daily_forecast(self, latitude: float, longitude: float, days: int = 3) -> List[DayForecast]:
-        response = requests.get(
-            self.base_url,
-            params={
-                "latitude": latitude,
-                "longitude": longitude,
-                "daily": (
-                    "weather_code,temperature_2m_max,temperature_2m_min,"
-                    "relative_humidity_2m_mean,wind_speed_10m_max,precipitation_probability_max"
-                ),
-                "forecast_days": max(days, 1),
-                "timezone": "auto",
-            },
-            timeout=self.timeout,
+        return self.get_forecast(latitude, longitude, timezone.localdate(), days)
+
+    def get_forecast(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: date,
+        days: int = 1,
+        *,
+        daily_variables: tuple[str, ...] = DAILY_VARIABLES,
+        hourly: bool = False,
+    ) -> List[DayForecast]:
+        dates = [(start_date + timedelta(days=offset)).isoformat() for offset in range(max(days, 1))]
+        key = self._cache_key(latitude, longitude)
+        # Fetch the cell centre, not the city itself, so the upstream response matches the shared key.
+        latitude, longitude = key
+        found, missing = forecast_cache.lookup(
+            key, dates, daily_variables, hourly, settings.WEATHER_CACHE_TTL_SECONDS
         )
-        response.raise_for_status()
-        payload = response.json()
-
-        daily = payload.get("daily", {})
-        dates = daily.get("time", [])
-        temp_max = daily.get("temperature_2m_max", [])
-        temp_min = daily.get("temperature_2m_min", [])
-        weather_codes = daily.get("weather_code") or daily.get("weathercode", [])
-        humidity_mean = daily.get("relative_humidity_2m_mean", [])
-        wind_speed_max = daily.get("wind_speed_10m_max", [])
-        precipitation_probability_max = daily.get("precipitation_probability_max", [])
-
-        forecast = []
-        for index, date in enumerate(dates):
-            try:
-                forecast.append(
-                    DayForecast(
-                        date=date,
-                        temp_min=temp_min[index],
-                        temp_max=temp_max[index],
-                        weather_code=weather_codes[index],
-                        humidity_mean=humidity_mean[index] if index < len(humidity_mean) else None,
-                        wind_speed_max=wind_speed_max[index] if index < len(wind_speed_max) else None,
-                        precipitation_probability_max=(
-                            precipitation_probability_max[index]
-                            if index < len(precipitation_probability_max)
-                            else None
-                        ),
+        if missing:
+            # Single flight: concurrent callers for the same point wait for one upstream fetch.
+            with _fetch_lock(key):
+                found, missing = forecast_cache.lookup(
+                    key, dates, daily_variables, hourly, settings.WEATHER_CACHE_TTL_SECONDS
+                )
+                if missing:
+                    found.update(
+                        self._load_missing(latitude, longitude, key, missing, daily_variables, hourly)
                     )
+
+        forecast = [found[day_date] for day_date in dates if day_date in found]
+        if not forecast:
+            raise ValueError("Пустой прогноз от weather API")
+        return forecast
+
+    @staticmethod
+    def _cache_key(latitude: float, longitude: float) -> tuple[float, float]:
+        return snap_to_grid(latitude, longitude)
+
+    def is_cached(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: date,
+        days: int = 1,
+        *,
+        daily_variables: tuple[str, ...] = DAILY_VARIABLES,
+        hourly: bool = False,
+    ) -> bool:
+        """Whether get_forecast would be answered from memory or a fresh ForecastSnapshot, without upstream."""
+        dates = [(start_date + timedelta(days=offset)).isoformat() for offset in range(max(days, 1))]
+        key = self._cache_key(latitude, longitude)
+        max_age = settings.WEATHER_CACHE_TTL_SECONDS
+        _, missing = forecast_cache.lookup(key, dates, daily_variables, hourly, max_age)
+        if not missing:
+            return True
+        return _select_covered(_read_snapshot(key), missing, daily_variables, hourly, max_age) is not None
+
+    def _load_missing(
+        self,
+        latitude: float,
+        longitude: float,
+        key: tuple[float, float],
+        missing: list[str],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+    ) -> dict[str, DayForecast]:
+        snapshot = _read_snapshot(key)
+        fresh = self._fresh_from_snapshot(key, snapshot, missing, daily_variables, hourly)
+        if fresh is not None:
+            return fresh
+
+        try:
+            fetched = self._fetch_range(
+                latitude, longitude, missing[0], missing[-1], daily_variables, hourly
+            )
+        except (requests.RequestException, ValueError) as exc:
+            stale = self._stale_fallback(
+                latitude, longitude, key, snapshot, missing, daily_variables, hourly, exc
+            )
+            if stale is None:
+                raise
+            return stale
+
+        self._store(key, fetched, daily_variables, hourly)
+        return self._fetched(fetched, missing, hourly)
+
+    @staticmethod
+    def _fresh_from_snapshot(
+        key: tuple[float, float],
+        snapshot: dict[str, _CachedDay],
+        missing: list[str],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+    ) -> dict[str, DayForecast] | None:
+        fresh = _select_covered(
+            snapshot, missing, daily_variables, hourly, settings.WEATHER_CACHE_TTL_SECONDS
+        )
+        if fresh is not None:
+            forecast_cache.load(key, list(snapshot.values()), _keep_from())
+            weather_stats.increment("snapshot_hits")
+        return fresh
+
+    def _stale_fallback(
+        self,
+        latitude: float,
+        longitude: float,
+        key: tuple[float, float],
+        snapshot: dict[str, _CachedDay],
+        missing: list[str],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+        error: Exception,
+    ) -> dict[str, DayForecast] | None:
+        weather_stats.increment("upstream_errors")
+        stale = _select_covered(
+            snapshot, missing, daily_variables, hourly, settings.WEATHER_STALE_MAX_AGE_SECONDS
+        )
+        if stale is None:
+            return None
+        weather_stats.increment("stale_served")
+        logger.warning(
+            "Weather API unavailable, serving stale forecast key=%s range=%s..%s error=%s",
+            key,
+            missing[0],
+            missing[-1],
+            error,
+        )
+        self._start_background_refresh(latitude, longitude, key, missing, daily_variables, hourly)
+        return stale
+
+    @staticmethod
+    def _fetched(fetched: list[DayForecast], missing: list[str], hourly: bool) -> dict[str, DayForecast]:
+        logger.info(
+            "Weather forecast fetched range=%s..%s hourly=%s",
+            missing[0],
+            missing[-1],
+            hourly,
+        )
+        return {day.date: day for day in fetched}
+
+    def _store(
+        self,
+        key: tuple[float, float],
+        fetched: list[DayForecast],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+    ) -> None:
+        forecast_cache.merge(key, fetched, daily_variables, hourly, _keep_from())
+        try:
+            ForecastSnapshot.objects.update_or_create(
+                latitude=key[0],
+                longitude=key[1],
+                defaults={"payload": forecast_cache.export(key), "fetched_at": timezone.now()},
+            )
+        except DatabaseError:
+            logger.warning("Failed to persist forecast snapshot key=%s", key, exc_info=True)
+
+    def _start_background_refresh(
+        self,
+        latitude: float,
+        longitude: float,
+        key: tuple[float, float],
+        missing: list[str],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+    ) -> None:
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+        threading.Thread(
+            target=self._refresh_in_background,
+            args=(latitude, longitude, key, missing, daily_variables, hourly),
+            name="weather-refresh",
+            daemon=True,
+        ).start()
+
+    def _refresh_in_background(
+        self,
+        latitude: float,
+        longitude: float,
+        key: tuple[float, float],
+        missing: list[str],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+    ) -> None:
+        try:
+            fetched = self._fetch_range(
+                latitude, longitude, missing[0], missing[-1], daily_variables, hourly
+            )
+            self._store(key, fetched, daily_variables, hourly)
+            weather_stats.increment("background_refreshes")
+            logger.info("Background forecast refresh succeeded key=%s", key)
+        except Exception:  # noqa: BLE001
+            logger.warning("Background forecast refresh failed key=%s", key, exc_info=True)
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+            connection.close()
+
+    def _fetch_range(
+        self,
+        latitude: float,
+        longitude: float,
+        first_date: str,
+        last_date: str,
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+    ) -> List[DayForecast]:
+        params = _forecast_params(latitude, longitude, first_date, last_date, daily_variables, hourly)
+        return _parse_fetched(self._hedged_get(params))
+
+    def _hedged_get(self, params: dict) -> dict:
+        """
+        Fire a second identical request when the first one is slower than the recent p95,
+        and use whichever answers first.
+        """
+        if not settings.WEATHER_HEDGED_REQUESTS:
+            return self._timed_get(params)
+
+        primary = _hedge_pool.submit(self._timed_get, params)
+        done, _pending = wait([primary], timeout=_hedge_delay())
+        if done:
+            return primary.result()
+
+        weather_stats.increment("hedged_requests")
+        secondary = _hedge_pool.submit(self._timed_get, params)
+        error: Exception | None = None
+        for future in as_completed([primary, secondary]):
+            try:
+                payload = future.result()
+            except Exception as exc:  # noqa: BLE001
+                error = exc
+                continue
+            if future is secondary:
+                weather_stats.increment("hedge_wins")
+            return payload
+        raise error
+
+    def _timed_get(self, params: dict) -> dict:
+        weather_stats.increment("upstream_requests")
+        started = time.perf_counter()
+        response = requests.get(self.base_url, params=params, headers=ACCEPT_ENCODING, timeout=self.timeout)
+        response.raise_for_status()
+        payload = codec.loads(response.content)
+        upstream_latency.observe(time.perf_counter() - started)
+        return payload
+
+
+class AsyncWeatherClient(WeatherClient):
+    """
+    asyncio variant of WeatherClient sharing its cache, snapshot store and stale fallback.
+    Only the upstream HTTP call is async; snapshot reads and writes go through sync_to_async.
+    The async entry points are aget_forecast/aget_daily_forecast; the inherited sync ones still block.
+    """
+
+    def __init__(self, client: httpx.AsyncClient | None = None) -> None:
+        super().__init__()
+        self._client = client
+        # Striped like _fetch_locks. Per instance: an asyncio.Lock binds to the event loop that first waits on it.
+        self._locks = tuple(asyncio.Lock() for _ in range(len(_fetch_locks)))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def aget_daily_forecast(self, latitude: float, longitude: float, days: int = 3) -> List[DayForecast]:
+        return await self.aget_forecast(latitude, longitude, timezone.localdate(), days)
+
+    async def aget_forecast(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: date,
+        days: int = 1,
+        *,
+        daily_variables: tuple[str, ...] = DAILY_VARIABLES,
+        hourly: bool = False,
+    ) -> List[DayForecast]:
+        dates = [(start_date + timedelta(days=offset)).isoformat() for offset in range(max(days, 1))]
+        key = self._cache_key(latitude, longitude)
+        # Fetch the cell centre, not the city itself, so the upstream response matches the shared key.
+        latitude, longitude = key
+        found, missing = forecast_cache.lookup(
+            key, dates, daily_variables, hourly, settings.WEATHER_CACHE_TTL_SECONDS
+        )
+        if missing:
+            async with self._locks[hash(key) % len(self._locks)]:
+                found, missing = forecast_cache.lookup(
+                    key, dates, daily_variables, hourly, settings.WEATHER_CACHE_TTL_SECONDS
                 )
-            except IndexError:
-                logger.warning("Incomplete weather payload for date=%s", date)
+                if missing:
+                    found.update(
+                        await self._aload_missing(latitude, longitude, key, missing, daily_variables, hourly)
+                    )
 
+        forecast = [found[day_date] for day_date in dates if day_date in found]
         if not forecast:
             raise ValueError("Пустой прогноз от weather API")
         return forecast
+
+    async def _aload_missing(
+        self,
+        latitude: float,
+        longitude: float,
+        key: tuple[float, float],
+        missing: list[str],
+        daily_variables: tuple[str, ...],
+        hourly: bool,
+    ) -> dict[str, DayForecast]:
+        snapshot = await sync_to_async(_read_snapshot)(key)
+        fresh = self._fresh_from_snapshot(key, snapshot, missing, daily_variables, hourly)
+        if fresh is not None:
+            return fresh
+
+        import httpx
+
+        params = _forecast_params(latitude, longitude, missing[0], missing[-1], daily_variables, hourly)
+        try:
+            fetched = _parse_fetched(await self._ahedged_get(params))
+        except (httpx.HTTPError, ValueError) as exc:
+            stale = self._stale_fallback(
+                latitude, longitude, key, snapshot, missing, daily_variables, hourly, exc
+            )
+            if stale is None:
+                raise
+            return stale
+
+        await sync_to_async(self._store)(key, fetched, daily_variables, hourly)
+        return self._fetched(fetched, missing, hourly)
+
+    async def _ahedged_get(self, params: dict) -> dict:
+        if not settings.WEATHER_HEDGED_REQUESTS:
+            return await self._atimed_get(params)
+
+        primary = asyncio.ensure_future(self._atimed_get(params))
+        done, _pending = await asyncio.wait({primary}, timeout=_hedge_delay())
+        if done:
+            return primary.result()
+
+        weather_stats.increment("hedged_requests")
+        secondary = asyncio.ensure_future(self._atimed_get(params))
+        pending = {primary, secondary}
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                for other in pending:
+                    other.cancel()
+                if task is secondary:
+                    weather_stats.increment("hedge_wins")
+                return task.result()
+        raise error
+
+    async def _atimed_get(self, params: dict) -> dict:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(timeout=self.timeout, headers=ACCEPT_ENCODING)
+        weather_stats.increment("upstream_requests")
+        started = time.perf_counter()
+        response = await self._client.get(self.base_url, params=params)
+        response.raise_for_status()
+        payload = codec.loads(response.content)
+        upstream_latency.observe(time.perf_counter() - started)
+        return payload
+
+
+def _forecast_params(
+    latitude: float,
+    longitude: float,
+    first_date: str,
+    last_date: str,
+    daily_variables: tuple[str, ...],
+    hourly: bool,
+) -> dict:
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "daily": ",".join(daily_variables),
+        "start_date": first_date,
+        "end_date": last_date,
+        "timezone": "auto",
+    }
+    if hourly:
+        params["hourly"] = ",".join(HOURLY_VARIABLES)
+        params["start_hour"] = f"{first_date}T{DAY_PARTS[0][1]:02d}:00"
+        params["end_hour"] = f"{last_date}T{DAY_PARTS[-1][2]:02d}:00"
+    return params
+
+
+def _parse_fetched(payload: dict) -> List[DayForecast]:
+    forecast = parse_forecast_payload(payload)
+    if not forecast:
+        raise ValueError("Пустой прогноз от weather API")
+    return forecast
+
+
+def _hedge_delay() -> float:
+    hedge_delay = upstream_latency.percentile(0.95)
+    if hedge_delay is None:
+        hedge_delay = settings.WEATHER_HEDGE_DELAY_SECONDS
+    return hedge_delay
+
+
+def _keep_from() -> str:
+    return (timezone.localdate() - timedelta(days=1)).isoformat()
+
+
+def _read_snapshot(key: tuple[float, float]) -> dict[str, _CachedDay]:
+    try:
+        snapshot = ForecastSnapshot.objects.filter(latitude=key[0], longitude=key[1]).first()
+    except DatabaseError:
+        logger.warning("Failed to read forecast snapshot key=%s", key, exc_info=True)
+        return {}
+    if snapshot is None:
+        return {}
+
+    series = {}
+    for item in snapshot.payload:
+        try:
+            entry = _CachedDay.from_dict(item)
+        except (KeyError, TypeError):
+            continue
+        series[entry.day.date] = entry
+    return series